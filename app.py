@@ -1,20 +1,78 @@
+from typing import Optional, Dict, Any
 from flask import Flask
 from flask_migrate import Migrate
 from config import db
+from config.sqlite import configure_sqlite
+from commands import register_commands
+from repositories.cache import artwork_cache, build_cache_backend
+from repositories.redis_cart_repo import RedisCartRepository, CartFlusher, build_cart_repository
+from services.image_pipeline import ImagePipeline, ImageSourcePolicy, DEFAULT_MAX_BYTES, DEFAULT_MAX_PIXELS
+from services.access_tokens import build_access_token_service
+from services.email_dispatcher import build_email_dispatcher
+from services.login_throttle import build_login_throttle
+from services.password_hasher import build_password_hasher
+from services.payment_worker import build_payment_worker
+import models
 
-def create_app():
+def create_app(config: Optional[Dict[str, Any]] = None):
     app = Flask(__name__)
 
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///artwork_sales.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SECRET_KEY'] = 'super-secret'
+    if config:
+        app.config.update(config)
     db.init_app(app)
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            configure_sqlite(
+                db.engine,
+                busy_timeout_ms=app.config.get('SQLITE_BUSY_TIMEOUT_MS', 5000),
+                wal=app.config.get('SQLITE_WAL', True)
+            )
+    artwork_cache.configure(build_cache_backend(app.config))
+    cart_repository = build_cart_repository(app.config)
+    app.extensions['cart_repository'] = cart_repository
+    if isinstance(cart_repository, RedisCartRepository) and app.config.get('CART_FLUSH_INTERVAL', 5):
+        app.extensions['cart_flusher'] = CartFlusher(
+            app,
+            cart_repository,
+            interval_seconds=app.config.get('CART_FLUSH_INTERVAL', 5),
+            batch_size=app.config.get('CART_FLUSH_BATCH_SIZE', 500)
+        )
+        app.extensions['cart_flusher'].start()
+    app.extensions['password_hasher'] = build_password_hasher(app.config)
+    app.extensions['login_throttle'] = build_login_throttle(app.config)
+    app.extensions['access_tokens'] = build_access_token_service(app.config)
+    payment_worker = build_payment_worker(app)
+    if payment_worker is not None:
+        app.extensions['payment_worker'] = payment_worker
+        if app.config.get('PAYMENT_WORKER_AUTOSTART', True):
+            payment_worker.start()
+    email_dispatcher = build_email_dispatcher(app)
+    if email_dispatcher is not None:
+        app.extensions['email_dispatcher'] = email_dispatcher
+        if app.config.get('EMAIL_DISPATCHER_AUTOSTART', True):
+            email_dispatcher.start()
     migrate = Migrate(app, db)
-
-    app.register_blueprint(user_info, url_prefix='/user')
+    register_commands(app)
+    if app.config.get('MEDIA_ROOT'):
+        app.extensions['image_pipeline'] = ImagePipeline(
+            app,
+            storage_root=app.config['MEDIA_ROOT'],
+            url_prefix=app.config.get('MEDIA_URL', '/media'),
+            max_workers=app.config.get('IMAGE_PIPELINE_WORKERS'),
+            source_policy=ImageSourcePolicy(
+                local_root=app.config['MEDIA_ROOT'],
+                allowed_hosts=frozenset(host.lower() for host in app.config.get('IMAGE_SOURCE_HOSTS', ())),
+                allowed_schemes=frozenset(app.config.get('IMAGE_SOURCE_SCHEMES', ('https',))),
+                max_bytes=app.config.get('IMAGE_MAX_BYTES', DEFAULT_MAX_BYTES),
+                max_pixels=app.config.get('IMAGE_MAX_PIXELS', DEFAULT_MAX_PIXELS),
+            )
+        )
 
     return app
 
 if __name__ == '__main__':
     app = create_app()
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -0,0 +1,45 @@
+"""Gallery onboarding throughput: one upload_artwork call per row vs. bulk_import.
+
+    python -m benchmarks.bench_artwork_import --rows 50000
+"""
+import argparse
+import io
+import time
+from models.user import Role
+from schemas.artwork_schema import CreateArtworkSchema
+from services.artist_service import ArtworkService
+from benchmarks.common import bench_app, seed_users
+
+
+def gallery_csv(rows: int) -> str:
+    lines = ["name,description,price,image_url,category"]
+    lines += [f"Piece {i},Mixed media on paper,{50 + i % 900},https://cdn.example.com/{i}.jpg,Drawing"
+              for i in range(rows)]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--single-rows", type=int, default=2_000,
+                        help="rows to push through upload_artwork for the per-row baseline")
+    args = parser.parse_args()
+
+    with bench_app():
+        service = ArtworkService(seed_users(1, Role.ARTIST, prefix="artist")[0])
+        started = time.perf_counter()
+        for i in range(args.single_rows):
+            service.upload_artwork(CreateArtworkSchema(
+                name=f"Single {i}", description="Mixed media on paper", price=100,
+                image_url=f"https://cdn.example.com/s{i}.jpg", category="Drawing"))
+        elapsed = time.perf_counter() - started
+        print(f"upload_artwork per row   rows={args.single_rows:>7,} {args.single_rows / elapsed:>10,.0f} rows/sec")
+
+        for chunk_size in (500, 2_000, 10_000):
+            report = service.bulk_import(io.StringIO(gallery_csv(args.rows)), fmt="csv", chunk_size=chunk_size)
+            print(f"bulk_import chunk={chunk_size:<6} rows={report.inserted:>7,} "
+                  f"{report.rows_per_second:>10,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Full-text search latency over a growing catalog, against a LIKE scan.
+
+    python -m benchmarks.bench_artwork_search --sizes 100000 1000000
+"""
+import argparse
+from config.config import db
+from models.artwork import ArtWork
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from benchmarks.common import bench_app, seed_users, seed_artworks, measure, summarize
+
+QUERIES = ["heron", "bronze mask", "kalomi", "sun"]
+
+
+def like_scan(term: str):
+    return (db.session.query(ArtWork)
+            .filter(ArtWork.is_available.is_(True), ArtWork.name.ilike(f"%{term}%"))
+            .limit(20).all())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with bench_app():
+            seed_artworks(size, seed_users(50, Role.ARTIST, prefix="artist"))
+            for query in QUERIES:
+                timings = measure(lambda: ArtworkRepository.search(query, limit=20), args.repeat)
+                print(f"catalog={size:>9,} search {query!r:<14} {summarize(timings)}")
+            filtered = measure(lambda: ArtworkRepository.search(
+                "storm", {"category": "Painting", "max_price": 1000}, limit=20), args.repeat)
+            print(f"catalog={size:>9,} search + filters       {summarize(filtered)}")
+            scan = measure(lambda: like_scan("heron"), max(3, args.repeat // 10))
+            print(f"catalog={size:>9,} LIKE '%heron%' scan    {summarize(scan)}")
+
+
+if __name__ == "__main__":
+    main()
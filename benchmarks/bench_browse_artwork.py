@@ -0,0 +1,51 @@
+"""Catalog browse latency as the catalog grows: keyset cursor vs. OFFSET.
+
+    python -m benchmarks.bench_browse_artwork --sizes 10000 100000 1000000
+"""
+import argparse
+from config.config import db
+from models.artwork import ArtWork
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from repositories.pagination import encode_cursor
+from benchmarks.common import bench_app, seed_users, seed_artworks, measure, summarize
+
+PAGE_SIZE = 20
+
+
+def offset_page(offset: int):
+    return (db.session.query(ArtWork)
+            .filter(ArtWork.is_available.is_(True))
+            .order_by(ArtWork.created_at.desc(), ArtWork.id.desc())
+            .offset(offset).limit(PAGE_SIZE).all())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with bench_app():
+            seed_artworks(size, seed_users(50, Role.ARTIST, prefix="artist"))
+            available = db.session.query(ArtWork).filter(ArtWork.is_available.is_(True)).count()
+            deep_offset = (available // PAGE_SIZE - 1) * PAGE_SIZE
+            anchor = offset_page(deep_offset - 1)[0]
+            deep_cursor = encode_cursor("created_at:desc", anchor.created_at, anchor.id)
+
+            first = measure(lambda: ArtworkRepository.browse_available(limit=PAGE_SIZE), args.repeat)
+            deep = measure(lambda: ArtworkRepository.browse_available(limit=PAGE_SIZE, cursor=deep_cursor),
+                           args.repeat)
+            filtered = measure(lambda: ArtworkRepository.browse_available(
+                limit=PAGE_SIZE, category="Print", min_price=100, max_price=900, sort_by="price"), args.repeat)
+            offset = measure(lambda: offset_page(deep_offset), max(5, args.repeat // 10))
+
+            print(f"catalog={size:>9,} page 1 (keyset)              {summarize(first)}")
+            print(f"catalog={size:>9,} page {deep_offset // PAGE_SIZE + 1:<7,} (keyset)        {summarize(deep)}")
+            print(f"catalog={size:>9,} filtered by category/price  {summarize(filtered)}")
+            print(f"catalog={size:>9,} page {deep_offset // PAGE_SIZE + 1:<7,} (OFFSET)        {summarize(offset)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Repricing open carts after an artwork price change.
+
+    python -m benchmarks.bench_cart_reprice --carts 100000
+
+Compares the set-based UPDATE ... FROM that update_artwork now issues with
+loading and fixing every affected CartItem in Python.
+"""
+import argparse
+import random
+import time
+from sqlalchemy import insert
+from config.config import db
+from models.artwork import ArtWork
+from models.cart import Cart
+from models.cart_item import CartItem
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from benchmarks.common import bench_app, seed_artworks, seed_users
+
+
+def seed_carts(buyer_ids, artwork_ids, hot_artwork_id, hot_ratio, lines_per_cart, seed=5):
+    rng = random.Random(seed)
+    db.session.execute(insert(Cart), [{"buyer_id": buyer_id} for buyer_id in buyer_ids])
+    db.session.commit()
+    prices = dict(db.session.query(ArtWork.id, ArtWork.price))
+    rows = []
+    for cart_id, in db.session.query(Cart.cart_id):
+        picks = set(rng.sample(artwork_ids, lines_per_cart))
+        if rng.random() < hot_ratio:
+            picks.add(hot_artwork_id)
+        rows += [{"cart_id": cart_id, "artwork_id": artwork_id, "quantity": 1, "subtotal": prices[artwork_id]}
+                 for artwork_id in picks]
+        if len(rows) >= 50_000:
+            db.session.execute(insert(CartItem), rows)
+            rows = []
+    db.session.execute(insert(CartItem), rows)
+    db.session.commit()
+
+
+def reprice_in_python(artwork_id: int, price: float):
+    artwork = db.session.get(ArtWork, artwork_id)
+    artwork.price = price
+    for item in db.session.query(CartItem).filter_by(artwork_id=artwork_id):
+        item.subtotal = item.quantity * price
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--carts", type=int, default=100_000)
+    parser.add_argument("--artworks", type=int, default=5_000)
+    parser.add_argument("--hot-ratio", type=float, default=0.1,
+                        help="share of carts holding the artwork being repriced")
+    parser.add_argument("--lines-per-cart", type=int, default=3)
+    args = parser.parse_args()
+
+    with bench_app():
+        seed_artworks(args.artworks, seed_users(20, Role.ARTIST, prefix="artist"), available_ratio=1.0)
+        artwork_ids = [row.id for row in db.session.query(ArtWork.id)]
+        hot_artwork_id = artwork_ids[0]
+        seed_carts(seed_users(args.carts, Role.BUYER, prefix="buyer"), artwork_ids[1:], hot_artwork_id,
+                   args.hot_ratio, args.lines_per_cart)
+        affected = db.session.query(CartItem).filter_by(artwork_id=hot_artwork_id).count()
+        print(f"{args.carts:,} open carts, {affected:,} lines hold artwork {hot_artwork_id}")
+
+        for label, reprice in (("python loop (before)", lambda price: reprice_in_python(hot_artwork_id, price)),
+                               ("update_artwork set-based",
+                                lambda price: ArtworkRepository.update_artwork(hot_artwork_id, {"price": price}))):
+            timings = []
+            for price in (101.0, 102.0, 103.0):
+                db.session.expunge_all()
+                started = time.perf_counter()
+                reprice(price)
+                timings.append(time.perf_counter() - started)
+            print(f"{label:<26} best={min(timings) * 1000:9.1f}ms worst={max(timings) * 1000:9.1f}ms")
+
+        started = time.perf_counter()
+        ArtworkRepository.update_artwork(hot_artwork_id, {"is_available": False})
+        print(f"{'flag unavailable':<26} {(time.perf_counter() - started) * 1000:14.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Add-to-cart throughput: the old lookup-then-write path vs. the single upsert.
+
+    python -m benchmarks.bench_cart_upsert --ops 5000
+"""
+import argparse
+import random
+import time
+from config.config import db
+from models.artwork import ArtWork
+from models.cart_item import CartItem
+from models.user import Role
+from repositories.cart_repo import CartRepository
+from benchmarks.common import bench_app, seed_artworks, seed_users
+
+
+def add_to_cart_by_lookup(buyer_id: int, artwork_id: int, quantity: int = 1):
+    # The previous implementation, kept here as the baseline.
+    cart = CartRepository.get_cart_or_create_cart(buyer_id)
+    artwork = db.session.get(ArtWork, artwork_id)
+    if not artwork:
+        raise ValueError("Artwork not found")
+    cart_item = db.session.query(CartItem).filter_by(cart_id=cart.cart_id, artwork_id=artwork_id).first()
+    if cart_item:
+        cart_item.quantity += quantity
+        cart_item.subtotal = cart_item.quantity * artwork.price
+    else:
+        db.session.add(CartItem(cart_id=cart.cart_id, artwork_id=artwork_id, quantity=quantity,
+                                subtotal=artwork.price * quantity))
+    db.session.commit()
+    db.session.refresh(cart)
+    return cart
+
+
+def run(label: str, ops: int, buyer_ids, artwork_ids, add) -> None:
+    rng = random.Random(11)
+    calls = [(rng.choice(buyer_ids), rng.choice(artwork_ids)) for _ in range(ops)]
+    db.session.query(CartItem).delete()
+    db.session.commit()
+    started = time.perf_counter()
+    for buyer_id, artwork_id in calls:
+        add(buyer_id, artwork_id)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} ops={ops:>7,} {ops / elapsed:>10,.0f} ops/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=5_000)
+    parser.add_argument("--buyers", type=int, default=200)
+    parser.add_argument("--artworks", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with bench_app():
+        buyer_ids = seed_users(args.buyers, Role.BUYER, prefix="buyer")
+        seed_artworks(args.artworks, seed_users(10, Role.ARTIST, prefix="artist"))
+        artwork_ids = [row.id for row in db.session.query(ArtWork.id)]
+
+        run("lookup + update (before)", args.ops, buyer_ids, artwork_ids, add_to_cart_by_lookup)
+        run("add_to_cart upsert", args.ops, buyer_ids, artwork_ids, CartRepository.add_to_cart)
+
+        rng = random.Random(13)
+        baskets = [(rng.choice(buyer_ids), [(rng.choice(artwork_ids), 1) for _ in range(10)])
+                   for _ in range(args.ops // 10)]
+        started = time.perf_counter()
+        for buyer_id, items in baskets:
+            CartRepository.add_many_to_cart(buyer_id, items)
+        elapsed = time.perf_counter() - started
+        print(f"{'add_many_to_cart (10/call)':<28} ops={len(baskets) * 10:>7,} "
+              f"{len(baskets) * 10 / elapsed:>10,.0f} lines/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Checkout latency for a full cart: place_order per line vs. one-transaction checkout.
+
+    python -m benchmarks.bench_checkout --checkouts 200 --cart-size 20
+"""
+import argparse
+import random
+import time
+from config.config import db
+from models.artwork import ArtWork
+from models.user import Role
+from repositories.cart_repo import CartRepository
+from services.buyer_service import BuyerService
+from benchmarks.common import bench_app, seed_artworks, seed_users, summarize
+
+
+def checkout_line_by_line(buyer_id: int):
+    # The previous flow: one place_order transaction per cart line.
+    service = BuyerService(buyer_id)
+    cart = CartRepository.get_cart_by_buyer(buyer_id)
+    orders = [service.place_order(item.artwork_id, item.quantity) for item in cart.items]
+    CartRepository.clear_cart(cart.cart_id)
+    return orders
+
+
+def run(label: str, checkout, buyer_ids, artwork_ids, cart_size: int) -> None:
+    rng = random.Random(3)
+    timings = []
+    for buyer_id in buyer_ids:
+        CartRepository.add_many_to_cart(buyer_id, [(artwork_id, 1) for artwork_id in rng.sample(artwork_ids, cart_size)])
+        db.session.expunge_all()
+        started = time.perf_counter()
+        orders = checkout(buyer_id)
+        timings.append(time.perf_counter() - started)
+        assert len(orders) == cart_size
+    print(f"{label:<26} checkouts={len(buyer_ids):>5} {summarize(timings)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkouts", type=int, default=200)
+    parser.add_argument("--cart-size", type=int, default=20)
+    args = parser.parse_args()
+
+    with bench_app():
+        seed_artworks(2_000, seed_users(10, Role.ARTIST, prefix="artist"), available_ratio=1.0)
+        artwork_ids = [row.id for row in db.session.query(ArtWork.id)]
+        buyer_ids = seed_users(args.checkouts * 2, Role.BUYER, prefix="buyer")
+        run("place_order per line", checkout_line_by_line, buyer_ids[:args.checkouts], artwork_ids, args.cart_size)
+        run("checkout", lambda buyer_id: BuyerService(buyer_id).checkout(), buyer_ids[args.checkouts:],
+            artwork_ids, args.cart_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Verification-email throughput: one SMTP session per email vs the pooled outbox dispatcher.
+
+    python -m benchmarks.bench_email_dispatch --emails 2000 --latency 0.005 --connections 1,4,8
+"""
+import argparse
+import asyncio
+import smtplib
+import socket
+import time
+from email.message import EmailMessage
+from aiosmtpd.controller import Controller
+from config.config import db
+from repositories.email_outbox_repo import EmailOutboxRepository
+from services.email_dispatcher import EmailDispatcher, SmtpConnectionPool, verification_email
+from benchmarks.common import bench_app
+
+
+class SlowRelay:
+    # Accepts every message after `latency` seconds, standing in for a remote
+    # relay's round trip.
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        self.received += 1
+        return "250 Message accepted"
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def enqueue(count: int) -> None:
+    for n in range(count):
+        EmailOutboxRepository.enqueue(**verification_email(f"user{n}@example.com", "Bench", f"token-{n}"))
+    db.session.commit()
+
+
+def send_one_by_one(port: int, count: int) -> float:
+    # What sending from the request handler costs: a fresh session per email.
+    started = time.perf_counter()
+    for n in range(count):
+        email = verification_email(f"user{n}@example.com", "Bench", f"token-{n}")
+        message = EmailMessage()
+        message['From'], message['To'], message['Subject'] = "no-reply@example.com", email['recipient'], \
+            email['subject']
+        message.set_content(email['body'])
+        with smtplib.SMTP("127.0.0.1", port, timeout=10) as smtp:
+            smtp.send_message(message)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.005, help="Relay delay per message, in seconds.")
+    parser.add_argument("--connections", default="1,4,8")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    relay = SlowRelay(args.latency)
+    port = free_port()
+    controller = Controller(relay, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        elapsed = send_one_by_one(port, args.emails)
+        print(f"{'one session per email':>24}: {args.emails / elapsed:8,.0f} emails/sec  ({elapsed:.2f}s)")
+        for connections in (int(c) for c in args.connections.split(",")):
+            with bench_app() as app:
+                enqueue(args.emails)
+                pool = SmtpConnectionPool("127.0.0.1", port, size=connections)
+                dispatcher = EmailDispatcher(app, pool, sender="no-reply@example.com", batch_size=args.batch_size)
+                started = time.perf_counter()
+                sent = asyncio.run(dispatcher.drain())
+                elapsed = time.perf_counter() - started
+                stats = dispatcher.stats()
+                dispatcher.stop()
+            assert sent == stats['sent'] == args.emails, stats
+            print(f"{f'outbox, {connections} connections':>24}: {sent / elapsed:8,.0f} emails/sec  ({elapsed:.2f}s, "
+                  f"{stats['connections_opened']} sessions opened)")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
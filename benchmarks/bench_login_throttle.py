@@ -0,0 +1,127 @@
+"""CPU spent on logins during a credential-stuffing burst, with and without the login throttle.
+
+    python -m benchmarks.bench_login_throttle --seconds 10 --threads 8 --rounds 10
+"""
+import argparse
+import itertools
+import random
+import statistics
+import threading
+import time
+from passlib.hash import bcrypt
+from sqlalchemy import insert
+from config.config import db
+from models.user import User, Role
+from repositories.rate_limit import InMemoryRateLimitBackend
+from schemas.user_schema import LoginUserSchema
+from services.login_throttle import LoginThrottle, LoginThrottled
+from services.password_hasher import PasswordHasher
+from services.user_service import UserService
+from benchmarks.common import bench_app
+
+PASSWORD = "LamineYamal10!"
+
+
+class CountingHasher(PasswordHasher):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.verifications = itertools.count()
+
+    def verify(self, password, hashed):
+        next(self.verifications)
+        return super().verify(password, hashed)
+
+
+def seed_accounts(count: int, rounds: int) -> None:
+    hashed = bcrypt.using(rounds=rounds).hash(PASSWORD)
+    db.session.execute(insert(User), [
+        {"first_name": "Bench", "last_name": "User", "email": f"user{n}@example.com", "password": hashed,
+         "role": Role.BUYER, "is_verified": True, "verification_code": f"code-{n}"} for n in range(count)
+    ])
+    db.session.commit()
+
+
+def attack(app, service, seconds: float, threads: int, accounts: int, rate: float):
+    # Most traffic sprays wrong passwords across every account from a handful
+    # of clients, or hammers a few victims from many clients; one thread in
+    # eight is a real user signing in from their own address. Attackers offer
+    # `rate` attempts a second per thread, whatever the responses; real users
+    # two.
+    deadline = time.monotonic() + seconds
+    outcomes = {"ok": 0, "refused": 0, "throttled": 0, "legit_ok": 0, "legit_seconds": []}
+    lock = threading.Lock()
+
+    def worker(n):
+        rng = random.Random(n)
+        legit = n % 8 == 0
+        interval = 1 / min(rate, 2) if legit else 1 / rate
+        next_attempt = time.monotonic()
+        with app.app_context():
+            while time.monotonic() < deadline:
+                time.sleep(max(0.0, next_attempt - time.monotonic()))
+                next_attempt += interval
+                if legit:
+                    user = rng.randrange(accounts)
+                    email, password, client = f"user{user}@example.com", PASSWORD, f"home-{user}"
+                elif n % 2:
+                    email, password, client = f"user{rng.randrange(accounts)}@example.com", "Guess1234!", \
+                        f"bot-{rng.randrange(4)}"
+                else:
+                    email, password, client = f"user{rng.randrange(3)}@example.com", "Guess1234!", \
+                        f"botnet-{rng.randrange(10_000)}"
+                started = time.perf_counter()
+                try:
+                    service.login_user(LoginUserSchema(email=email, password=password), client_id=client)
+                    outcome = "ok"
+                except LoginThrottled:
+                    outcome = "throttled"
+                except ValueError:
+                    outcome = "refused"
+                finally:
+                    db.session.remove()
+                with lock:
+                    outcomes[outcome] += 1
+                    if legit:
+                        outcomes["legit_seconds"].append(time.perf_counter() - started)
+                        outcomes["legit_ok"] += outcome == "ok"
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=25, help="Attempts per second per thread.")
+    args = parser.parse_args()
+
+    with bench_app() as app:
+        seed_accounts(args.accounts, args.rounds)
+        # The default limits, with windows 10x shorter (same rates), so the run
+        # reaches steady state in seconds rather than minutes.
+        throttle = LoginThrottle(InMemoryRateLimitBackend(), email_limit=5, email_window=30,
+                                 client_limit=3, client_window=6)
+        for label, throttle in (("no throttle", None), ("throttle", throttle)):
+            hasher = CountingHasher(rounds=args.rounds, max_workers=0)
+            service = UserService(hasher)
+            service.login_throttle = throttle
+            cpu_started, started = time.process_time(), time.perf_counter()
+            outcomes = attack(app, service, args.seconds, args.threads, args.accounts, args.rate)
+            wall = time.perf_counter() - started
+            cpu = time.process_time() - cpu_started
+            attempts = outcomes["ok"] + outcomes["refused"] + outcomes["throttled"]
+            print(f"{label:<12} attempts={attempts:>7,} throttled={outcomes['throttled']:>7,} "
+                  f"bcrypt={next(hasher.verifications):>5,} cpu={cpu / wall:4.2f} cores "
+                  f"legit ok={outcomes['legit_ok']}/{len(outcomes['legit_seconds'])} "
+                  f"legit p50={statistics.median(outcomes['legit_seconds']) * 1000:,.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Registrations/sec and logins/sec per core with inline hashing vs. the process pool.
+
+    python -m benchmarks.bench_password_hashing --users 64 --rounds 10 --threads 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from passlib.hash import bcrypt
+from config.config import db
+from models.user import User
+from schemas.user_schema import CreateUserSchema, LoginUserSchema
+from services.password_hasher import PasswordHasher
+from services.user_service import UserService
+from benchmarks.common import bench_app
+
+PASSWORD = "LamineYamal10!"
+
+
+class DoubleHasher(PasswordHasher):
+    # The previous flow: register hashed the password and User.set_password
+    # hashed the hash again, both on the request thread.
+    def hash(self, password: str) -> str:
+        return super().hash(super().hash(password))
+
+
+def run(label: str, app, action, count: int, threads: int) -> None:
+    def call(n):
+        with app.app_context():
+            try:
+                action(n)
+            finally:
+                db.session.remove()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(call, range(count)))
+    rate = count / (time.perf_counter() - started)
+    print(f"{label:<32} {rate:8.1f}/sec {rate / (os.cpu_count() or 1):8.1f}/sec/core")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent request threads.")
+    parser.add_argument("--workers", type=int, default=None, help="Hashing processes (default: one per core).")
+    args = parser.parse_args()
+
+    with bench_app() as app:
+        hashers = {
+            "double hash, inline": DoubleHasher(rounds=args.rounds, max_workers=0),
+            "inline": PasswordHasher(rounds=args.rounds, max_workers=0),
+            "pool": PasswordHasher(rounds=args.rounds, max_workers=args.workers),
+        }
+        for label, hasher in hashers.items():
+            prefix = label.replace(",", "").replace(" ", "-")
+
+            def register(n):
+                email = f"{prefix}{n}@example.com"
+                UserService(hasher).register(CreateUserSchema(first_name="Bench", last_name="User", email=email,
+                                                              password=PASSWORD, confirm_password=PASSWORD))
+                db.session.commit()
+                db.session.query(User).filter_by(email=email).update({"is_verified": True})
+                db.session.commit()
+
+            def login(n):
+                UserService(hasher).login_user(LoginUserSchema(email=f"{prefix}{n}@example.com", password=PASSWORD))
+
+            run(f"register ({label})", app, register, args.users, args.threads)
+            if not isinstance(hasher, DoubleHasher):
+                # A double-hashed password never verifies, so there is no login to time.
+                run(f"login ({label})", app, login, args.users, args.threads)
+            hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Payment reconciliation throughput and peak memory as the order history grows.
+
+    python -m benchmarks.bench_reconciliation --orders 50000 200000 --chunk-size 5000
+"""
+import argparse
+import io
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from config.config import db
+from models.artwork import ArtWork
+from models.order import Order, OrderStatus
+from models.payment import Payment, PaymentStatus, PaymentMethod
+from models.user import Role
+from services.reconciliation import reconcile_payments, write_discrepancies_jsonl
+from benchmarks.common import bench_app, seed_artworks, seed_users
+
+STATUSES = [OrderStatus.PAID, OrderStatus.SHIPPED, OrderStatus.COMPLETED, OrderStatus.PENDING, OrderStatus.CANCELED]
+
+
+def seed_ledger(count: int, buyer_ids, artwork_ids, chunk_size: int = 10_000, seed: int = 11) -> None:
+    # Roughly 1% of orders get a missing, short or duplicated payment.
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    for offset in range(0, count, chunk_size):
+        orders, payments = [], []
+        for order_id in range(offset + 1, min(offset + chunk_size, count) + 1):
+            status = rng.choice(STATUSES)
+            total = round(rng.uniform(20, 5000), 2)
+            orders.append({"id": order_id, "buyer_id": rng.choice(buyer_ids), "artwork_id": rng.choice(artwork_ids),
+                           "total_price": total, "quantity": 1, "status": status,
+                           "created_at": start + timedelta(minutes=order_id)})
+            if status in (OrderStatus.PENDING, OrderStatus.CANCELED):
+                continue
+            roll = rng.random()
+            if roll < 0.004:
+                continue
+            amounts = [total - 1.0] if roll < 0.007 else [total, total] if roll < 0.01 else [total]
+            payments.extend({"order_id": order_id, "amount": amount, "status": PaymentStatus.SUCCESS,
+                             "payment_method": PaymentMethod.CARD, "created_at": start} for amount in amounts)
+        db.session.execute(insert(Order), orders)
+        db.session.execute(insert(Payment), payments)
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, nargs="+", default=[50_000, 200_000])
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    for count in args.orders:
+        with bench_app():
+            seed_artworks(500, seed_users(20, Role.ARTIST, prefix="artist"))
+            artwork_ids = [row.id for row in db.session.query(ArtWork.id)]
+            seed_ledger(count, seed_users(1000, Role.BUYER, prefix="buyer"), artwork_ids)
+            db.session.remove()
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            report = reconcile_payments(chunk_size=args.chunk_size)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            written = write_discrepancies_jsonl(report.run_id, io.StringIO())
+            print(f"orders={count:>9,} payments={report.payments_checked:>9,} discrepancies={written:>6,} "
+                  f"{count / elapsed:>10,.0f} orders/sec peak={peak / 2 ** 20:6.1f}MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Concurrent buyers racing for one-of-a-kind artworks.
+
+    python -m benchmarks.bench_reserve_contention --workers 8 --artworks 2000
+
+Every worker thread keeps trying to buy random artworks until the pool is sold
+out; prints settled attempts/sec and checks no artwork was sold twice.
+"""
+import argparse
+import random
+import threading
+import time
+from sqlalchemy import func
+from config.config import db
+from models.artwork import ArtWork
+from models.order import Order
+from models.user import Role
+from services.buyer_service import BuyerService
+from benchmarks.common import bench_app, seed_artworks, seed_users
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--artworks", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with bench_app() as app:
+        seed_artworks(args.artworks, seed_users(5, Role.ARTIST, prefix="artist"), available_ratio=1.0)
+        artwork_ids = [row.id for row in db.session.query(ArtWork.id)]
+        buyer_ids = seed_users(args.workers, Role.BUYER, prefix="buyer")
+        db.session.remove()
+        counts = {"won": 0, "lost": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def worker(buyer_id, seed):
+            rng = random.Random(seed)
+            remaining = list(artwork_ids)
+            with app.app_context():
+                while remaining:
+                    artwork_id = remaining.pop(rng.randrange(len(remaining)))
+                    try:
+                        BuyerService(buyer_id).place_order(artwork_id, 1)
+                        outcome = "won"
+                    except ValueError:
+                        outcome = "lost"
+                    except RuntimeError:
+                        outcome = "errors"
+                    with lock:
+                        counts[outcome] += 1
+                db.session.remove()
+
+        threads = [threading.Thread(target=worker, args=(buyer_id, i)) for i, buyer_id in enumerate(buyer_ids)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        attempts = sum(counts.values())
+        oversold = db.session.query(Order.artwork_id).group_by(Order.artwork_id) \
+            .having(func.count() > 1).count()
+        print(f"workers={args.workers} attempts={attempts:,} won={counts['won']:,} lost={counts['lost']:,} "
+              f"errors={counts['errors']} oversold={oversold}")
+        print(f"{attempts / elapsed:,.0f} attempts/sec, {counts['won'] / elapsed:,.0f} orders/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Listing serialization: per-object model_validate/model_dump/json.dumps vs bulk TypeAdapter over row tuples.
+
+    python -m benchmarks.bench_serialization --rows 10000 100000 --repeat 3
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from config.config import db
+from models.order import Order, OrderStatus
+from models.payment import Payment, PaymentStatus, PaymentMethod
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from repositories.order_repo import OrderRepository
+from repositories.payment_repo import PaymentRepository
+from repositories.user_repo import UserRepository
+from schemas.artwork_schema import ArtWorkResponse
+from schemas.order_schema import OrderResponseSchema
+from schemas.payment_schema import PaymentResponseSchema
+from schemas.user_schema import UserResponseSchema
+from services.admin_service import AdminService
+from services.buyer_service import BuyerService
+from benchmarks.common import bench_app, seed_artworks, seed_users
+
+
+def seed_orders(count: int, buyer_ids, artwork_ids, chunk_size: int = 10_000, seed: int = 5) -> None:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for offset in range(0, count, chunk_size):
+        ids = range(offset + 1, min(offset + chunk_size, count) + 1)
+        db.session.execute(insert(Order), [
+            {"id": n, "buyer_id": rng.choice(buyer_ids), "artwork_id": rng.choice(artwork_ids),
+             "total_price": round(rng.uniform(20, 5000), 2), "quantity": 1,
+             "status": rng.choice(list(OrderStatus)), "created_at": start + timedelta(minutes=n)} for n in ids
+        ])
+        db.session.execute(insert(Payment), [
+            {"id": n, "order_id": n, "amount": round(rng.uniform(20, 5000), 2),
+             "status": rng.choice(list(PaymentStatus)), "payment_method": rng.choice(list(PaymentMethod)),
+             "created_at": start + timedelta(minutes=n)} for n in ids
+        ])
+        db.session.commit()
+
+
+def per_object(schema, fetch):
+    # The existing path: ORM objects, one model and one dict per row.
+    def run():
+        body = json.dumps([schema.model_validate(obj).model_dump(mode='json') for obj in fetch()]).encode()
+        db.session.expunge_all()
+        return body
+    return run
+
+
+def best_of(fn, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with bench_app() as app:
+            artist_ids = seed_users(100, Role.ARTIST, prefix="artist")
+            buyer_ids = seed_users(rows, prefix="buyer")
+            seed_artworks(rows, artist_ids, available_ratio=1.0)
+            artwork_ids = [row.id for row in ArtworkRepository.find_all_available_rows(("id",))]
+            seed_orders(rows, buyer_ids, artwork_ids)
+            admin, buyer = AdminService(), BuyerService(buyer_ids[0])
+            cases = [
+                ("users", per_object(UserResponseSchema, UserRepository.find_all_users), admin.export_users),
+                ("artworks", per_object(ArtWorkResponse, ArtworkRepository.find_all_available),
+                 buyer.export_available_artwork),
+                ("orders", per_object(OrderResponseSchema, OrderRepository.get_all_orders), admin.export_orders),
+                ("payments", per_object(PaymentResponseSchema, PaymentRepository.get_all_payments),
+                 admin.export_payments),
+            ]
+            print(f"{rows:,} rows")
+            for name, current, bulk in cases:
+                current_seconds, current_body = best_of(current, args.repeat)
+                bulk_seconds, bulk_body = best_of(bulk, args.repeat)
+                assert json.loads(current_body) == json.loads(bulk_body), name
+                print(f"  {name:>9}: per-object {current_seconds * 1000:8.0f}ms  bulk {bulk_seconds * 1000:7.0f}ms  "
+                      f"({current_seconds / bulk_seconds:4.1f}x, {len(bulk_body) / 2 ** 20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
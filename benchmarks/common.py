@@ -0,0 +1,87 @@
+import os
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, List
+from sqlalchemy import insert
+from app import create_app
+from config.config import db
+from models.artwork import ArtWork
+from models.user import User, Role
+
+CATEGORIES = ["Painting", "Sculpture", "Photography", "Print", "Drawing", "Textile"]
+WORDS = ("sunset ocean heron bronze portrait abstract river harbour city night garden storm "
+         "lagos market dancer mask indigo copper forest window study light shadow mother "
+         "festival rain desert horizon bloom tide").split()
+SYLLABLES = "ka lo mi nu ra se ti vo ze ba de fi go hu ja ke li mo na pe".split()
+# A realistic catalog vocabulary is large and mostly rare words: a few thousand
+# pseudo-words plus the common WORDS above.
+VOCABULARY = WORDS + sorted({a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES})
+
+
+@contextmanager
+def bench_app(**config):
+    # Benchmarks run against a throwaway file database so SQLite behaves the way
+    # it does in production (page cache, fsync on commit) rather than in memory.
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}", **config})
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.engine.dispose()
+
+
+def seed_users(count: int, role: Role = Role.BUYER, prefix: str = "user") -> List[int]:
+    rows = [
+        {"first_name": "Bench", "last_name": "User", "email": f"{prefix}{i}@example.com",
+         "password": "x", "role": role, "is_verified": True, "verification_code": f"{prefix}-{i}"}
+        for i in range(count)
+    ]
+    db.session.execute(insert(User), rows)
+    db.session.commit()
+    return [row.id for row in db.session.query(User.id).filter(User.email.like(f"{prefix}%")).all()]
+
+
+def seed_artworks(count: int, artist_ids: List[int], available_ratio: float = 0.9,
+                  chunk_size: int = 10_000, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    for offset in range(0, count, chunk_size):
+        rows = [
+            {"name": " ".join(rng.choice(VOCABULARY) for _ in range(2)).title(),
+             "description": " ".join(rng.choice(VOCABULARY) for _ in range(8)),
+             "image_url": f"https://cdn.example.com/{i}.jpg",
+             "price": round(rng.uniform(20, 5000), 2),
+             "category": rng.choice(CATEGORIES),
+             "artist_id": rng.choice(artist_ids),
+             "is_available": rng.random() < available_ratio,
+             "created_at": start + timedelta(minutes=i)}
+            for i in range(offset, min(offset + chunk_size, count))
+        ]
+        db.session.execute(insert(ArtWork), rows)
+        db.session.commit()
+
+
+def measure(fn: Callable[[], object], repeat: int = 50) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def percentile(timings: List[float], pct: float) -> float:
+    ordered = sorted(timings)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(timings: List[float]) -> str:
+    return (f"p50={statistics.median(timings) * 1000:8.3f}ms "
+            f"p99={percentile(timings, 99) * 1000:8.3f}ms")
@@ -0,0 +1,13 @@
+from commands.artworks import artworks_cli
+from commands.emails import emails_cli
+from commands.orders import orders_cli
+from commands.payments import payments_cli
+from commands.reports import reports_cli
+
+
+def register_commands(app):
+    app.cli.add_command(artworks_cli)
+    app.cli.add_command(emails_cli)
+    app.cli.add_command(orders_cli)
+    app.cli.add_command(payments_cli)
+    app.cli.add_command(reports_cli)
@@ -0,0 +1,42 @@
+import asyncio
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from config.sqlite import retry_on_lock
+from repositories.email_outbox_repo import EmailOutboxRepository
+from services.email_dispatcher import build_email_dispatcher
+
+emails_cli = AppGroup('emails', help='Outgoing email commands.')
+
+
+def _dispatcher():
+    dispatcher = current_app.extensions.get('email_dispatcher') or build_email_dispatcher(current_app)
+    if dispatcher is None:
+        raise click.ClickException("No SMTP server configured (set SMTP_HOST)")
+    return dispatcher
+
+
+@emails_cli.command('dispatch')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches.')
+def dispatch_emails(max_batches):
+    """Send every due email in the outbox now, in the foreground."""
+    dispatcher = _dispatcher()
+    processed = asyncio.run(dispatcher.drain(max_batches=max_batches))
+    stats = dispatcher.stats()
+    click.echo(f"processed {processed} emails: {stats['sent']} sent, {stats['retried']} to retry, "
+               f"{stats['dead']} dead-lettered; {stats['queue_pending']} still pending")
+
+
+@emails_cli.command('stats')
+def email_stats():
+    """Show outbox depth, dead letters and this process's dispatcher metrics."""
+    for name, value in _dispatcher().stats().items():
+        click.echo(f"{name}: {value}")
+
+
+@emails_cli.command('requeue-dead')
+@click.option('--id', 'ids', type=int, multiple=True, help='Only requeue these emails (repeatable).')
+def requeue_dead(ids):
+    """Give dead-lettered emails a fresh set of attempts."""
+    requeued = retry_on_lock(lambda: EmailOutboxRepository.requeue_dead(list(ids) if ids else None))
+    click.echo(f"requeued {requeued} emails")
@@ -0,0 +1,28 @@
+import click
+from flask.cli import AppGroup
+from repositories.idempotency_repo import IdempotencyRepository
+from services.order_archiver import archive_closed_orders
+
+orders_cli = AppGroup('orders', help='Order maintenance commands.')
+
+
+@orders_cli.command('archive')
+@click.option('--older-than-days', type=int, default=90, show_default=True,
+              help='Archive orders closed (completed or canceled) at least this long ago.')
+@click.option('--batch-size', type=int, default=500, show_default=True, help='Orders moved per transaction.')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches.')
+@click.option('--pause', 'pause_seconds', type=float, default=0.05, show_default=True,
+              help='Seconds to wait between batches so live writers get the lock.')
+def archive_orders(older_than_days, batch_size, max_batches, pause_seconds):
+    """Move long-closed orders and their payments into the archive tables."""
+    report = archive_closed_orders(older_than_days, batch_size=batch_size, max_batches=max_batches,
+                                   pause_seconds=pause_seconds)
+    click.echo(f"archived {report.orders} orders and {report.payments} payments in {report.batches} batches "
+               f"({report.elapsed_seconds:.2f}s)")
+
+
+@orders_cli.command('purge-idempotency-keys')
+@click.option('--batch-size', type=int, default=1000, show_default=True, help='Keys deleted per transaction.')
+def purge_idempotency_keys(batch_size):
+    """Delete idempotency keys whose TTL has passed."""
+    click.echo(f"purged {IdempotencyRepository.purge_expired(batch_size=batch_size)} expired idempotency keys")
@@ -0,0 +1,54 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from services.payment_worker import build_payment_worker
+from services.reconciliation import reconcile_payments, write_discrepancies_jsonl
+
+payments_cli = AppGroup('payments', help='Payment processing commands.')
+
+
+def _worker():
+    worker = current_app.extensions.get('payment_worker') or build_payment_worker(current_app)
+    if worker is None:
+        raise click.ClickException("No payment gateway configured (set PAYMENT_GATEWAY)")
+    return worker
+
+
+@payments_cli.command('process')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many batches.')
+def process_payments(max_batches):
+    """Charge every due PENDING payment now, in the foreground."""
+    worker = _worker()
+    processed = worker.drain(max_batches=max_batches)
+    stats = worker.stats()
+    click.echo(f"processed {processed} payments: {stats['succeeded']} succeeded, {stats['failed']} failed, "
+               f"{stats['retried']} to retry; {stats['queue_pending']} still pending")
+
+
+@payments_cli.command('stats')
+def payment_stats():
+    """Show payment queue depth and this process's worker metrics."""
+    for name, value in _worker().stats().items():
+        click.echo(f"{name}: {value}")
+
+
+@payments_cli.command('reconcile')
+@click.option('--chunk-size', type=int, default=5000, show_default=True, help='Orders checked per transaction.')
+@click.option('--resume', 'run_id', type=int, default=None, help='Continue an unfinished run from its checkpoint.')
+@click.option('--max-chunks', type=int, default=None, help='Stop after this many chunks.')
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Also write the run\'s discrepancies to this JSONL file.')
+def reconcile(chunk_size, run_id, max_chunks, output):
+    """Check that every paid order has exactly one successful payment for its total."""
+    try:
+        report = reconcile_payments(chunk_size=chunk_size, run_id=run_id, max_chunks=max_chunks)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"run {report.run_id}: checked {report.orders_checked} orders and {report.payments_checked} "
+               f"payments, found {report.discrepancies} discrepancies ({report.elapsed_seconds:.2f}s)")
+    if not report.completed:
+        click.echo(f"stopped early; continue with --resume {report.run_id}")
+    if output:
+        with open(output, 'w') as stream:
+            written = write_discrepancies_jsonl(report.run_id, stream)
+        click.echo(f"wrote {written} discrepancies to {output}")
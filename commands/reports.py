@@ -0,0 +1,16 @@
+import click
+from flask.cli import AppGroup
+from repositories.rollup_repo import RollupRepository
+
+reports_cli = AppGroup('reports', help='Sales reporting commands.')
+
+
+@reports_cli.command('rebuild-rollups')
+@click.option('--chunk-size', type=int, default=5000, show_default=True,
+              help='Orders read from the database per round trip.')
+def rebuild_rollups(chunk_size):
+    """Rebuild the sales rollups from order history and report any drift."""
+    drift = RollupRepository.rebuild(chunk_size=chunk_size)
+    for name, rows in drift.items():
+        click.echo(f"{name}: {rows} rows drifted")
+    click.echo("sales rollups rebuilt")
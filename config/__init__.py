@@ -0,0 +1 @@
+from config.config import db
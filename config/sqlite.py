@@ -0,0 +1,97 @@
+import random
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, TypeVar
+from flask import has_app_context
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from config.config import db
+
+T = TypeVar("T")
+
+LOCK_ERRORS = ("database is locked", "database is busy", "database table is locked")
+AFTER_COMMIT = "after_commit"
+
+
+def configure_sqlite(engine, busy_timeout_ms: int = 5000, wal: bool = True):
+    # pysqlite only issues BEGIN lazily before DML and treats SAVEPOINT as
+    # autocommit, so releasing a savepoint would commit the whole transaction.
+    # Hand transaction control to SQLAlchemy instead (see the SQLAlchemy docs,
+    # "Serializable isolation / Savepoints / Transactional DDL" for pysqlite).
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        # WAL lets readers carry on while one writer commits; the busy timeout
+        # makes a second writer wait for the lock instead of failing at once.
+        cursor = dbapi_connection.cursor()
+        if wal:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def begin_transaction(connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+def is_lock_error(error: OperationalError) -> bool:
+    return any(message in str(error.orig).lower() for message in LOCK_ERRORS)
+
+
+def retry_on_lock(operation: Callable[[], T], attempts: int = 5, base_delay: float = 0.02,
+                  max_delay: float = 0.5) -> T:
+    # The busy timeout cannot help a transaction that read before it wrote and
+    # lost the race to upgrade its lock: SQLite fails that at once rather than
+    # deadlock. Roll back and run the whole unit of work again after a random
+    # ("full jitter") exponential backoff, so contending writers spread out.
+    for attempt in range(attempts):
+        try:
+            return operation()
+        except OperationalError as e:
+            db.session.rollback()
+            if not is_lock_error(e):
+                raise RuntimeError(f"Database error: {e.__class__.__name__} - {str(e)}") from e
+            if attempt == attempts - 1:
+                raise RuntimeError(f"Database stayed locked after {attempts} attempts") from e
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+
+
+@contextmanager
+def single_transaction() -> Iterator[None]:
+    # Runs the block on a db.session joined to a transaction on its own
+    # connection in "create_savepoint" mode: the repositories' commit() calls
+    # inside only release savepoints, and everything the block wrote becomes
+    # durable in one COMMIT at the end, or not at all. The caller's session
+    # is committed first, as the block's own commits would have done. Objects
+    # loaded inside stay loaded but are detached once the block ends.
+    db.session.commit()
+    outer = db.session.registry()
+    connection = db.engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False,
+                      info={AFTER_COMMIT: []})
+    db.session.registry.set(session)
+    try:
+        yield
+        transaction.commit()
+    finally:
+        db.session.registry.set(outer)
+        session.close()
+        if transaction.is_active:
+            transaction.rollback()
+        connection.close()
+    for callback in session.info[AFTER_COMMIT]:
+        callback()
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    # For side effects (cache invalidation) that must follow a durable commit.
+    # A repository's commit() normally is one, so the callback runs at once;
+    # inside single_transaction() it waits for the outer COMMIT, and is
+    # dropped if that never happens.
+    pending = db.session.info.get(AFTER_COMMIT) if has_app_context() else None
+    if pending is None:
+        callback()
+    else:
+        pending.append(callback)
@@ -0,0 +1,31 @@
+"""never reuse user ids
+
+Revision ID: 144fbf805edd
+Revises: 86466efbe4c3
+Create Date: 2026-10-18 13:07:46.956150
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '144fbf805edd'
+down_revision = '86466efbe4c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite only honours AUTOINCREMENT at CREATE TABLE, so rebuild the table.
+    # Copying the rows seeds sqlite_sequence with the current max(id); ids
+    # freed above that before this migration cannot be recovered.
+    with op.batch_alter_table('users', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+
+
+def downgrade():
+    with op.batch_alter_table('users', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        pass
@@ -0,0 +1,64 @@
+"""hot path indexes
+
+Revision ID: 3f1d2a7c9b04
+Revises: 9c43738565ea
+Create Date: 2026-10-18 11:52:03.118240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1d2a7c9b04'
+down_revision = '9c43738565ea'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('artworks', schema=None) as batch_op:
+        batch_op.create_index('ix_artworks_artist_created_at', ['artist_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_artworks_available_created_at', ['is_available', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_artworks_available_price', ['is_available', 'price', 'id'], unique=False)
+        batch_op.create_index('ix_artworks_category_available_created_at', ['category', 'is_available', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.create_index('ix_carts_buyer_id', ['buyer_id'], unique=False)
+
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.create_index('ix_cart_items_artwork_id', ['artwork_id'], unique=False)
+        batch_op.create_index('ix_cart_items_cart_artwork', ['cart_id', 'artwork_id'], unique=False)
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_artwork_id', ['artwork_id'], unique=False)
+        batch_op.create_index('ix_orders_buyer_created_at', ['buyer_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_orders_status_created_at', ['status', 'created_at'], unique=False)
+
+    with op.batch_alter_table('payment', schema=None) as batch_op:
+        batch_op.create_index('ix_payment_order_id', ['order_id'], unique=False)
+        batch_op.create_index('ix_payment_status_created_at', ['status', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('payment', schema=None) as batch_op:
+        batch_op.drop_index('ix_payment_status_created_at')
+        batch_op.drop_index('ix_payment_order_id')
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_status_created_at')
+        batch_op.drop_index('ix_orders_buyer_created_at')
+        batch_op.drop_index('ix_orders_artwork_id')
+
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_cart_items_cart_artwork')
+        batch_op.drop_index('ix_cart_items_artwork_id')
+
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.drop_index('ix_carts_buyer_id')
+
+    with op.batch_alter_table('artworks', schema=None) as batch_op:
+        batch_op.drop_index('ix_artworks_category_available_created_at')
+        batch_op.drop_index('ix_artworks_available_price')
+        batch_op.drop_index('ix_artworks_available_created_at')
+        batch_op.drop_index('ix_artworks_artist_created_at')
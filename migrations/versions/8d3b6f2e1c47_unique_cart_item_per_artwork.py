@@ -0,0 +1,42 @@
+"""unique cart item per artwork
+
+Revision ID: 8d3b6f2e1c47
+Revises: e2c8d4f61a93
+Create Date: 2026-10-18 15:12:40.553861
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3b6f2e1c47'
+down_revision = 'e2c8d4f61a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fold any duplicate lines into the oldest one before the unique index
+    # goes on, keeping the buyer's total quantity and subtotal.
+    op.execute(
+        "UPDATE cart_items SET "
+        "quantity = (SELECT SUM(d.quantity) FROM cart_items d "
+        "WHERE d.cart_id = cart_items.cart_id AND d.artwork_id = cart_items.artwork_id), "
+        "subtotal = (SELECT SUM(d.subtotal) FROM cart_items d "
+        "WHERE d.cart_id = cart_items.cart_id AND d.artwork_id = cart_items.artwork_id) "
+        "WHERE id IN (SELECT MIN(id) FROM cart_items GROUP BY cart_id, artwork_id HAVING COUNT(*) > 1)"
+    )
+    op.execute(
+        "DELETE FROM cart_items WHERE id NOT IN (SELECT MIN(id) FROM cart_items GROUP BY cart_id, artwork_id)"
+    )
+
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_cart_items_cart_artwork')
+        batch_op.create_index('uq_cart_items_cart_artwork', ['cart_id', 'artwork_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.drop_index('uq_cart_items_cart_artwork')
+        batch_op.create_index('ix_cart_items_cart_artwork', ['cart_id', 'artwork_id'], unique=False)
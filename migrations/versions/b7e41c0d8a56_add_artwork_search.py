@@ -0,0 +1,50 @@
+"""add artwork search
+
+Revision ID: b7e41c0d8a56
+Revises: 3f1d2a7c9b04
+Create Date: 2026-10-18 12:40:17.332905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e41c0d8a56'
+down_revision = '3f1d2a7c9b04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "CREATE VIRTUAL TABLE artworks_fts USING fts5("
+        "name, description, category, content='artworks', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute("INSERT INTO artworks_fts(artworks_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 5.0)')")
+    op.execute(
+        "CREATE TRIGGER artworks_fts_ai AFTER INSERT ON artworks BEGIN "
+        "INSERT INTO artworks_fts(rowid, name, description, category) "
+        "VALUES (new.id, new.name, new.description, new.category); END"
+    )
+    op.execute(
+        "CREATE TRIGGER artworks_fts_ad AFTER DELETE ON artworks BEGIN "
+        "INSERT INTO artworks_fts(artworks_fts, rowid, name, description, category) "
+        "VALUES ('delete', old.id, old.name, old.description, old.category); END"
+    )
+    op.execute(
+        "CREATE TRIGGER artworks_fts_au AFTER UPDATE OF name, description, category ON artworks BEGIN "
+        "INSERT INTO artworks_fts(artworks_fts, rowid, name, description, category) "
+        "VALUES ('delete', old.id, old.name, old.description, old.category); "
+        "INSERT INTO artworks_fts(rowid, name, description, category) "
+        "VALUES (new.id, new.name, new.description, new.category); END"
+    )
+    op.execute("INSERT INTO artworks_fts(artworks_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS artworks_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS artworks_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS artworks_fts_ai")
+    op.execute("DROP TABLE IF EXISTS artworks_fts")
@@ -0,0 +1,33 @@
+"""add cart item availability
+
+Revision ID: c41e7a9d2f58
+Revises: 8d3b6f2e1c47
+Create Date: 2026-10-18 16:31:09.402217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7a9d2f58'
+down_revision = '8d3b6f2e1c47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_available', sa.Boolean(), server_default=sa.text('1'), nullable=False))
+
+    # Existing lines may already carry stale prices; bring them all in line.
+    op.execute(
+        "UPDATE cart_items SET subtotal = cart_items.quantity * artworks.price, "
+        "is_available = artworks.is_available "
+        "FROM artworks WHERE artworks.id = cart_items.artwork_id"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('cart_items', schema=None) as batch_op:
+        batch_op.drop_column('is_available')
@@ -0,0 +1,34 @@
+"""never reuse order and payment ids
+
+Revision ID: f33e98c81bc0
+Revises: d75916c6a0e8
+Create Date: 2026-10-18 13:28:56.487845
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f33e98c81bc0'
+down_revision = 'd75916c6a0e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Archiving deletes orders and payments with the highest ids, which plain
+    # rowid tables would hand out again. As for users, AUTOINCREMENT needs a
+    # rebuild, and copying the rows seeds sqlite_sequence with max(id); ids
+    # freed above that by archiving before this migration are not recovered.
+    for table in ('orders', 'payment'):
+        with op.batch_alter_table(table, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+            pass
+
+
+def downgrade():
+    for table in ('payment', 'orders'):
+        with op.batch_alter_table(table, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+            pass
@@ -0,0 +1,44 @@
+"""admin listing indexes
+
+Revision ID: f7a2c5e93b10
+Revises: c41e7a9d2f58
+Create Date: 2026-10-18 17:48:22.906731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7a2c5e93b10'
+down_revision = 'c41e7a9d2f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index('ix_orders_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_orders_total_price', ['total_price'], unique=False)
+
+    with op.batch_alter_table('payment', schema=None) as batch_op:
+        batch_op.create_index('ix_payment_amount', ['amount'], unique=False)
+        batch_op.create_index('ix_payment_created_at', ['created_at'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_created_at', ['created_at'], unique=False)
+        batch_op.create_index('ix_users_role_created_at', ['role', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_role_created_at')
+        batch_op.drop_index('ix_users_created_at')
+
+    with op.batch_alter_table('payment', schema=None) as batch_op:
+        batch_op.drop_index('ix_payment_created_at')
+        batch_op.drop_index('ix_payment_amount')
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_orders_total_price')
+        batch_op.drop_index('ix_orders_created_at')
@@ -0,0 +1,12 @@
+from models.user import User, Role
+from models.artwork import ArtWork
+from models.cart import Cart
+from models.cart_item import CartItem
+from models.order import Order, OrderStatus
+from models.payment import Payment, PaymentStatus, PaymentMethod
+from models.artwork_facet import ArtworkFacet
+from models.sales_rollup import ArtistDailySales, CategoryDailySales, BuyerLifetimeValue, REVENUE_STATUSES
+from models.archive import OrderArchive, PaymentArchive
+from models.idempotency_key import IdempotencyKey
+from models.reconciliation import ReconciliationRun, ReconciliationCheckpoint, ReconciliationDiscrepancy, DiscrepancyKind
+from models.email_outbox import EmailOutbox, OutboxStatus
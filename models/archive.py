@@ -0,0 +1,51 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, DateTime, Enum as SqlEnum, Index, String
+from config.config import db
+from models.order import OrderStatus
+from models.payment import PaymentStatus, PaymentMethod
+
+
+# Cold copies of closed orders and their payments. They keep the live ids and
+# columns, so archived rows serialize exactly like live ones, but carry no
+# foreign keys: an archived order may outlive the buyer or artwork it names.
+class OrderArchive(db.Model):
+    __tablename__ = "orders_archive"
+    __table_args__ = (
+        Index("ix_orders_archive_buyer_created_at", "buyer_id", "created_at"),
+        Index("ix_orders_archive_artwork_id", "artwork_id"),
+        Index("ix_orders_archive_status_created_at", "status", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    buyer_id = Column(Integer, nullable=False)
+    artwork_id = Column(Integer, nullable=False)
+    total_price = Column(Float, nullable=False)
+    quantity = Column(Integer, default=1)
+    status = Column(SqlEnum(OrderStatus), nullable=False)
+    created_at = Column(DateTime)
+    closed_at = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<OrderArchive {self.id}>"
+
+
+class PaymentArchive(db.Model):
+    __tablename__ = "payment_archive"
+    __table_args__ = (
+        Index("ix_payment_archive_order_id", "order_id"),
+        Index("ix_payment_archive_status_created_at", "status", "created_at"),
+        Index("ix_payment_archive_status_order_id", "status", "order_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_id = Column(Integer, nullable=False)
+    amount = Column(Float, nullable=False)
+    status = Column(SqlEnum(PaymentStatus), nullable=False)
+    payment_method = Column(SqlEnum(PaymentMethod), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    gateway_reference = Column(String(64), nullable=True)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PaymentArchive {self.id}>"
@@ -1,10 +1,16 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Float, Index, DDL, event, JSON
 from sqlalchemy.orm import relationship
 from config.config import db
 
 class ArtWork(db.Model):
     __tablename__ = 'artworks'
+    __table_args__ = (
+        Index('ix_artworks_available_created_at', 'is_available', 'created_at', 'id'),
+        Index('ix_artworks_available_price', 'is_available', 'price', 'id'),
+        Index('ix_artworks_category_available_created_at', 'category', 'is_available', 'created_at', 'id'),
+        Index('ix_artworks_artist_created_at', 'artist_id', 'created_at'),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(30), nullable=False)
@@ -14,9 +20,36 @@ class ArtWork(db.Model):
     category = Column(String(30), nullable=False)
     is_available = Column(Boolean, nullable=False, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    derivatives = Column(JSON, nullable=True)
 
     artist_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     artist = relationship("User", backref="artworks")
 
     def __repr__(self):
         return f"<ArtWork {self.id}>"
+
+
+# Full-text index over name/description/category. It is an external-content
+# FTS5 table, so it stores only the index and is kept in step with artworks by
+# triggers; the same DDL ships in the add_artwork_search migration.
+ARTWORK_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS artworks_fts USING fts5("
+    "name, description, category, content='artworks', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "INSERT INTO artworks_fts(artworks_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 5.0)')",
+    "CREATE TRIGGER IF NOT EXISTS artworks_fts_ai AFTER INSERT ON artworks BEGIN "
+    "INSERT INTO artworks_fts(rowid, name, description, category) "
+    "VALUES (new.id, new.name, new.description, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS artworks_fts_ad AFTER DELETE ON artworks BEGIN "
+    "INSERT INTO artworks_fts(artworks_fts, rowid, name, description, category) "
+    "VALUES ('delete', old.id, old.name, old.description, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS artworks_fts_au AFTER UPDATE OF name, description, category ON artworks BEGIN "
+    "INSERT INTO artworks_fts(artworks_fts, rowid, name, description, category) "
+    "VALUES ('delete', old.id, old.name, old.description, old.category); "
+    "INSERT INTO artworks_fts(rowid, name, description, category) "
+    "VALUES (new.id, new.name, new.description, new.category); END",
+)
+
+for statement in ARTWORK_SEARCH_DDL:
+    event.listen(ArtWork.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(ArtWork.__table__, "before_drop", DDL("DROP TABLE IF EXISTS artworks_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String
+from config.config import db
+
+CATEGORY = 'category'
+PRICE_BAND = 'price_band'
+
+# (label, lower bound inclusive, upper bound exclusive or None)
+PRICE_BANDS = (
+    ('0-100', 0, 100),
+    ('100-500', 100, 500),
+    ('500-1000', 500, 1000),
+    ('1000-5000', 1000, 5000),
+    ('5000+', 5000, None),
+)
+
+
+def price_band(price: float) -> str:
+    for label, lower, upper in PRICE_BANDS:
+        if price >= lower and (upper is None or price < upper):
+            return label
+    return PRICE_BANDS[0][0]
+
+
+class ArtworkFacet(db.Model):
+    __tablename__ = 'artwork_facets'
+
+    facet = Column(String(20), primary_key=True)
+    value = Column(String(30), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ArtworkFacet {self.facet}={self.value}: {self.count}>"
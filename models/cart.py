@@ -1,15 +1,21 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from datetime import datetime
 from config.config import db
 from sqlalchemy.orm import relationship
 
 class Cart(db.Model):
     __tablename__ = 'carts'
+    __table_args__ = (
+        Index('ix_carts_buyer_id', 'buyer_id'),
+    )
 
     cart_id = Column(Integer, primary_key=True)
     buyer_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Fences write-behind flushes: a cart's lines are only replaced by a newer
+    # snapshot, and checkout bumps it so snapshots taken before it are stale.
+    version = Column(Integer, nullable=False, default=0, server_default='0')
 
     buyer = relationship("User", backref="carts")
     items = relationship("CartItem", backref="cart", cascade="all, delete-orphan")
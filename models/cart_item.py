@@ -1,15 +1,20 @@
-from sqlalchemy import Column, Integer, ForeignKey, Float
+from sqlalchemy import Column, Integer, ForeignKey, Float, Index, Boolean, true
 from sqlalchemy.orm import relationship
 from config.config import db
 
 class CartItem(db.Model):
     __tablename__ = 'cart_items'
+    __table_args__ = (
+        Index('uq_cart_items_cart_artwork', 'cart_id', 'artwork_id', unique=True),
+        Index('ix_cart_items_artwork_id', 'artwork_id'),
+    )
 
     id = Column(Integer, primary_key=True)
     cart_id = Column(Integer, ForeignKey('carts.cart_id'), nullable=False)
     artwork_id = Column(Integer, ForeignKey('artworks.id'), nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
     subtotal = Column(Float, nullable=False)
+    is_available = Column(Boolean, nullable=False, default=True, server_default=true())
 
     artwork = relationship("ArtWork", backref="cart_items")
 
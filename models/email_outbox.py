@@ -0,0 +1,39 @@
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SqlEnum, Index
+from config.config import db
+
+
+class OutboxStatus(Enum):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    DEAD = "DEAD"
+
+
+class EmailOutbox(db.Model):
+    # Emails waiting to go out. A row is written in the same transaction as
+    # whatever caused it, so an email exists exactly when its cause committed.
+    # PENDING rows are a work queue leased through next_attempt_at, like
+    # payments; DEAD rows are the dead letters, kept with their last error.
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # (status, next_attempt_at) rather than a partial index on PENDING,
+        # which the bound status parameter in claim_due keeps SQLite from using.
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+        Index("ix_email_outbox_status_created_at", "status", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(30), nullable=False)
+    recipient = Column(String(120), nullable=False)
+    subject = Column(String(200), nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(SqlEnum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String(200), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} {self.kind} {self.status.value}>"
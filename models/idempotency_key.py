@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime, Index
+from config.config import db
+
+
+class IdempotencyKey(db.Model):
+    # One row per (scope, client key). The row is claimed, and its response
+    # (the JSON replayed for repeats) stored, in the same transaction as the
+    # work it guards; completed_at records when that transaction finished.
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+
+    scope = Column(String(50), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    response = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.scope}:{self.key}>"
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, Integer, ForeignKey, Enum as SqlEnum, Float, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Enum as SqlEnum, Float, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from config.config import db
 
@@ -12,8 +12,44 @@ class OrderStatus(Enum):
     COMPLETED = "COMPLETED"
     CANCELED = "CANCELED"
 
+# Which statuses an order may move to from each status. COMPLETED and
+# CANCELED are final.
+ORDER_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.PAID, OrderStatus.CANCELED},
+    OrderStatus.PAID: {OrderStatus.SHIPPED, OrderStatus.CANCELED},
+    OrderStatus.SHIPPED: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: {OrderStatus.COMPLETED},
+    OrderStatus.COMPLETED: set(),
+    OrderStatus.CANCELED: set(),
+}
+
+
+# Closed orders never change again; they become eligible for archiving once
+# they have been closed for long enough.
+CLOSED_STATUSES = frozenset({OrderStatus.COMPLETED, OrderStatus.CANCELED})
+
+
+def can_transition(from_status: OrderStatus, to_status: OrderStatus) -> bool:
+    return to_status in ORDER_TRANSITIONS[from_status]
+
+
+def allowed_from(to_status: OrderStatus) -> set:
+    return {status for status, targets in ORDER_TRANSITIONS.items() if to_status in targets}
+
+
 class Order(db.Model):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_buyer_created_at", "buyer_id", "created_at"),
+        Index("ix_orders_artwork_id", "artwork_id"),
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        Index("ix_orders_created_at", "created_at"),
+        Index("ix_orders_total_price", "total_price"),
+        Index("ix_orders_closed_at", "closed_at", sqlite_where=text("closed_at IS NOT NULL")),
+        # Archiving deletes the newest ids too; a new order must never get one
+        # back, or it would collide with its namesake in orders_archive.
+        {'sqlite_autoincrement': True},
+    )
 
     id = Column(Integer, primary_key=True)
     buyer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -22,9 +58,10 @@ class Order(db.Model):
     quantity = Column(Integer, default=1)
     status = Column(SqlEnum(OrderStatus), nullable=False, default=OrderStatus.PENDING)
     created_at = Column(DateTime, default=datetime.utcnow)
+    closed_at = Column(DateTime, nullable=True)
 
     buyer = relationship("User", backref="orders")
-    artwork = relationship("Artwork", backref="orders")
+    artwork = relationship("ArtWork", backref="orders")
 
     def __repr__(self):
         return f"<Order {self.id}>"
@@ -1,7 +1,7 @@
 from enum import Enum
 from datetime import datetime
 from config.config import db
-from sqlalchemy import Column, Integer, ForeignKey, Float, Enum as SqlEnum, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Float, Enum as SqlEnum, DateTime, Index, String, text
 from sqlalchemy.orm import relationship
 
 class PaymentStatus(Enum):
@@ -15,6 +15,19 @@ class PaymentMethod(Enum):
 
 class Payment(db.Model):
     __tablename__ = "payment"
+    __table_args__ = (
+        Index("ix_payment_order_id", "order_id"),
+        Index("ix_payment_status_created_at", "status", "created_at"),
+        Index("ix_payment_created_at", "created_at"),
+        Index("ix_payment_amount", "amount"),
+        Index("ix_payment_status_order_id", "status", "order_id"),
+        # Serves the worker's "PENDING and due, oldest first" claim. A partial
+        # index on status = 'PENDING' loses to ix_payment_status_created_at,
+        # because the query binds the status as a parameter.
+        Index("ix_payment_status_next_attempt_at", "status", "next_attempt_at"),
+        # Same as orders: archived payment ids are never handed out again.
+        {'sqlite_autoincrement': True},
+    )
 
     id = Column(Integer, primary_key=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
@@ -22,6 +35,14 @@ class Payment(db.Model):
     status = Column(SqlEnum(PaymentStatus), default=PaymentStatus.PENDING, nullable=False)
     payment_method = Column(SqlEnum(PaymentMethod), nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # PENDING payments are the work queue. A worker claims one by pushing
+    # next_attempt_at past a lease and bumping attempts; a retry pushes it
+    # out by the backoff instead.
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow,
+                             server_default=text("CURRENT_TIMESTAMP"))
+    last_error = Column(String(200), nullable=True)
+    gateway_reference = Column(String(64), nullable=True)
 
     order = relationship("Order", backref="payments")
 
@@ -0,0 +1,62 @@
+from datetime import datetime
+from enum import Enum
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum as SqlEnum, Index
+from config.config import db
+
+
+class DiscrepancyKind(Enum):
+    MISSING_PAYMENT = "MISSING_PAYMENT"
+    AMOUNT_MISMATCH = "AMOUNT_MISMATCH"
+    DUPLICATE_PAYMENT = "DUPLICATE_PAYMENT"
+    UNPAID_ORDER_CHARGED = "UNPAID_ORDER_CHARGED"
+    ORPHAN_PAYMENT = "ORPHAN_PAYMENT"
+
+
+class ReconciliationRun(db.Model):
+    __tablename__ = "reconciliation_runs"
+
+    id = Column(Integer, primary_key=True)
+    chunk_size = Column(Integer, nullable=False)
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ReconciliationRun {self.id}>"
+
+
+# How far a run has got through one source (live or archived orders). It is
+# written in the same transaction as the chunk's discrepancies, so a resumed
+# run neither skips nor repeats a chunk.
+class ReconciliationCheckpoint(db.Model):
+    __tablename__ = "reconciliation_checkpoints"
+
+    run_id = Column(Integer, ForeignKey("reconciliation_runs.id"), primary_key=True)
+    source = Column(String(10), primary_key=True)
+    last_order_id = Column(Integer, nullable=False, default=0)
+    orders_checked = Column(Integer, nullable=False, default=0)
+    payments_checked = Column(Integer, nullable=False, default=0)
+    discrepancies = Column(Integer, nullable=False, default=0)
+    completed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ReconciliationCheckpoint {self.run_id}:{self.source}>"
+
+
+class ReconciliationDiscrepancy(db.Model):
+    __tablename__ = "reconciliation_discrepancies"
+    __table_args__ = (
+        Index("ix_reconciliation_discrepancies_run_id", "run_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey("reconciliation_runs.id"), nullable=False)
+    source = Column(String(10), nullable=False)
+    kind = Column(SqlEnum(DiscrepancyKind), nullable=False)
+    order_id = Column(Integer, nullable=False)
+    payment_id = Column(Integer, nullable=True)
+    order_status = Column(String(20), nullable=True)
+    expected_amount = Column(Float, nullable=True)
+    actual_amount = Column(Float, nullable=True)
+
+    def __repr__(self):
+        return f"<ReconciliationDiscrepancy {self.kind.value} order {self.order_id}>"
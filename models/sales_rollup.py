@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Index
+from config.config import db
+from models.order import OrderStatus
+
+# An order counts as a sale from the moment it is paid until it is canceled;
+# shipping, delivery and completion do not change the numbers.
+REVENUE_STATUSES = frozenset({OrderStatus.PAID, OrderStatus.SHIPPED, OrderStatus.DELIVERED, OrderStatus.COMPLETED})
+
+
+class ArtistDailySales(db.Model):
+    __tablename__ = 'sales_by_artist_day'
+
+    artist_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<ArtistDailySales {self.artist_id} {self.day}: {self.revenue}>"
+
+
+class CategoryDailySales(db.Model):
+    __tablename__ = 'sales_by_category_day'
+    __table_args__ = (
+        Index('ix_sales_by_category_day_day', 'day'),
+    )
+
+    category = Column(String(30), primary_key=True)
+    day = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<CategoryDailySales {self.category} {self.day}: {self.revenue}>"
+
+
+class BuyerLifetimeValue(db.Model):
+    __tablename__ = 'buyer_lifetime_value'
+    __table_args__ = (
+        Index('ix_buyer_lifetime_value_revenue', 'revenue'),
+    )
+
+    buyer_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<BuyerLifetimeValue {self.buyer_id}: {self.revenue}>"
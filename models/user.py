@@ -1,7 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from passlib.hash import bcrypt
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SqlEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SqlEnum, Index, text
 from config.config import db
 
 class Role(Enum):
@@ -11,22 +10,26 @@ class Role(Enum):
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        Index('ix_users_created_at', 'created_at'),
+        Index('ix_users_role_created_at', 'role', 'created_at'),
+        # Never hand a deleted user's id to a new signup: access tokens name
+        # the user by id, and the newcomer would inherit them.
+        {'sqlite_autoincrement': True},
+    )
 
     id = Column(Integer, primary_key=True)
     first_name = Column(String(30), nullable=False)
     last_name = Column(String(30), nullable=False)
     email = Column(String(120), nullable=False, unique=True)
+    # A bcrypt hash; UserService does the hashing, the model stores it as is.
     password = Column(String(120), nullable=False)
     role = Column(SqlEnum(Role), default=Role.BUYER,  nullable=False)
     is_verified = Column(Boolean, nullable=False, default=False)
     verification_code = Column(String(120), nullable=False, unique=True)
     created_at = Column(DateTime, nullable=True, default=datetime.utcnow)
-
-    def set_password(self, password: str):
-        self.password = bcrypt.hash(password)
-
-    def check_password(self, password: str) -> bool:
-        return bcrypt.verify(password, self.password)
+    # Stamped into every access token; bumping it revokes all of them.
+    token_version = Column(Integer, nullable=False, default=0, server_default=text("0"))
 
     def __repr__(self):
         return f"<User {self.email}>"
\ No newline at end of file
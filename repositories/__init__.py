@@ -0,0 +1,9 @@
+from repositories.archive_repo import ArchiveRepository
+from repositories.artwork_repo import ArtworkRepository
+from repositories.cart_repo import CartRepository
+from repositories.facet_repo import FacetRepository
+from repositories.idempotency_repo import IdempotencyRepository
+from repositories.order_repo import OrderRepository
+from repositories.payment_repo import PaymentRepository
+from repositories.rollup_repo import RollupRepository
+from repositories.user_repo import UserRepository
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Tuple
+from sqlalchemy import DateTime, delete, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+from config.config import db
+from models.archive import OrderArchive, PaymentArchive
+from models.order import Order
+from models.payment import Payment
+
+ARCHIVED_ORDER_COLUMNS = ('id', 'buyer_id', 'artwork_id', 'total_price', 'quantity', 'status', 'created_at',
+                          'closed_at')
+ARCHIVED_PAYMENT_COLUMNS = ('id', 'order_id', 'amount', 'status', 'payment_method', 'created_at',
+                            'gateway_reference')
+
+
+class ArchiveRepository:
+    @staticmethod
+    def archive_batch(closed_before: datetime, batch_size: int = 500) -> Tuple[int, int]:
+        # Moves at most batch_size orders closed before the cutoff, with their
+        # payments, in one short transaction. Copying the orders comes first so
+        # the batch holds the write lock before it reads anything else. Only
+        # closed orders have a closed_at, so the batch is a range read on the
+        # partial closed_at index rather than a walk over every closed order.
+        archived_at = literal(datetime.utcnow(), DateTime)
+        try:
+            order_ids = db.session.scalars(
+                insert(OrderArchive).from_select(
+                    ARCHIVED_ORDER_COLUMNS + ('archived_at',),
+                    select(*(getattr(Order, column) for column in ARCHIVED_ORDER_COLUMNS), archived_at)
+                    .where(Order.closed_at < closed_before)
+                    .order_by(Order.closed_at, Order.id)
+                    .limit(batch_size)
+                ).returning(OrderArchive.id)
+            ).all()
+            if not order_ids:
+                db.session.rollback()
+                return 0, 0
+            payments = db.session.execute(
+                insert(PaymentArchive).from_select(
+                    ARCHIVED_PAYMENT_COLUMNS + ('archived_at',),
+                    select(*(getattr(Payment, column) for column in ARCHIVED_PAYMENT_COLUMNS), archived_at)
+                    .where(Payment.order_id.in_(order_ids))
+                )
+            ).rowcount
+            db.session.execute(delete(Payment).where(Payment.order_id.in_(order_ids)))
+            db.session.execute(delete(Order).where(Order.id.in_(order_ids)))
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            raise ValueError("Failed to archive closed orders.") from e
+        return len(order_ids), payments
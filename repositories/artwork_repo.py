@@ -1,7 +1,50 @@
-from typing import Optional, List, Dict, Any
+import re
+from collections import Counter
+from typing import Optional, List, Dict, Any, Sequence, Tuple
+from sqlalchemy import select, func, table, column, literal_column, insert, update, true, false
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 from config.config import db
+from models.archive import OrderArchive
 from models.artwork import ArtWork
+from models.order import Order, OrderStatus
+from models.sales_rollup import REVENUE_STATUSES
+from repositories.cache import artwork_cache
+from repositories.cart_repo import CartRepository
+from repositories.facet_repo import FacetRepository, facet_keys
+from repositories.pagination import keyset_page
+
+SORT_COLUMNS = {
+    'created_at': ArtWork.created_at,
+    'price': ArtWork.price,
+    'id': ArtWork.id,
+}
+
+SEARCH_FILTERS = {'category', 'min_price', 'max_price', 'artist_id', 'is_available'}
+
+artworks_fts = table('artworks_fts', column('rowid'), column('rank'))
+
+# highlight() and snippet() wrap matches in these control characters rather
+# than in tags; the artist's text is HTML-escaped before they become <mark>.
+MARK_OPEN, MARK_CLOSE = '\x02', '\x03'
+HTML_ESCAPES = (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'), ("'", '&#x27;'))
+
+
+def marked_html(expression):
+    for character, entity in HTML_ESCAPES:
+        expression = func.replace(expression, character, entity)
+    return func.replace(func.replace(expression, MARK_OPEN, '<mark>'), MARK_CLOSE, '</mark>')
+
+
+def build_match_expression(query: str) -> Optional[str]:
+    # Quote every term so user input can never be parsed as FTS5 syntax, and let
+    # the last one match as a prefix so partially typed words still hit.
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
 
 class ArtworkRepository:
     @staticmethod
@@ -18,6 +61,7 @@ class ArtworkRepository:
                 is_available=is_available
             )
             db.session.add(artwork)
+            FacetRepository.apply_changes(Counter(facet_keys(category, price, is_available)))
             db.session.commit()
             db.session.refresh(artwork)
             return artwork
@@ -25,9 +69,49 @@ class ArtworkRepository:
             db.session.rollback()
             raise ValueError("Unable to create new Artwork. Probably invalid artist id or duplicate error.") from e
 
+    @staticmethod
+    def bulk_create_artworks(rows: List[Dict[str, Any]]) -> List[Row]:
+        try:
+            created = db.session.execute(
+                insert(ArtWork).returning(ArtWork.id, ArtWork.image_url, sort_by_parameter_order=True), rows
+            ).all()
+            FacetRepository.apply_changes(Counter(
+                key for row in rows
+                for key in facet_keys(row.get('category'), row.get('price'), row.get('is_available', True))
+            ))
+            db.session.commit()
+            return created
+        except IntegrityError as e:
+            db.session.rollback()
+            raise ValueError("Unable to create Artworks. Probably invalid artist id or missing fields.") from e
+
+    @staticmethod
+    def create_artworks_isolated(rows: List[Dict[str, Any]]) -> List[Tuple[Optional[Row], Optional[str]]]:
+        # One transaction for the whole chunk, but each row in its own savepoint,
+        # so a bad row is reported without discarding its neighbours.
+        results, facets = [], Counter()
+        for row in rows:
+            try:
+                with db.session.begin_nested():
+                    created = db.session.execute(
+                        insert(ArtWork).returning(ArtWork.id, ArtWork.image_url), row
+                    ).one()
+                results.append((created, None))
+                facets.update(facet_keys(row.get('category'), row.get('price'), row.get('is_available', True)))
+            except IntegrityError as e:
+                results.append((None, str(e.orig)))
+        FacetRepository.apply_changes(facets)
+        db.session.commit()
+        return results
+
     @staticmethod
     def find_by_artwork_id(artwork_id: int) -> Optional[ArtWork]:
-        return db.session.get(ArtWork, artwork_id)
+        artwork = artwork_cache.get(artwork_id)
+        if artwork is None:
+            artwork = db.session.get(ArtWork, artwork_id)
+            if artwork is not None:
+                artwork_cache.put(artwork)
+        return artwork
 
     @staticmethod
     def find_by_artist_id(artist_id: int) -> List[ArtWork]:
@@ -37,28 +121,168 @@ class ArtworkRepository:
     def find_all_available() -> List[ArtWork]:
         return db.session.query(ArtWork).filter(ArtWork.is_available.is_(True)).all()
 
+    @staticmethod
+    def find_all_available_rows(fields: Sequence[str]) -> List[Row]:
+        return db.session.execute(
+            select(*[getattr(ArtWork, field) for field in fields]).where(ArtWork.is_available.is_(True))
+        ).all()
+
+    @staticmethod
+    def browse_available(category: Optional[str] = None, min_price: Optional[float] = None,
+                         max_price: Optional[float] = None, artist_id: Optional[int] = None,
+                         sort_by: str = 'created_at', descending: bool = True, limit: int = 20,
+                         cursor: Optional[str] = None) -> Tuple[List[ArtWork], Optional[str]]:
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort artworks by '{sort_by}'")
+        query = db.session.query(ArtWork).filter(ArtWork.is_available.is_(True))
+        if category is not None:
+            query = query.filter(ArtWork.category == category)
+        if min_price is not None:
+            query = query.filter(ArtWork.price >= min_price)
+        if max_price is not None:
+            query = query.filter(ArtWork.price <= max_price)
+        if artist_id is not None:
+            query = query.filter(ArtWork.artist_id == artist_id)
+        return keyset_page(query, SORT_COLUMNS[sort_by], ArtWork.id, limit, cursor, descending)
+
+    @staticmethod
+    def search(query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 20) -> List[Row]:
+        filters = dict(filters or {})
+        unknown = set(filters) - SEARCH_FILTERS
+        if unknown:
+            raise ValueError(f"Unsupported search filters: {', '.join(sorted(unknown))}")
+        match = build_match_expression(query)
+        if match is None:
+            return []
+
+        fts = literal_column('artworks_fts')
+        statement = (
+            select(
+                ArtWork.id, ArtWork.name, ArtWork.description, ArtWork.price, ArtWork.image_url,
+                ArtWork.category, ArtWork.is_available, ArtWork.created_at, ArtWork.artist_id, ArtWork.derivatives,
+                (-artworks_fts.c.rank).label('score'),
+                marked_html(func.highlight(fts, 0, MARK_OPEN, MARK_CLOSE)).label('highlighted_name'),
+                marked_html(func.snippet(fts, 1, MARK_OPEN, MARK_CLOSE, '…', 12)).label('snippet'),
+            )
+            .select_from(artworks_fts.join(ArtWork, ArtWork.id == artworks_fts.c.rowid))
+            .where(fts.op('MATCH')(match))
+        )
+        statement = statement.where(ArtWork.is_available.is_(filters.pop('is_available', True)))
+        if filters.get('category') is not None:
+            statement = statement.where(ArtWork.category == filters['category'])
+        if filters.get('min_price') is not None:
+            statement = statement.where(ArtWork.price >= filters['min_price'])
+        if filters.get('max_price') is not None:
+            statement = statement.where(ArtWork.price <= filters['max_price'])
+        if filters.get('artist_id') is not None:
+            statement = statement.where(ArtWork.artist_id == filters['artist_id'])
+        return db.session.execute(statement.order_by(artworks_fts.c.rank).limit(limit)).all()
+
     @staticmethod
     def update_artwork(artwork_id: int, updated_data: Dict[str, Any]) -> Optional[ArtWork]:
-        artwork = ArtworkRepository.find_by_artwork_id(artwork_id)
-        if not artwork:
+        # The facet and reprice deltas are diffs against the row as it is now,
+        # so take the write lock before reading it: the no-op UPDATE opens a
+        # fresh transaction with a write, and a concurrent update of the same
+        # artwork waits for it instead of diffing against the same old row.
+        # populate_existing replaces any copy merged in from the cache.
+        db.session.commit()
+        locked = db.session.execute(
+            update(ArtWork).where(ArtWork.id == artwork_id).values(id=ArtWork.id).returning(ArtWork.id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if locked is None:
+            db.session.rollback()
             return None
-        allowed_fields = {'name', 'description', 'image_url', 'price', 'category', 'artist_id', 'is_available'}
+        artwork = db.session.get(ArtWork, artwork_id, populate_existing=True)
+        allowed_fields = {'name', 'description', 'image_url', 'price', 'category', 'artist_id', 'is_available',
+                          'derivatives'}
+        # Sales rollups attribute revenue through the artwork's current artist
+        # and category, so once it has sold they are fixed: a later
+        # cancellation would otherwise come off a different rollup row.
+        reattributed = any(key in updated_data and updated_data[key] != getattr(artwork, key)
+                           for key in ('category', 'artist_id'))
+        if reattributed and ArtworkRepository.has_sales(artwork_id):
+            db.session.rollback()
+            raise ValueError("Cannot change the category or artist of an artwork that has sales")
+        facets_before = facet_keys(artwork.category, artwork.price, artwork.is_available)
+        pricing_before = (artwork.price, artwork.is_available)
         for key, value in updated_data.items():
             if key in allowed_fields:
                 setattr(artwork, key, value)
         try:
+            FacetRepository.apply_changes(FacetRepository.changes_between(
+                facets_before, facet_keys(artwork.category, artwork.price, artwork.is_available)
+            ))
+            if (artwork.price, artwork.is_available) != pricing_before:
+                db.session.flush()
+                CartRepository.reprice_lines([artwork_id])
             db.session.commit()
+            artwork_cache.invalidate(artwork_id)
             db.session.refresh(artwork)
             return artwork
         except IntegrityError as e:
             db.session.rollback()
             raise ValueError("Unable to update Artwork. Probably invalid artist id or duplicate error.") from e
 
+    @staticmethod
+    def has_sales(artwork_id: int) -> bool:
+        return any(
+            db.session.execute(select(model.id).where(model.artwork_id == artwork_id,
+                                                      model.status.in_(REVENUE_STATUSES)).limit(1)).first()
+            is not None
+            for model in (Order, OrderArchive)
+        )
+
+    @staticmethod
+    def reserve_artworks(artwork_ids: List[int]) -> Dict[int, Row]:
+        # Marks the artworks sold in one conditional UPDATE. SQLite serializes
+        # writers, so when two buyers race for the same piece the second UPDATE
+        # sees is_available already cleared and matches no row. Artworks missing
+        # from the result were not reserved. Runs in the caller's transaction.
+        reserved = db.session.execute(
+            update(ArtWork)
+            .where(ArtWork.id.in_(artwork_ids), ArtWork.is_available == true())
+            .values(is_available=False)
+            .returning(ArtWork.id, ArtWork.price, ArtWork.category)
+        ).all()
+        if reserved:
+            FacetRepository.apply_changes(FacetRepository.changes_between(
+                [key for row in reserved for key in facet_keys(row.category, row.price, True)], []
+            ))
+            CartRepository.reprice_lines([row.id for row in reserved])
+        return {row.id: row for row in reserved}
+
+    @staticmethod
+    def release_artworks(artwork_ids: List[int]) -> List[int]:
+        # Puts artworks back on sale once their order is canceled, unless some
+        # other order, live or archived, still holds them. Runs in the caller's transaction;
+        # callers invalidate the cache after they commit.
+        live_order = select(Order.id).where(Order.artwork_id == ArtWork.id, Order.status != OrderStatus.CANCELED)
+        sold_order = select(OrderArchive.id).where(OrderArchive.artwork_id == ArtWork.id,
+                                                   OrderArchive.status != OrderStatus.CANCELED)
+        released = db.session.execute(
+            update(ArtWork)
+            .where(ArtWork.id.in_(artwork_ids), ArtWork.is_available == false(), ~live_order.exists(),
+                   ~sold_order.exists())
+            .values(is_available=True)
+            .returning(ArtWork.id, ArtWork.price, ArtWork.category)
+        ).all()
+        if released:
+            FacetRepository.apply_changes(FacetRepository.changes_between(
+                [], [key for row in released for key in facet_keys(row.category, row.price, True)]
+            ))
+            CartRepository.reprice_lines([row.id for row in released])
+        return [row.id for row in released]
+
     @staticmethod
     def delete_artwork(artwork_id: int) -> bool:
-        artwork = ArtworkRepository.find_by_artwork_id(artwork_id)
+        artwork = db.session.get(ArtWork, artwork_id, populate_existing=True)
         if not artwork:
             return False
+        FacetRepository.apply_changes(FacetRepository.changes_between(
+            facet_keys(artwork.category, artwork.price, artwork.is_available), []
+        ))
         db.session.delete(artwork)
         db.session.commit()
+        artwork_cache.invalidate(artwork_id)
         return True
\ No newline at end of file
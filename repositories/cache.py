@@ -0,0 +1,195 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Dict, Optional, Callable
+import redis
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from config.config import db
+from config.sqlite import after_commit
+from models.artwork import ArtWork
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class NullCacheBackend:
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        self.stats.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        pass
+
+
+class InMemoryCacheBackend:
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    # Entries are plain keys with a Redis TTL; a sorted set of last-access times
+    # per namespace gives exact LRU eviction once max_entries is exceeded.
+    def __init__(self, client, namespace: str = "artwork", max_entries: int = 10_000,
+                 ttl_seconds: float = 300, clock: Callable[[], float] = time.time):
+        self.client = client
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.stats = CacheStats()
+        self._lru_key = f"{namespace}:lru"
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            self.client.zrem(self._lru_key, key)
+            self.stats.misses += 1
+            return None
+        self.client.zadd(self._lru_key, {key: self.clock()})
+        self.stats.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        pipe = self.client.pipeline()
+        pipe.set(self._key(key), json.dumps(value), px=int(self.ttl_seconds * 1000))
+        pipe.zadd(self._lru_key, {key: self.clock()})
+        pipe.zcard(self._lru_key)
+        size = pipe.execute()[-1]
+        if size > self.max_entries:
+            evicted = self.client.zpopmin(self._lru_key, size - self.max_entries)
+            if evicted:
+                self.client.delete(*(self._key(member.decode() if isinstance(member, bytes) else member)
+                                     for member, _ in evicted))
+                self.stats.evictions += len(evicted)
+
+    def delete(self, key: str) -> None:
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(key))
+        pipe.zrem(self._lru_key, key)
+        pipe.execute()
+        self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        members = self.client.zrange(self._lru_key, 0, -1)
+        keys = [self._key(m.decode() if isinstance(m, bytes) else m) for m in members]
+        self.client.delete(self._lru_key, *keys)
+
+
+class ArtworkCache:
+    # Read-through cache for single artwork lookups. Rows are stored as plain
+    # column dicts and re-attached to the current session on a hit without
+    # querying, so callers get a normal persistent ArtWork either way.
+    def __init__(self, backend=None):
+        self.backend = backend or InMemoryCacheBackend()
+
+    def configure(self, backend) -> None:
+        self.backend = backend
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.backend.stats
+
+    def get(self, artwork_id: int) -> Optional[ArtWork]:
+        in_session = db.session.identity_map.get(db.session.identity_key(ArtWork, artwork_id))
+        if in_session is not None:
+            return in_session
+        data = self.backend.get(str(artwork_id))
+        if data is None:
+            return None
+        data = dict(data)
+        if data.get("created_at"):
+            data["created_at"] = datetime.fromisoformat(data["created_at"])
+        artwork = ArtWork(**data)
+        make_transient_to_detached(artwork)
+        return db.session.merge(artwork, load=False)
+
+    def put(self, artwork: ArtWork) -> None:
+        data = {attr.key: getattr(artwork, attr.key) for attr in inspect(ArtWork).column_attrs}
+        if data.get("created_at"):
+            data["created_at"] = data["created_at"].isoformat()
+        self.backend.set(str(artwork.id), data)
+
+    def invalidate(self, artwork_id: int) -> None:
+        # Until the change is durable the cached row is still the committed
+        # one; dropping it earlier would let a reader re-cache the old row.
+        after_commit(lambda: self.backend.delete(str(artwork_id)))
+
+
+def build_cache_backend(config, prefix: str = "ARTWORK_CACHE", namespace: str = "artwork",
+                        default_ttl: float = 300) -> Any:
+    kind = config.get(f"{prefix}_BACKEND", "memory")
+    max_entries = config.get(f"{prefix}_MAX_ENTRIES", 10_000)
+    ttl_seconds = config.get(f"{prefix}_TTL", default_ttl)
+    if kind == "memory":
+        return InMemoryCacheBackend(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    if kind == "redis":
+        client = redis.Redis.from_url(config.get("REDIS_URL", "redis://localhost:6379/0"))
+        return RedisCacheBackend(client, namespace=namespace, max_entries=max_entries, ttl_seconds=ttl_seconds)
+    if kind == "none":
+        return NullCacheBackend()
+    raise ValueError(f"Unknown {namespace} cache backend '{kind}'")
+
+
+artwork_cache = ArtworkCache()
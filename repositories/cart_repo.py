@@ -1,10 +1,56 @@
-from typing import Optional
+import json
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy import func, text, update
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import SQLAlchemyError
 from config.config import db
 from models.artwork import ArtWork
 from models.cart import Cart
 from models.cart_item import CartItem
 
+# One statement for every line: the artwork price is read by the INSERT itself,
+# and an existing line has its quantity bumped and subtotal recomputed in place.
+# The lines travel as a single JSON parameter so any basket size runs the same
+# SQL, and it is plain text because SQLAlchemy never caches dialect upserts.
+_INSERT_CART_LINES = (
+    "INSERT INTO cart_items (cart_id, artwork_id, quantity, subtotal, is_available) "
+    "SELECT :cart_id, artworks.id, json_extract(requested.value, '$[1]'), "
+    "artworks.price * json_extract(requested.value, '$[1]'), artworks.is_available "
+    "FROM json_each(:lines) AS requested "
+    "JOIN artworks ON artworks.id = json_extract(requested.value, '$[0]') "
+    "WHERE true "
+)
+CART_UPSERT = text(
+    _INSERT_CART_LINES +
+    "ON CONFLICT (cart_id, artwork_id) DO UPDATE SET "
+    "quantity = cart_items.quantity + excluded.quantity, "
+    "subtotal = (cart_items.quantity + excluded.quantity) * "
+    "(SELECT price FROM artworks WHERE artworks.id = excluded.artwork_id), "
+    "is_available = excluded.is_available "
+    "RETURNING artwork_id"
+)
+# Writing a cart's complete state (rather than a delta) is idempotent, which is
+# what lets a write-behind store replay a flush after a crash.
+CART_REPLACE = text(
+    _INSERT_CART_LINES +
+    "ON CONFLICT (cart_id, artwork_id) DO UPDATE SET "
+    "quantity = excluded.quantity, subtotal = excluded.subtotal, is_available = excluded.is_available"
+)
+# Claims each cart for a snapshot newer than the last one written (or than
+# its last checkout); only the carts it returns are rewritten.
+CART_FENCE = text(
+    "UPDATE carts SET version = json_extract(fenced.value, '$[1]') "
+    "FROM json_each(:versions) AS fenced "
+    "WHERE carts.cart_id = json_extract(fenced.value, '$[0]') "
+    "AND carts.version < json_extract(fenced.value, '$[1]') "
+    "RETURNING carts.cart_id"
+)
+CART_PRUNE = text(
+    "DELETE FROM cart_items WHERE cart_id = :cart_id AND artwork_id NOT IN "
+    "(SELECT json_extract(value, '$[0]') FROM json_each(:lines))"
+)
+
 
 class CartRepository:
 
@@ -20,42 +66,106 @@ class CartRepository:
 
     @staticmethod
     def add_to_cart(buyer_id: int, artwork_id: int, quantity: int = 1) -> Cart:
+        return CartRepository.add_many_to_cart(buyer_id, [(artwork_id, quantity)])
+
+    @staticmethod
+    def add_many_to_cart(buyer_id: int, items: Iterable[Tuple[int, int]]) -> Cart:
+        requested = Counter()
+        for artwork_id, quantity in items:
+            if quantity < 1:
+                raise ValueError("Quantity must be at least 1")
+            requested[artwork_id] += quantity
+        if not requested:
+            raise ValueError("No artworks to add")
+
         try:
-            cart = CartRepository.get_cart_or_create_cart(buyer_id)
-            artwork = db.session.get(ArtWork, artwork_id)
-            if not artwork:
-                raise ValueError("Artwork not found")
-
-            # FIXED: Changed cart.id to cart.cart_id
-            cart_item = db.session.query(CartItem).filter_by(
-                cart_id=cart.cart_id,
-                artwork_id=artwork_id
-            ).first()
+            cart = db.session.query(Cart).filter_by(buyer_id=buyer_id).first()
+            if not cart:
+                cart = Cart(buyer_id=buyer_id)
+                db.session.add(cart)
+                db.session.flush()
 
-            if cart_item:
-                cart_item.quantity += quantity
-                cart_item.subtotal = cart_item.quantity * artwork.price
-            else:
-                subtotal = artwork.price * quantity
-                new_item = CartItem(
-                    cart_id=cart.cart_id,
-                    artwork_id=artwork_id,
-                    quantity=quantity,
-                    subtotal=subtotal
-                )
-                db.session.add(new_item)
+            added = set(db.session.scalars(
+                CART_UPSERT, {'cart_id': cart.cart_id, 'lines': json.dumps(list(requested.items()))}
+            ))
+            missing = sorted(set(requested) - added)
+            if missing:
+                db.session.rollback()
+                raise ValueError(f"Artwork not found: {', '.join(map(str, missing))}")
 
             db.session.commit()
-            db.session.refresh(cart)
             return cart
         except SQLAlchemyError as e:
             db.session.rollback()
             raise RuntimeError(f"Database error {e.__class__.__name__} - {str(e)}") from e
 
+    @staticmethod
+    def replace_cart_lines(carts: Dict[int, Tuple[int, Dict[int, int]]]) -> Set[int]:
+        # Makes each cart hold exactly the given {artwork_id: quantity} lines,
+        # for every cart in one transaction, given {cart_id: (version, lines)}.
+        # Carts already at that version or later are left alone; returns the
+        # ids of the carts that were written.
+        if not carts:
+            return set()
+        versions = json.dumps([[cart_id, version] for cart_id, (version, _) in carts.items()])
+        try:
+            written = set(db.session.scalars(CART_FENCE, {'versions': versions}))
+            params = [{'cart_id': cart_id, 'lines': json.dumps(list(carts[cart_id][1].items()))}
+                      for cart_id in written]
+            if params:
+                db.session.execute(CART_PRUNE, params)
+                db.session.execute(CART_REPLACE, params)
+            db.session.commit()
+            return written
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise RuntimeError(f"Database error: {e.__class__.__name__} - {str(e)}") from e
+
+    @staticmethod
+    def reprice_lines(artwork_ids: Iterable[int]) -> int:
+        # A single UPDATE ... FROM artworks resets every cart line for these
+        # artworks to the current price and availability, however many carts
+        # hold them. Runs in the caller's transaction and does not commit.
+        statement = update(CartItem) \
+            .where(CartItem.artwork_id == ArtWork.id, ArtWork.id.in_(list(artwork_ids))) \
+            .values(subtotal=CartItem.quantity * ArtWork.price, is_available=ArtWork.is_available) \
+            .execution_options(synchronize_session=False)
+        return db.session.execute(statement).rowcount
+
+    # Every write above is already durable; flush_cart and evict exist so
+    # callers can treat the SQL and Redis cart repositories alike.
+    @staticmethod
+    def flush_cart(cart_id: int) -> None:
+        pass
+
+    @staticmethod
+    def evict(cart_id: int) -> None:
+        pass
+
     @staticmethod
     def get_cart_by_buyer(buyer_id: int) -> Optional[Cart]:
         return db.session.query(Cart).filter_by(buyer_id=buyer_id).first()
 
+    @staticmethod
+    def get_cart_view(buyer_id: int) -> Optional[Tuple[Cart, int, float]]:
+        # Two queries however big the cart is: the cart row with its totals
+        # summed by SQLite, then every line joined to its artwork.
+        # Lines for artworks that have since become unavailable stay visible
+        # (flagged) but do not count towards the totals.
+        row = db.session.query(
+            Cart,
+            func.coalesce(func.sum(CartItem.quantity).filter(CartItem.is_available), 0),
+            func.coalesce(func.sum(CartItem.subtotal).filter(CartItem.is_available), 0.0)
+        ).outerjoin(CartItem, CartItem.cart_id == Cart.cart_id) \
+            .filter(Cart.buyer_id == buyer_id) \
+            .group_by(Cart.cart_id) \
+            .options(selectinload(Cart.items).joinedload(CartItem.artwork)) \
+            .first()
+        if row is None:
+            return None
+        cart, item_count, total = row
+        return cart, item_count, total
+
     @staticmethod
     def remove_from_cart(cart_id: int, artwork_id: int) -> bool:
         try:
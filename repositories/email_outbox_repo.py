@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+from sqlalchemy import and_, bindparam, func, select, update
+from sqlalchemy.engine import Row
+from config.config import db
+from models.email_outbox import EmailOutbox, OutboxStatus
+
+
+class EmailOutcome(NamedTuple):
+    # What a dispatcher learned about one claimed email. status stays PENDING
+    # for a retry, with next_attempt_at set to when it may run again.
+    email_id: int
+    attempts: int
+    status: OutboxStatus
+    error: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
+
+
+class EmailOutboxRepository:
+    @staticmethod
+    def enqueue(kind: str, recipient: str, subject: str, body: str) -> EmailOutbox:
+        # Does not commit: the email commits or rolls back with the caller's
+        # transaction.
+        email = EmailOutbox(kind=kind, recipient=recipient, subject=subject, body=body)
+        db.session.add(email)
+        return email
+
+    @staticmethod
+    def claim_due(batch_size: int, lease_seconds: float, now: Optional[datetime] = None) -> List[Row]:
+        # Same shape as PaymentRepository.claim_due: lease a batch in one
+        # UPDATE ... RETURNING and commit, so nothing is held open during SMTP.
+        now = now or datetime.utcnow()
+        due = select(EmailOutbox.id)\
+            .where(EmailOutbox.status == OutboxStatus.PENDING, EmailOutbox.next_attempt_at <= now)\
+            .order_by(EmailOutbox.next_attempt_at)\
+            .limit(batch_size)
+        claimed = db.session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(due.scalar_subquery()))
+            .values(attempts=EmailOutbox.attempts + 1, next_attempt_at=now + timedelta(seconds=lease_seconds))
+            .returning(EmailOutbox.id, EmailOutbox.recipient, EmailOutbox.subject, EmailOutbox.body,
+                       EmailOutbox.attempts)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.session.commit()
+        return claimed
+
+    @staticmethod
+    def settle(outcomes: List[EmailOutcome], now: Optional[datetime] = None) -> int:
+        # One executemany UPDATE for the batch, fenced on attempts so a
+        # dispatcher whose lease ran out cannot overwrite a newer claim.
+        if not outcomes:
+            return 0
+        now = now or datetime.utcnow()
+        table = EmailOutbox.__table__
+        statement = update(table).where(and_(
+            table.c.id == bindparam('b_id'),
+            table.c.attempts == bindparam('b_attempts'),
+            table.c.status == OutboxStatus.PENDING,
+        )).values(
+            status=bindparam('b_status'),
+            last_error=bindparam('b_error'),
+            next_attempt_at=bindparam('b_next_attempt_at'),
+            sent_at=bindparam('b_sent_at'),
+        )
+        settled = db.session.execute(statement, [{
+            'b_id': outcome.email_id,
+            'b_attempts': outcome.attempts,
+            'b_status': outcome.status,
+            'b_error': outcome.error,
+            'b_next_attempt_at': outcome.next_attempt_at or now,
+            'b_sent_at': now if outcome.status == OutboxStatus.SENT else None,
+        } for outcome in outcomes]).rowcount
+        db.session.commit()
+        return settled
+
+    @staticmethod
+    def requeue_dead(ids: Optional[List[int]] = None) -> int:
+        # Gives dead letters a fresh set of attempts, e.g. after fixing the
+        # SMTP configuration.
+        statement = update(EmailOutbox).where(EmailOutbox.status == OutboxStatus.DEAD)
+        if ids is not None:
+            statement = statement.where(EmailOutbox.id.in_(ids))
+        requeued = db.session.execute(
+            statement.values(status=OutboxStatus.PENDING, attempts=0, next_attempt_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return requeued
+
+    @staticmethod
+    def queue_depth(now: Optional[datetime] = None) -> Tuple[int, int, int]:
+        # (due now, all pending, dead)
+        now = now or datetime.utcnow()
+        pending = EmailOutbox.status == OutboxStatus.PENDING
+        due, total = db.session.query(
+            func.count().filter(EmailOutbox.next_attempt_at <= now),
+            func.count(),
+        ).filter(pending).one()
+        dead = db.session.query(func.count()).filter(EmailOutbox.status == OutboxStatus.DEAD).scalar()
+        return due, total, dead
@@ -0,0 +1,88 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple, Optional
+from sqlalchemy import case, func, select, delete
+from sqlalchemy.dialects.sqlite import insert
+from config.config import db
+from models.artwork import ArtWork
+from models.artwork_facet import ArtworkFacet, CATEGORY, PRICE_BAND, PRICE_BANDS, price_band
+
+FacetKey = Tuple[str, str]
+
+
+def facet_keys(category: Optional[str], price: Optional[float], is_available: bool) -> List[FacetKey]:
+    # Sidebars count what a buyer can actually purchase, so unavailable
+    # artworks contribute to no facet at all.
+    if not is_available:
+        return []
+    keys = []
+    if category is not None:
+        keys.append((CATEGORY, category))
+    if price is not None:
+        keys.append((PRICE_BAND, price_band(price)))
+    return keys
+
+
+def price_band_expression():
+    return case(
+        *[(ArtWork.price < upper, label) for label, _, upper in PRICE_BANDS if upper is not None],
+        else_=PRICE_BANDS[-1][0]
+    )
+
+
+class FacetRepository:
+    @staticmethod
+    def apply_changes(deltas: Counter) -> None:
+        # Runs inside the caller's transaction so counts commit (or roll back)
+        # together with the artwork rows that caused them.
+        rows = [{'facet': facet, 'value': value, 'count': delta}
+                for (facet, value), delta in deltas.items() if delta]
+        if not rows:
+            return
+        statement = insert(ArtworkFacet)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ArtworkFacet.facet, ArtworkFacet.value],
+            set_={'count': ArtworkFacet.count + statement.excluded['count']}
+        )
+        db.session.execute(statement, rows)
+
+    @staticmethod
+    def changes_between(before: Iterable[FacetKey], after: Iterable[FacetKey]) -> Counter:
+        deltas = Counter(after)
+        deltas.subtract(Counter(before))
+        return deltas
+
+    @staticmethod
+    def get_facets() -> Dict[str, Dict[str, int]]:
+        facets = {CATEGORY: {}, PRICE_BAND: {}}
+        rows = db.session.query(ArtworkFacet.facet, ArtworkFacet.value, ArtworkFacet.count)\
+            .filter(ArtworkFacet.count > 0).all()
+        for facet, value, count in rows:
+            facets.setdefault(facet, {})[value] = count
+        return facets
+
+    @staticmethod
+    def compute_facets() -> Dict[FacetKey, int]:
+        available = ArtWork.is_available.is_(True)
+        band = price_band_expression()
+        counts = {}
+        for value, count in db.session.execute(
+                select(ArtWork.category, func.count()).where(available).group_by(ArtWork.category)):
+            counts[(CATEGORY, value)] = count
+        for value, count in db.session.execute(select(band, func.count()).where(available).group_by(band)):
+            counts[(PRICE_BAND, value)] = count
+        return counts
+
+    @staticmethod
+    def rebuild() -> Dict[FacetKey, Tuple[int, int]]:
+        expected = FacetRepository.compute_facets()
+        stored = {(facet, value): count for facet, value, count in
+                  db.session.query(ArtworkFacet.facet, ArtworkFacet.value, ArtworkFacet.count).all()}
+        drift = {key: (stored.get(key, 0), expected.get(key, 0))
+                 for key in set(stored) | set(expected) if stored.get(key, 0) != expected.get(key, 0)}
+        db.session.execute(delete(ArtworkFacet))
+        if expected:
+            db.session.execute(insert(ArtworkFacet), [
+                {'facet': facet, 'value': value, 'count': count} for (facet, value), count in expected.items()
+            ])
+        db.session.commit()
+        return drift
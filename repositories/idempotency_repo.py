@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert
+from config.config import db
+from models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyRepository:
+    @staticmethod
+    def claim(scope: str, key: str, fingerprint: str, ttl_seconds: int) -> Optional[IdempotencyKey]:
+        # Returns None when this request now owns the key, otherwise the row
+        # left by an earlier request. The claim stays uncommitted so it commits
+        # or rolls back with the work and its response; a racing request
+        # blocks on the write lock here until the owner is done. Expired keys
+        # are claimed afresh.
+        now = datetime.utcnow()
+        statement = insert(IdempotencyKey).values(
+            scope=scope, key=key, fingerprint=fingerprint, created_at=now,
+            expires_at=now + timedelta(seconds=ttl_seconds)
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.scope, IdempotencyKey.key],
+            set_={
+                'fingerprint': statement.excluded.fingerprint,
+                'response': None,
+                'created_at': statement.excluded.created_at,
+                'completed_at': None,
+                'expires_at': statement.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at <= now
+        ).returning(IdempotencyKey.key)
+        if db.session.execute(statement).first() is not None:
+            return None
+        return IdempotencyRepository.get(scope, key)
+
+    @staticmethod
+    def get(scope: str, key: str) -> Optional[IdempotencyKey]:
+        return db.session.execute(
+            select(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+
+    @staticmethod
+    def complete(scope: str, key: str, response: Any) -> None:
+        db.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            .values(response=json.dumps(response), completed_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    @staticmethod
+    def purge_expired(now: Optional[datetime] = None, batch_size: int = 1000) -> int:
+        # Deletes in bounded batches, each its own short transaction.
+        now = now or datetime.utcnow()
+        purged = 0
+        while True:
+            expired = select(IdempotencyKey.scope, IdempotencyKey.key)\
+                .where(IdempotencyKey.expires_at <= now)\
+                .limit(batch_size)
+            deleted = db.session.execute(
+                delete(IdempotencyKey)
+                .where(tuple_(IdempotencyKey.scope, IdempotencyKey.key).in_(expired))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+            purged += deleted
+            if deleted < batch_size:
+                return purged
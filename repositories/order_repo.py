@@ -1,7 +1,47 @@
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+import json
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Iterable
+from sqlalchemy import insert, delete, update, select, func, union_all
+from sqlalchemy.orm import joinedload, selectinload, raiseload
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 from config.config import db
-from models.order import Order, OrderStatus
+from models.cart import Cart
+from models.cart_item import CartItem
+from models.archive import OrderArchive
+from models.order import Order, OrderStatus, CLOSED_STATUSES, allowed_from, can_transition
+from models.sales_rollup import REVENUE_STATUSES
+from repositories.artwork_repo import ArtworkRepository
+from repositories.cache import artwork_cache
+from repositories.pagination import keyset_page
+from repositories.rollup_repo import RollupRepository
+
+SORT_COLUMNS = {
+    'created_at': Order.created_at,
+    'total_price': Order.total_price,
+    'id': Order.id,
+}
+# Everything an admin order row shows, loaded up front; any other lazy load
+# raises instead of quietly issuing one query per row.
+ADMIN_LOAD_OPTIONS = (
+    joinedload(Order.buyer),
+    joinedload(Order.artwork),
+    selectinload(Order.payments),
+    raiseload('*'),
+)
+TRANSITION_FILTERS = {'status', 'buyer_id', 'artwork_id'}
+ORDER_COLUMNS = (Order.id, Order.buyer_id, Order.artwork_id, Order.quantity, Order.total_price, Order.status,
+                 Order.created_at)
+
+
+def transition_groups(to_status: OrderStatus) -> List[Tuple[set, int]]:
+    # Splits the statuses an order may reach to_status from by whether they
+    # already count as a sale, so every group changes the rollups by one sign.
+    groups = {}
+    for status in allowed_from(to_status):
+        groups.setdefault(status in REVENUE_STATUSES, set()).add(status)
+    counts_after = to_status in REVENUE_STATUSES
+    return [(sources, int(counts_after) - int(counted)) for counted, sources in groups.items()]
 
 
 class OrderRepository:
@@ -15,8 +55,12 @@ class OrderRepository:
                 quantity=quantity,
                 total_price=total_price,
                 status=status,
+                closed_at=datetime.utcnow() if status in CLOSED_STATUSES else None,
             )
             db.session.add(order)
+            if status in REVENUE_STATUSES:
+                db.session.flush()
+                RollupRepository.record_orders([order.id])
             db.session.commit()
             db.session.refresh(order)
             return order
@@ -25,48 +69,232 @@ class OrderRepository:
             raise ValueError("Failed to create order. Invalid buyer_id or artwork_id.") from e
 
     @staticmethod
-    def get_all_orders() -> List[Order]:
-        return db.session.query(Order).all()
+    def place_order(buyer_id: int, artwork_id: int, quantity: int) -> Order:
+        # Reserve first so the UPDATE takes the write lock before anything is
+        # read; the order is only inserted if this buyer won the artwork.
+        try:
+            reserved = ArtworkRepository.reserve_artworks([artwork_id])
+            if artwork_id not in reserved:
+                db.session.rollback()
+                raise ValueError('Artwork not found or already sold')
+            order = Order(
+                buyer_id=buyer_id,
+                artwork_id=artwork_id,
+                quantity=quantity,
+                total_price=reserved[artwork_id].price * quantity,
+                status=OrderStatus.PENDING,
+            )
+            db.session.add(order)
+            db.session.commit()
+            artwork_cache.invalidate(artwork_id)
+            db.session.refresh(order)
+            return order
+        except IntegrityError as e:
+            db.session.rollback()
+            raise ValueError("Failed to create order. Invalid buyer_id or artwork_id.") from e
 
     @staticmethod
-    def get_orders_by_id(order_id: int) -> Optional[Order]:
+    def checkout_cart(buyer_id: int, cart_id: int) -> List[Row]:
+        # The whole cart becomes orders in one transaction: one query reads the
+        # lines, one conditional UPDATE ... RETURNING reserves every artwork and
+        # reports its current price, one executemany INSERT ... RETURNING writes
+        # the orders, and only the lines that were read are deleted. Bumping the
+        # cart version turns away any write-behind snapshot taken before this.
+        # Any problem (including another buyer winning an artwork) leaves
+        # everything as it was.
+        lines = db.session.query(CartItem.id, CartItem.artwork_id, CartItem.quantity, CartItem.subtotal) \
+            .filter(CartItem.cart_id == cart_id) \
+            .order_by(CartItem.id) \
+            .all()
+        if not lines:
+            raise ValueError("Cart is empty")
+        try:
+            reserved = ArtworkRepository.reserve_artworks([line.artwork_id for line in lines])
+            unavailable = [line.artwork_id for line in lines if line.artwork_id not in reserved]
+            if unavailable:
+                raise ValueError(f"Artworks no longer available: {', '.join(map(str, unavailable))}")
+            repriced = [line.artwork_id for line in lines
+                        if abs(line.quantity * reserved[line.artwork_id].price - line.subtotal) > 0.005]
+            if repriced:
+                raise ValueError(f"Prices changed for artworks: {', '.join(map(str, repriced))}")
+
+            created_at = datetime.utcnow()
+            rows = [{'buyer_id': buyer_id, 'artwork_id': line.artwork_id, 'quantity': line.quantity,
+                     'total_price': line.quantity * reserved[line.artwork_id].price,
+                     'status': OrderStatus.PENDING, 'created_at': created_at}
+                    for line in lines]
+            orders = db.session.execute(
+                insert(Order).returning(*ORDER_COLUMNS, sort_by_parameter_order=True), rows
+            ).all()
+            db.session.execute(delete(CartItem).where(CartItem.id.in_([line.id for line in lines])))
+            db.session.execute(update(Cart).where(Cart.cart_id == cart_id).values(version=Cart.version + 1)
+                               .execution_options(synchronize_session=False))
+            db.session.commit()
+        except ValueError:
+            db.session.rollback()
+            raise
+        except IntegrityError as e:
+            db.session.rollback()
+            raise ValueError("Failed to check out cart. Invalid buyer_id or artwork_id.") from e
+        for artwork_id in reserved:
+            artwork_cache.invalidate(artwork_id)
+        return orders
+
+    @staticmethod
+    def list_orders(status: Optional[OrderStatus] = None, buyer_id: Optional[int] = None,
+                    artwork_id: Optional[int] = None, sort_by: str = 'created_at', descending: bool = True,
+                    limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Order], Optional[str]]:
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort orders by '{sort_by}'")
+        query = db.session.query(Order).options(*ADMIN_LOAD_OPTIONS)
+        if status is not None:
+            query = query.filter(Order.status == status)
+        if buyer_id is not None:
+            query = query.filter(Order.buyer_id == buyer_id)
+        if artwork_id is not None:
+            query = query.filter(Order.artwork_id == artwork_id)
+        return keyset_page(query, SORT_COLUMNS[sort_by], Order.id, limit, cursor, descending)
+
+    # Closed orders move to orders_archive after a while; reads only look there
+    # when asked to, so everyday queries stay on the live table.
+    @staticmethod
+    def get_all_orders(include_archived: bool = False) -> List[Order]:
+        orders = db.session.query(Order).all()
+        if include_archived:
+            orders += db.session.query(OrderArchive).all()
+        return orders
+
+    @staticmethod
+    def get_all_order_rows(fields: Sequence[str], include_archived: bool = False) -> List[Row]:
+        # Archived orders keep the live column names, so one UNION ALL covers
+        # both tables.
+        statement = select(*[getattr(Order, field) for field in fields])
+        if include_archived:
+            statement = union_all(statement, select(*[getattr(OrderArchive, field) for field in fields]))
+        return db.session.execute(statement).all()
+
+    @staticmethod
+    def get_orders_by_id(order_id: int, include_archived: bool = False) -> Optional[Order]:
         order = db.session.get(Order, order_id)
+        if order is None and include_archived:
+            order = db.session.get(OrderArchive, order_id)
         return order
 
     @staticmethod
-    def get_orders_by_buyer_id(buyer_id: int) -> List[Order]:
-        return db.session.query(Order).filter_by(buyer_id=buyer_id).all()
+    def get_orders_by_buyer_id(buyer_id: int, include_archived: bool = False) -> List[Order]:
+        orders = db.session.query(Order).filter_by(buyer_id=buyer_id).all()
+        if include_archived:
+            orders += db.session.query(OrderArchive).filter_by(buyer_id=buyer_id).all()
+        return orders
 
     @staticmethod
-    def get_orders_by_artwork_id(artwork_id: int) -> List[Order]:
-        return db.session.query(Order).filter_by(artwork_id=artwork_id).all()
+    def get_orders_by_artwork_id(artwork_id: int, include_archived: bool = False) -> List[Order]:
+        orders = db.session.query(Order).filter_by(artwork_id=artwork_id).all()
+        if include_archived:
+            orders += db.session.query(OrderArchive).filter_by(artwork_id=artwork_id).all()
+        return orders
 
     @staticmethod
-    def get_order_by_order_status(status: OrderStatus) -> List[Order]:
-        return db.session.query(Order).filter_by(status=status).all()
+    def get_order_by_order_status(status: OrderStatus, include_archived: bool = False) -> List[Order]:
+        orders = db.session.query(Order).filter_by(status=status).all()
+        if include_archived:
+            orders += db.session.query(OrderArchive).filter_by(status=status).all()
+        return orders
 
     @staticmethod
     def update_order(order_id: int, updated_data: Dict[str, Any]) -> Optional[Order]:
         order = OrderRepository.get_orders_by_id(order_id)
         if not order:
             return None
+        new_status = updated_data.get("status")
+        if new_status is not None and new_status != order.status and not can_transition(order.status, new_status):
+            raise ValueError(f"Cannot move order from {order.status.name} to {new_status.name}")
         allowed_fields = {"status", "total_price", "quantity"}
-        for key, value in updated_data.items():
-            if key in allowed_fields:
-                setattr(order, key, value)
         try:
+            # Take the order out of the rollups as it was and put it back as it
+            # is, which covers status, price and quantity changes alike.
+            if order.status in REVENUE_STATUSES:
+                RollupRepository.record_orders([order.id], -1)
+            for key, value in updated_data.items():
+                if key in allowed_fields:
+                    setattr(order, key, value)
+            if new_status in CLOSED_STATUSES and order.closed_at is None:
+                order.closed_at = datetime.utcnow()
+            db.session.flush()
+            if order.status in REVENUE_STATUSES:
+                RollupRepository.record_orders([order.id])
+            released = []
+            if new_status == OrderStatus.CANCELED:
+                db.session.flush()
+                released = ArtworkRepository.release_artworks([order.artwork_id])
             db.session.commit()
+            for artwork_id in released:
+                artwork_cache.invalidate(artwork_id)
             db.session.refresh(order)
             return order
         except IntegrityError as e:
             db.session.rollback()
             raise ValueError("Failed to update order.") from e
 
+    @staticmethod
+    def bulk_transition(to_status: OrderStatus, order_ids: Optional[Iterable[int]] = None,
+                        **filters) -> Tuple[List[int], List[int]]:
+        # A guarded UPDATE ... WHERE status IN (allowed_from) RETURNING id moves
+        # every eligible order at once (one per rollup sign, so at most two).
+        # Orders whose current status does not allow the move are left alone
+        # and reported back as rejected.
+        unknown = set(filters) - TRANSITION_FILTERS
+        if unknown:
+            raise ValueError(f"Unsupported order filters: {', '.join(sorted(unknown))}")
+        if order_ids is None and not filters:
+            raise ValueError("Select the orders to transition by id or by filter")
+
+        conditions = [getattr(Order, key) == value for key, value in filters.items()]
+        if order_ids is not None:
+            order_ids = list(dict.fromkeys(order_ids))
+            # A single JSON parameter keeps 10k ids under SQLite's variable limit.
+            requested = func.json_each(json.dumps(order_ids)).table_valued('value')
+            conditions.append(Order.id.in_(select(requested.c.value)))
+        values = {'status': to_status}
+        if to_status in CLOSED_STATUSES:
+            values['closed_at'] = datetime.utcnow()
+        try:
+            moved = []
+            for sources, sign in transition_groups(to_status):
+                rows = db.session.execute(
+                    update(Order)
+                    .where(*conditions, Order.status.in_(sources))
+                    .values(**values)
+                    .returning(Order.id, Order.artwork_id)
+                    .execution_options(synchronize_session=False)
+                ).all()
+                RollupRepository.record_orders([row.id for row in rows], sign)
+                moved.extend(rows)
+            moved_ids = {row.id for row in moved}
+            # Filters may match orders the UPDATE skipped; look those up after
+            # the write so the transaction takes the write lock first.
+            candidates = order_ids
+            if candidates is None:
+                candidates = db.session.scalars(select(Order.id).where(*conditions)).all()
+            rejected = [order_id for order_id in candidates if order_id not in moved_ids]
+            released = []
+            if to_status == OrderStatus.CANCELED and moved:
+                released = ArtworkRepository.release_artworks(list({row.artwork_id for row in moved}))
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            raise ValueError("Failed to transition orders.") from e
+        for artwork_id in released:
+            artwork_cache.invalidate(artwork_id)
+        return sorted(moved_ids), sorted(rejected)
+
     @staticmethod
     def delete_order(order_id: int) -> bool:
         order = OrderRepository.get_orders_by_id(order_id)
         if not order:
             return False
+        if order.status in REVENUE_STATUSES:
+            RollupRepository.record_orders([order.id], -1)
         db.session.delete(order)
         db.session.commit()
         return True
\ No newline at end of file
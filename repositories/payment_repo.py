@@ -1,7 +1,37 @@
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Sequence, Tuple, NamedTuple
+from sqlalchemy import func, select, union_all, update
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, raiseload
 from config.config import db
-from models.payment import Payment, PaymentStatus
+from models.archive import PaymentArchive
+from models.order import Order, OrderStatus
+from models.payment import Payment, PaymentStatus, PaymentMethod
+from repositories.order_repo import OrderRepository
+from repositories.pagination import keyset_page
+
+SORT_COLUMNS = {
+    'created_at': Payment.created_at,
+    'amount': Payment.amount,
+    'id': Payment.id,
+}
+ADMIN_LOAD_OPTIONS = (
+    joinedload(Payment.order).joinedload(Order.buyer),
+    raiseload('*'),
+)
+
+
+
+class PaymentOutcome(NamedTuple):
+    # What a worker learned about one claimed payment. status stays PENDING
+    # for a retry, with next_attempt_at set to when it may run again.
+    payment_id: int
+    attempts: int
+    status: PaymentStatus
+    reference: Optional[str] = None
+    error: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
 
 
 class PaymentRepository:
@@ -12,7 +42,7 @@ class PaymentRepository:
                 order_id=order_id,
                 amount=amount,
                 payment_method=payment_method,
-                payment_status=payment_status
+                status=payment_status
             )
             db.session.add(payment)
             db.session.commit()
@@ -22,29 +52,67 @@ class PaymentRepository:
             db.session.rollback()
             raise ValueError("Unable to make payment. Or Invalid Order Id or data.") from e
 
+    # Payments of archived orders live in payment_archive; see
+    # OrderRepository for the include_archived convention.
+    @staticmethod
+    def get_payment_by_id(payment_id: int, include_archived: bool = False) -> Optional[Payment]:
+        payment = db.session.get(Payment, payment_id)
+        if payment is None and include_archived:
+            payment = db.session.get(PaymentArchive, payment_id)
+        return payment
+
+    @staticmethod
+    def get_payment_by_order(order_id: int, include_archived: bool = False) -> List[Payment]:
+        payments = db.session.query(Payment).filter_by(order_id=order_id).all()
+        if include_archived:
+            payments += db.session.query(PaymentArchive).filter_by(order_id=order_id).all()
+        return payments
+
     @staticmethod
-    def get_payment_by_id(payment_id: int) -> Optional[Payment]:
-        return db.session.get(Payment, payment_id)
+    def get_all_payments(include_archived: bool = False) -> List[Payment]:
+        payments = db.session.query(Payment).all()
+        if include_archived:
+            payments += db.session.query(PaymentArchive).all()
+        return payments
 
     @staticmethod
-    def get_payment_by_order(order_id: int) -> List[Payment]:
-        return db.session.query(Payment).filter_by(order_id=order_id).all()
+    def get_all_payment_rows(fields: Sequence[str], include_archived: bool = False) -> List[Row]:
+        statement = select(*[getattr(Payment, field) for field in fields])
+        if include_archived:
+            statement = union_all(statement, select(*[getattr(PaymentArchive, field) for field in fields]))
+        return db.session.execute(statement).all()
 
     @staticmethod
-    def get_all_payments() -> List[Payment]:
-        return db.session.query(Payment).all()
+    def list_payments(status: Optional[PaymentStatus] = None, payment_method: Optional[PaymentMethod] = None,
+                      order_id: Optional[int] = None, sort_by: str = 'created_at', descending: bool = True,
+                      limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Payment], Optional[str]]:
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort payments by '{sort_by}'")
+        query = db.session.query(Payment).options(*ADMIN_LOAD_OPTIONS)
+        if status is not None:
+            query = query.filter(Payment.status == status)
+        if payment_method is not None:
+            query = query.filter(Payment.payment_method == payment_method)
+        if order_id is not None:
+            query = query.filter(Payment.order_id == order_id)
+        return keyset_page(query, SORT_COLUMNS[sort_by], Payment.id, limit, cursor, descending)
 
     @staticmethod
-    def get_payment_by_status(payment_status: PaymentStatus) -> List[Payment]:
-        return db.session.query(Payment).filter_by(payment_status=payment_status).all()
+    def get_payment_by_status(payment_status: PaymentStatus, include_archived: bool = False) -> List[Payment]:
+        payments = db.session.query(Payment).filter_by(status=payment_status).all()
+        if include_archived:
+            payments += db.session.query(PaymentArchive).filter_by(status=payment_status).all()
+        return payments
 
     @staticmethod
     def update_payment(payment_id: int, updated_data: Dict[str, Any])-> Optional[Payment]:
         payment = PaymentRepository.get_payment_by_id(payment_id)
         if not payment:
             return None
-        allowed_fields = {"amount", "payment_status", "payment_method"}
+        allowed_fields = {"amount", "status", "payment_method"}
         for key, value in updated_data.items():
+            if key == "payment_status":
+                key = "status"
             if key in allowed_fields:
                 setattr(payment, key, value)
         try:
@@ -62,4 +130,68 @@ class PaymentRepository:
             return False
         db.session.delete(payment)
         db.session.commit()
-        return True
\ No newline at end of file
+        return True
+
+    @staticmethod
+    def claim_due(batch_size: int, lease_seconds: float, now: Optional[datetime] = None) -> List[Row]:
+        # Claims up to batch_size due payments in one UPDATE ... RETURNING and
+        # commits at once, so no transaction is open while the gateway is
+        # called. The lease hides them from other workers; if this worker dies
+        # they become due again when it runs out. attempts is the fencing
+        # token settle() checks.
+        now = now or datetime.utcnow()
+        due = select(Payment.id)\
+            .where(Payment.status == PaymentStatus.PENDING, Payment.next_attempt_at <= now)\
+            .order_by(Payment.next_attempt_at)\
+            .limit(batch_size)
+        claimed = db.session.execute(
+            update(Payment)
+            .where(Payment.id.in_(due.scalar_subquery()))
+            .values(attempts=Payment.attempts + 1, next_attempt_at=now + timedelta(seconds=lease_seconds))
+            .returning(Payment.id, Payment.order_id, Payment.amount, Payment.payment_method, Payment.attempts)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.session.commit()
+        return claimed
+
+    @staticmethod
+    def settle(outcomes: List[PaymentOutcome]) -> Tuple[List[int], List[int]]:
+        # Records a batch of outcomes and moves the orders of successful
+        # payments to PAID in the same transaction. An outcome whose claim was
+        # lost (attempts moved on, or the payment is no longer PENDING) is
+        # ignored. Returns the settled payment ids and the orders that could
+        # not be marked PAID because they had moved on (e.g. were canceled).
+        settled, paid_orders = [], []
+        for outcome in outcomes:
+            values = {'status': outcome.status, 'last_error': outcome.error}
+            if outcome.reference is not None:
+                values['gateway_reference'] = outcome.reference
+            if outcome.next_attempt_at is not None:
+                values['next_attempt_at'] = outcome.next_attempt_at
+            row = db.session.execute(
+                update(Payment)
+                .where(Payment.id == outcome.payment_id, Payment.status == PaymentStatus.PENDING,
+                       Payment.attempts == outcome.attempts)
+                .values(**values)
+                .returning(Payment.order_id)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if row is None:
+                continue
+            settled.append(outcome.payment_id)
+            if outcome.status == PaymentStatus.SUCCESS:
+                paid_orders.append(row.order_id)
+        # bulk_transition commits the payment updates together with the orders.
+        _, unpaid = OrderRepository.bulk_transition(OrderStatus.PAID, paid_orders)
+        return settled, unpaid
+
+    @staticmethod
+    def queue_depth(now: Optional[datetime] = None) -> Tuple[int, int]:
+        # (due now, all pending); the difference is leased or backing off.
+        now = now or datetime.utcnow()
+        pending = Payment.status == PaymentStatus.PENDING
+        due, total = db.session.query(
+            func.count().filter(Payment.next_attempt_at <= now),
+            func.count(),
+        ).filter(pending).one()
+        return due, total
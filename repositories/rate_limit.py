@@ -0,0 +1,114 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+import redis
+
+
+def _estimate(previous: int, current: int, elapsed: float, window: float) -> float:
+    # Sliding window counter: the previous fixed window's count, weighted by
+    # how much of it still overlaps the sliding window, plus the current one.
+    return previous * (1 - elapsed / window) + current
+
+
+def _retry_after(previous: int, current: int, elapsed: float, window: float, limit: int) -> float:
+    # How long until one more hit would fit, given counts without that hit.
+    if current + 1 <= limit and previous:
+        return max(0.0, window * (1 - (limit - current - 1) / previous) - elapsed)
+    return (window - elapsed) + (window * (1 - (limit - 1) / current) if current else 0.0)
+
+
+class InMemoryRateLimitBackend:
+    # Two counters per key: O(1) memory however many hits a key takes.
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._windows: Dict[str, List] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        # Counts the hit and returns None, or refuses it (uncounted) and
+        # returns the seconds to wait.
+        now = self.clock()
+        index, elapsed = int(now // window), now % window
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is None or entry[0] < index - 1:
+                entry = [index, 0, 0]
+            elif entry[0] == index - 1:
+                entry = [index, 0, entry[1]]
+            _, current, previous = entry
+            if _estimate(previous, current + 1, elapsed, window) > limit:
+                self._windows[key] = entry
+                return _retry_after(previous, current, elapsed, window, limit)
+            entry[1] += 1
+            self._windows[key] = entry
+            if len(self._windows) > self.max_keys:
+                self._prune(index)
+            return None
+
+    def release(self, key: str, window: float) -> None:
+        # Takes back a hit counted in the current window.
+        index = int(self.clock() // window)
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is not None and entry[0] == index and entry[1] > 0:
+                entry[1] -= 1
+
+    def clear(self, key: str, window: float) -> None:
+        with self._lock:
+            self._windows.pop(key, None)
+
+    def _prune(self, index: int) -> None:
+        # Keys idle for two windows count nothing; drop them first, then the
+        # oldest if a flood of distinct keys still overflows. Pruning down to
+        # 90% keeps a flood from paying for a full pass on every hit.
+        self._windows = {key: entry for key, entry in self._windows.items() if entry[0] >= index - 1}
+        while len(self._windows) > self.max_keys * 0.9:
+            self._windows.pop(next(iter(self._windows)))
+
+
+class RedisRateLimitBackend:
+    # One Redis counter per key and fixed window, expiring after two windows,
+    # so every process behind the same Redis shares the limits.
+    def __init__(self, client, namespace: str = "ratelimit", clock: Callable[[], float] = time.time):
+        self.client = client
+        self.namespace = namespace
+        self.clock = clock
+
+    def _key(self, key: str, index: int) -> str:
+        return f"{self.namespace}:{key}:{index}"
+
+    def hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        now = self.clock()
+        index, elapsed = int(now // window), now % window
+        current_key = self._key(key, index)
+        pipe = self.client.pipeline()
+        pipe.incr(current_key)
+        pipe.pexpire(current_key, int(window * 2000))
+        pipe.get(self._key(key, index - 1))
+        current, _, previous = pipe.execute()
+        previous = int(previous or 0)
+        if _estimate(previous, current, elapsed, window) > limit:
+            self.client.decr(current_key)
+            return _retry_after(previous, current - 1, elapsed, window, limit)
+        return None
+
+    def release(self, key: str, window: float) -> None:
+        current_key = self._key(key, int(self.clock() // window))
+        if int(self.client.get(current_key) or 0) > 0:
+            self.client.decr(current_key)
+
+    def clear(self, key: str, window: float) -> None:
+        index = int(self.clock() // window)
+        self.client.delete(self._key(key, index), self._key(key, index - 1))
+
+
+def build_rate_limit_backend(config):
+    kind = config.get("LOGIN_THROTTLE_BACKEND", "memory")
+    if kind == "memory":
+        return InMemoryRateLimitBackend(max_keys=config.get("LOGIN_THROTTLE_MAX_KEYS", 100_000))
+    if kind == "redis":
+        return RedisRateLimitBackend(redis.Redis.from_url(config.get("REDIS_URL", "redis://localhost:6379/0")))
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown login throttle backend '{kind}'")
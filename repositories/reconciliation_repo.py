@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Row
+from config.config import db
+from models.archive import OrderArchive, PaymentArchive
+from models.order import Order
+from models.payment import Payment, PaymentStatus
+from models.reconciliation import ReconciliationRun, ReconciliationCheckpoint, ReconciliationDiscrepancy
+
+# Live orders are reconciled before archived ones: an order archived while the
+# run is going is then either checked twice or checked late, never skipped.
+RECONCILIATION_SOURCES = {
+    'live': (Order, Payment),
+    'archive': (OrderArchive, PaymentArchive),
+}
+
+
+class ReconciliationRepository:
+    @staticmethod
+    def start_run(chunk_size: int) -> ReconciliationRun:
+        run = ReconciliationRun(chunk_size=chunk_size)
+        db.session.add(run)
+        db.session.flush()
+        db.session.add_all(ReconciliationCheckpoint(run_id=run.id, source=source, last_order_id=0,
+                                                    orders_checked=0, payments_checked=0, discrepancies=0)
+                           for source in RECONCILIATION_SOURCES)
+        db.session.commit()
+        return run
+
+    @staticmethod
+    def get_run(run_id: int) -> Optional[ReconciliationRun]:
+        return db.session.get(ReconciliationRun, run_id)
+
+    @staticmethod
+    def checkpoints(run_id: int) -> Dict[str, ReconciliationCheckpoint]:
+        rows = db.session.scalars(
+            select(ReconciliationCheckpoint)
+            .where(ReconciliationCheckpoint.run_id == run_id)
+            .execution_options(populate_existing=True)
+        )
+        return {row.source: row for row in rows}
+
+    @staticmethod
+    def chunk_bound(source: str, after_order_id: int, chunk_size: int) -> Optional[int]:
+        # The id of the chunk_size-th order after the checkpoint, read off the
+        # primary key alone; None when fewer orders than that are left.
+        order_model, _ = RECONCILIATION_SOURCES[source]
+        return db.session.scalar(
+            select(order_model.id)
+            .where(order_model.id > after_order_id)
+            .order_by(order_model.id)
+            .limit(1)
+            .offset(chunk_size - 1)
+        )
+
+    @staticmethod
+    def stream_orders(source: str, after_order_id: int, up_to: Optional[int],
+                      yield_per: int = 1000) -> Iterator[Row]:
+        order_model, _ = RECONCILIATION_SOURCES[source]
+        statement = select(order_model.id, order_model.status, order_model.total_price)\
+            .where(order_model.id > after_order_id)
+        if up_to is not None:
+            statement = statement.where(order_model.id <= up_to)
+        return db.session.execute(statement.order_by(order_model.id).execution_options(yield_per=yield_per))
+
+    @staticmethod
+    def stream_payments(source: str, after_order_id: int, up_to: Optional[int],
+                        yield_per: int = 1000) -> Iterator[Row]:
+        # Successful payments in the same order-id range, in order-id order, so
+        # they merge-join against stream_orders without sorting.
+        _, payment_model = RECONCILIATION_SOURCES[source]
+        statement = select(payment_model.id, payment_model.order_id, payment_model.amount)\
+            .where(payment_model.order_id > after_order_id, payment_model.status == PaymentStatus.SUCCESS)
+        if up_to is not None:
+            statement = statement.where(payment_model.order_id <= up_to)
+        return db.session.execute(
+            statement.order_by(payment_model.order_id, payment_model.id).execution_options(yield_per=yield_per)
+        )
+
+    @staticmethod
+    def record_chunk(run_id: int, source: str, last_order_id: int, orders: int, payments: int,
+                     discrepancies: List[dict], completed: bool) -> None:
+        # The discrepancies and the checkpoint that covers them commit together.
+        if discrepancies:
+            db.session.execute(insert(ReconciliationDiscrepancy),
+                               [dict(row, run_id=run_id, source=source) for row in discrepancies])
+        checkpoint = db.session.get(ReconciliationCheckpoint, (run_id, source))
+        checkpoint.last_order_id = last_order_id
+        checkpoint.orders_checked += orders
+        checkpoint.payments_checked += payments
+        checkpoint.discrepancies += len(discrepancies)
+        if completed:
+            checkpoint.completed_at = datetime.utcnow()
+        db.session.commit()
+
+    @staticmethod
+    def finish_run(run_id: int) -> None:
+        run = db.session.get(ReconciliationRun, run_id)
+        run.finished_at = datetime.utcnow()
+        db.session.commit()
+
+    @staticmethod
+    def stream_discrepancies(run_id: int, yield_per: int = 1000) -> Iterator[ReconciliationDiscrepancy]:
+        return db.session.scalars(
+            select(ReconciliationDiscrepancy)
+            .where(ReconciliationDiscrepancy.run_id == run_id)
+            .order_by(ReconciliationDiscrepancy.id)
+            .execution_options(yield_per=yield_per)
+        )
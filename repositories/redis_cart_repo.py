@@ -0,0 +1,273 @@
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import redis
+from sqlalchemy import select
+from flask import current_app, has_app_context
+from config.config import db
+from models.cart import Cart
+from models.cart_item import CartItem
+from repositories.artwork_repo import ArtworkRepository
+from repositories.cart_repo import CartRepository
+
+logger = logging.getLogger(__name__)
+
+BUYER_FIELD = "buyer"
+VERSION_FIELD = "version"
+LINE_PREFIX = "a:"
+
+
+class RedisCartRepository:
+    # Active carts live in one Redis hash each ({"buyer": id, "version": n,
+    # "a:<artwork_id>": quantity}), so adding and removing lines never takes
+    # the SQLite write lock. Changed carts are queued in a dirty set and
+    # written behind in batches. A flush moves ids to a flushing set before it
+    # reads them and clears them only after the SQL commit, and it writes each
+    # cart's complete state. recover() can therefore put any ids a crashed
+    # flush left behind back on the queue and replay them safely. Every change
+    # bumps the version, and SQL only takes a snapshot newer than the one it
+    # holds, so a slow flush can never overwrite a later one or a checkout.
+    def __init__(self, client, namespace: str = "cart", idle_ttl_seconds: int = 7 * 24 * 3600):
+        self.client = client
+        self.namespace = namespace
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._dirty_key = f"{namespace}:dirty"
+        self._flushing_key = f"{namespace}:flushing"
+
+    def _cart_key(self, cart_id: int) -> str:
+        return f"{self.namespace}:{cart_id}"
+
+    def _buyer_key(self, buyer_id: int) -> str:
+        return f"{self.namespace}:buyer:{buyer_id}"
+
+    def _cart_id_for(self, buyer_id: int) -> int:
+        cart_id = self.client.get(self._buyer_key(buyer_id))
+        if cart_id is not None:
+            cart_id = int(cart_id)
+            if self.client.exists(self._cart_key(cart_id)):
+                return cart_id
+        cart = CartRepository.get_cart_or_create_cart(buyer_id)
+        self._load(cart.cart_id)
+        return cart.cart_id
+
+    def _load(self, cart_id: int) -> bool:
+        # Copies a cart's SQL lines into Redis the first time it is touched.
+        # HSETNX inside one MULTI means concurrent loaders agree and a load
+        # never overwrites quantities that were changed in Redis. Versions
+        # carry on from SQL's, so the first change after a load is newer.
+        key = self._cart_key(cart_id)
+        if self.client.exists(key):
+            return True
+        cart = db.session.query(Cart.buyer_id, Cart.version).filter_by(cart_id=cart_id).first()
+        if cart is None:
+            return False
+        buyer_id, version = cart
+        lines = db.session.query(CartItem.artwork_id, CartItem.quantity).filter_by(cart_id=cart_id).all()
+        pipe = self.client.pipeline(transaction=True)
+        for artwork_id, quantity in lines:
+            pipe.hsetnx(key, f"{LINE_PREFIX}{artwork_id}", quantity)
+        pipe.hsetnx(key, BUYER_FIELD, buyer_id)
+        pipe.hsetnx(key, VERSION_FIELD, version)
+        pipe.expire(key, self.idle_ttl_seconds)
+        pipe.set(self._buyer_key(buyer_id), cart_id, ex=self.idle_ttl_seconds)
+        pipe.execute()
+        return True
+
+    def _snapshot(self, cart_id: int) -> Optional[Tuple[int, Dict[int, int]]]:
+        raw = self.client.hgetall(self._cart_key(cart_id))
+        if not raw:
+            return None
+        version, lines = 0, {}
+        for field, value in raw.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            if field.startswith(LINE_PREFIX):
+                lines[int(field[len(LINE_PREFIX):])] = int(value)
+            elif field == VERSION_FIELD:
+                version = int(value)
+        return version, lines
+
+    def _buyer_of(self, cart_id: int) -> int:
+        return int(self.client.hget(self._cart_key(cart_id), BUYER_FIELD))
+
+    def _touch(self, pipe, cart_id: int, buyer_id: int) -> None:
+        # The buyer -> cart pointer lives exactly as long as the cart itself.
+        pipe.hincrby(self._cart_key(cart_id), VERSION_FIELD, 1)
+        pipe.expire(self._cart_key(cart_id), self.idle_ttl_seconds)
+        pipe.set(self._buyer_key(buyer_id), cart_id, ex=self.idle_ttl_seconds)
+        pipe.sadd(self._dirty_key, cart_id)
+
+    def get_cart_or_create_cart(self, buyer_id: int) -> Cart:
+        return db.session.get(Cart, self._cart_id_for(buyer_id))
+
+    def add_to_cart(self, buyer_id: int, artwork_id: int, quantity: int = 1) -> Cart:
+        return self.add_many_to_cart(buyer_id, [(artwork_id, quantity)])
+
+    def add_many_to_cart(self, buyer_id: int, items: Iterable[Tuple[int, int]]) -> Cart:
+        requested = Counter()
+        for artwork_id, quantity in items:
+            if quantity < 1:
+                raise ValueError("Quantity must be at least 1")
+            requested[artwork_id] += quantity
+        if not requested:
+            raise ValueError("No artworks to add")
+        missing = sorted(artwork_id for artwork_id in requested
+                         if ArtworkRepository.find_by_artwork_id(artwork_id) is None)
+        if missing:
+            raise ValueError(f"Artwork not found: {', '.join(map(str, missing))}")
+
+        cart_id = self._cart_id_for(buyer_id)
+        pipe = self.client.pipeline(transaction=True)
+        for artwork_id, quantity in requested.items():
+            pipe.hincrby(self._cart_key(cart_id), f"{LINE_PREFIX}{artwork_id}", quantity)
+        self._touch(pipe, cart_id, buyer_id)
+        pipe.execute()
+        return db.session.get(Cart, cart_id)
+
+    def remove_from_cart(self, cart_id: int, artwork_id: int) -> bool:
+        if not self._load(cart_id):
+            return False
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hdel(self._cart_key(cart_id), f"{LINE_PREFIX}{artwork_id}")
+        self._touch(pipe, cart_id, self._buyer_of(cart_id))
+        return bool(pipe.execute()[0])
+
+    def clear_cart(self, cart_id: int) -> bool:
+        if not self._load(cart_id):
+            return True
+        key = self._cart_key(cart_id)
+        fields = [field for field in self.client.hkeys(key)
+                  if (field.decode() if isinstance(field, bytes) else field).startswith(LINE_PREFIX)]
+        pipe = self.client.pipeline(transaction=True)
+        if fields:
+            pipe.hdel(key, *fields)
+        self._touch(pipe, cart_id, self._buyer_of(cart_id))
+        pipe.execute()
+        return True
+
+    # Reads return ORM rows, so they flush the buyer's pending changes first.
+    # That is one batched write, and only when something actually changed.
+    # The carts are found in SQL, not through the buyer key, which may have
+    # expired while changes to the cart were still queued.
+    def _flush_buyer(self, buyer_id: int) -> None:
+        for cart_id in db.session.scalars(select(Cart.cart_id).where(Cart.buyer_id == buyer_id)).all():
+            self.flush_cart(cart_id)
+
+    def get_cart_by_buyer(self, buyer_id: int) -> Optional[Cart]:
+        self._flush_buyer(buyer_id)
+        return CartRepository.get_cart_by_buyer(buyer_id)
+
+    def get_cart_view(self, buyer_id: int) -> Optional[Tuple[Cart, int, float]]:
+        self._flush_buyer(buyer_id)
+        return CartRepository.get_cart_view(buyer_id)
+
+    def flush_cart(self, cart_id: int) -> None:
+        # A cart a background flush has already claimed is written here too,
+        # so the caller never reads SQL behind Redis; the version fence turns
+        # whichever of the two writes lands second into a no-op.
+        claimed = self.client.smove(self._dirty_key, self._flushing_key, cart_id)
+        if claimed or self.client.sismember(self._flushing_key, cart_id):
+            self._write([cart_id])
+
+    def evict(self, cart_id: int) -> None:
+        # After checkout the SQL cart is authoritative (and empty) again.
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self._cart_key(cart_id))
+        pipe.srem(self._dirty_key, cart_id)
+        pipe.execute()
+
+    def flush(self, batch_size: int = 500) -> int:
+        flushed = 0
+        while True:
+            batch = []
+            for member in self.client.srandmember(self._dirty_key, batch_size):
+                if self.client.smove(self._dirty_key, self._flushing_key, member):
+                    batch.append(int(member))
+            if not batch:
+                return flushed
+            self._write(batch)
+            flushed += len(batch)
+
+    def _write(self, cart_ids: List[int]) -> None:
+        # Carts whose hash has vanished (evicted or lost with Redis) are skipped
+        # rather than written as empty, so SQL keeps the last flushed state.
+        snapshots = {}
+        for cart_id in cart_ids:
+            snapshot = self._snapshot(cart_id)
+            if snapshot is not None:
+                snapshots[cart_id] = snapshot
+        try:
+            CartRepository.replace_cart_lines(snapshots)
+        except RuntimeError:
+            self.client.sadd(self._dirty_key, *cart_ids)
+            self.client.srem(self._flushing_key, *cart_ids)
+            raise
+        self.client.srem(self._flushing_key, *cart_ids)
+
+    def recover(self) -> int:
+        # Re-queues carts a crashed flush had claimed but not finished.
+        stranded = self.client.smembers(self._flushing_key)
+        if stranded:
+            self.client.sadd(self._dirty_key, *stranded)
+            self.client.srem(self._flushing_key, *stranded)
+        return len(stranded)
+
+    def pending(self) -> int:
+        return self.client.scard(self._dirty_key) + self.client.scard(self._flushing_key)
+
+
+class CartFlusher:
+    def __init__(self, app, repository: RedisCartRepository, interval_seconds: float = 5.0,
+                 batch_size: int = 500):
+        self.app = app
+        self.repository = repository
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        with self.app.app_context():
+            self.repository.recover()
+        self._thread = threading.Thread(target=self._run, name="cart-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.flush_once()
+
+    def flush_once(self) -> int:
+        with self.app.app_context():
+            try:
+                return self.repository.flush(self.batch_size)
+            except Exception:
+                logger.exception("Cart write-behind flush failed")
+                return 0
+            finally:
+                db.session.remove()
+
+    def stop(self) -> None:
+        # Drains what is still queued so a clean shutdown loses nothing.
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush_once()
+
+
+def build_cart_repository(config):
+    kind = config.get("CART_BACKEND", "sql")
+    if kind == "sql":
+        return CartRepository
+    if kind == "redis":
+        client = redis.Redis.from_url(config.get("REDIS_URL", "redis://localhost:6379/0"))
+        return RedisCartRepository(client, idle_ttl_seconds=config.get("CART_IDLE_TTL", 7 * 24 * 3600))
+    raise ValueError(f"Unknown cart backend '{kind}'")
+
+
+def current_cart_repository():
+    if has_app_context():
+        return current_app.extensions.get("cart_repository", CartRepository)
+    return CartRepository
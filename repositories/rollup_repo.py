@@ -0,0 +1,171 @@
+import json
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.engine import Row
+from config.config import db
+from models.archive import OrderArchive
+from models.artwork import ArtWork
+from models.order import Order
+from models.sales_rollup import ArtistDailySales, CategoryDailySales, BuyerLifetimeValue, REVENUE_STATUSES
+
+# Each statement folds a set of orders (one JSON id list) into a rollup with
+# the given sign: +1 when they start counting as sales, -1 when they stop.
+_ORDER_FACTS = (
+    "FROM orders o JOIN artworks a ON a.id = o.artwork_id "
+    "WHERE o.id IN (SELECT value FROM json_each(:order_ids)) "
+)
+ROLLUP_STATEMENTS = (
+    text(
+        "INSERT INTO sales_by_artist_day (artist_id, day, order_count, units, revenue) "
+        "SELECT a.artist_id, date(o.created_at), :sign * count(*), :sign * sum(coalesce(o.quantity, 1)), "
+        ":sign * sum(o.total_price) " + _ORDER_FACTS +
+        "GROUP BY a.artist_id, date(o.created_at) "
+        "ON CONFLICT (artist_id, day) DO UPDATE SET order_count = order_count + excluded.order_count, "
+        "units = units + excluded.units, revenue = revenue + excluded.revenue"
+    ),
+    text(
+        "INSERT INTO sales_by_category_day (category, day, order_count, units, revenue) "
+        "SELECT a.category, date(o.created_at), :sign * count(*), :sign * sum(coalesce(o.quantity, 1)), "
+        ":sign * sum(o.total_price) " + _ORDER_FACTS +
+        "GROUP BY a.category, date(o.created_at) "
+        "ON CONFLICT (category, day) DO UPDATE SET order_count = order_count + excluded.order_count, "
+        "units = units + excluded.units, revenue = revenue + excluded.revenue"
+    ),
+    text(
+        "INSERT INTO buyer_lifetime_value (buyer_id, order_count, units, revenue) "
+        "SELECT o.buyer_id, :sign * count(*), :sign * sum(coalesce(o.quantity, 1)), :sign * sum(o.total_price) "
+        "FROM orders o WHERE o.id IN (SELECT value FROM json_each(:order_ids)) "
+        "GROUP BY o.buyer_id "
+        "ON CONFLICT (buyer_id) DO UPDATE SET order_count = order_count + excluded.order_count, "
+        "units = units + excluded.units, revenue = revenue + excluded.revenue"
+    ),
+)
+ROLLUP_MODELS = {
+    'artist_day': (ArtistDailySales, ('artist_id', 'day')),
+    'category_day': (CategoryDailySales, ('category', 'day')),
+    'buyer': (BuyerLifetimeValue, ('buyer_id',)),
+}
+
+
+def _totals(model, *conditions):
+    return db.session.query(
+        func.coalesce(func.sum(model.order_count), 0).label('order_count'),
+        func.coalesce(func.sum(model.units), 0).label('units'),
+        func.coalesce(func.sum(model.revenue), 0.0).label('revenue'),
+    ).filter(*conditions).one()
+
+
+class RollupRepository:
+    @staticmethod
+    def record_orders(order_ids: Iterable[int], sign: int = 1) -> None:
+        # Runs inside the caller's transaction, after the order rows are
+        # written, so the rollups commit (or roll back) with the status change.
+        order_ids = list(order_ids)
+        if not order_ids or not sign:
+            return
+        params = {'order_ids': json.dumps(order_ids), 'sign': sign}
+        for statement in ROLLUP_STATEMENTS:
+            db.session.execute(statement, params)
+
+    # Dashboard reads touch one rollup row per day (or per buyer), however
+    # many orders those rows summarise.
+    @staticmethod
+    def artist_daily_sales(artist_id: int, start: date, end: date) -> List[ArtistDailySales]:
+        return db.session.query(ArtistDailySales)\
+            .filter(ArtistDailySales.artist_id == artist_id, ArtistDailySales.day.between(start, end))\
+            .order_by(ArtistDailySales.day)\
+            .all()
+
+    @staticmethod
+    def artist_totals(artist_id: int, start: date, end: date) -> Row:
+        return _totals(ArtistDailySales, ArtistDailySales.artist_id == artist_id,
+                       ArtistDailySales.day.between(start, end))
+
+    @staticmethod
+    def category_daily_sales(start: date, end: date, category: Optional[str] = None) -> List[CategoryDailySales]:
+        query = db.session.query(CategoryDailySales).filter(CategoryDailySales.day.between(start, end))
+        if category is not None:
+            query = query.filter(CategoryDailySales.category == category)
+        return query.order_by(CategoryDailySales.day, CategoryDailySales.category).all()
+
+    @staticmethod
+    def top_categories(start: date, end: date, limit: int = 10) -> List[Row]:
+        revenue = func.sum(CategoryDailySales.revenue)
+        return db.session.query(
+            CategoryDailySales.category,
+            func.sum(CategoryDailySales.order_count).label('order_count'),
+            func.sum(CategoryDailySales.units).label('units'),
+            revenue.label('revenue'),
+        ).filter(CategoryDailySales.day.between(start, end))\
+            .group_by(CategoryDailySales.category)\
+            .order_by(revenue.desc(), CategoryDailySales.category)\
+            .limit(limit)\
+            .all()
+
+    @staticmethod
+    def buyer_lifetime_value(buyer_id: int) -> Optional[BuyerLifetimeValue]:
+        return db.session.get(BuyerLifetimeValue, buyer_id)
+
+    @staticmethod
+    def top_buyers(limit: int = 10) -> List[BuyerLifetimeValue]:
+        return db.session.query(BuyerLifetimeValue)\
+            .filter(BuyerLifetimeValue.order_count > 0)\
+            .order_by(BuyerLifetimeValue.revenue.desc(), BuyerLifetimeValue.buyer_id)\
+            .limit(limit)\
+            .all()
+
+    @staticmethod
+    def compute_rollups(chunk_size: int = 5000) -> Dict[str, Dict[tuple, List]]:
+        # Streams the sold orders, live and archived, in chunks (yield_per keeps
+        # one chunk of rows in memory) and aggregates them per key in Python.
+        rollups = {name: defaultdict(lambda: [0, 0, 0.0]) for name in ROLLUP_MODELS}
+        for model in (Order, OrderArchive):
+            result = db.session.execute(
+                select(model.buyer_id, model.quantity, model.total_price, model.created_at,
+                       ArtWork.artist_id, ArtWork.category)
+                .join(ArtWork, ArtWork.id == model.artwork_id)
+                .where(model.status.in_(REVENUE_STATUSES))
+                .order_by(model.id)
+                .execution_options(yield_per=chunk_size)
+            )
+            for chunk in result.partitions():
+                for buyer_id, quantity, total_price, created_at, artist_id, category in chunk:
+                    day = created_at.date()
+                    for name, key in (('artist_day', (artist_id, day)), ('category_day', (category, day)),
+                                      ('buyer', (buyer_id,))):
+                        totals = rollups[name][key]
+                        totals[0] += 1
+                        totals[1] += quantity if quantity is not None else 1
+                        totals[2] += total_price
+        return rollups
+
+    @staticmethod
+    def rebuild(chunk_size: int = 5000) -> Dict[str, int]:
+        # Recomputes every rollup from order history and reports, per rollup,
+        # how many stored rows disagreed with it.
+        expected = RollupRepository.compute_rollups(chunk_size)
+        drift = {}
+        for name, (model, key_columns) in ROLLUP_MODELS.items():
+            keys = [getattr(model, column) for column in key_columns]
+            stored = {tuple(row[:len(keys)]): row[len(keys):] for row in
+                      db.session.query(*keys, model.order_count, model.units, model.revenue)}
+            drift[name] = sum(
+                1 for key in set(stored) | set(expected[name])
+                if not _same(stored.get(key), expected[name].get(key))
+            )
+            db.session.execute(delete(model))
+            rows = [dict(zip(key_columns + ('order_count', 'units', 'revenue'), key + tuple(totals)))
+                    for key, totals in expected[name].items()]
+            for start in range(0, len(rows), chunk_size):
+                db.session.execute(insert(model), rows[start:start + chunk_size])
+        db.session.commit()
+        return drift
+
+
+def _same(stored, expected) -> bool:
+    # Rows that only ever netted out to zero count as absent.
+    stored = stored or (0, 0, 0.0)
+    expected = expected or (0, 0, 0.0)
+    return stored[0] == expected[0] and stored[1] == expected[1] and abs(stored[2] - expected[2]) < 0.005
@@ -1,13 +1,30 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, List, Sequence, Tuple
+from passlib.hash import bcrypt
 from pydantic import EmailStr
+from sqlalchemy import select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 from config.config import db
-from models.user import User
+from models.user import User, Role
+from repositories.email_outbox_repo import EmailOutboxRepository
+from repositories.pagination import keyset_page
+
+# Changing any of these revokes the user's outstanding access tokens.
+CREDENTIAL_FIELDS = {"email", "password", "role"}
+
+SORT_COLUMNS = {
+    'created_at': User.created_at,
+    'email': User.email,
+    'id': User.id,
+}
 
 class UserRepository:
     @staticmethod
     def create_user(first_name: str, last_name: str, email: EmailStr, role: str,
-                    password: str, verification_code: Optional[str] = None) -> User:
+                    password: str, verification_code: Optional[str] = None,
+                    outbox: Iterable[Dict[str, str]] = ()) -> User:
+        # outbox holds emails (EmailOutboxRepository.enqueue arguments) that
+        # must go out if, and only if, the user is created.
         try:
             user = User(
                 first_name=first_name,
@@ -16,11 +33,10 @@ class UserRepository:
                 role=role,
                 verification_code=verification_code,
             )
-            if hasattr(user, "set_password"):
-                user.set_password(password)
-            else:
-                user.password = password
+            UserRepository.set_password(user, password)
             db.session.add(user)
+            for email in outbox:
+                EmailOutboxRepository.enqueue(**email)
             db.session.commit()
             db.session.refresh(user)
             return user
@@ -28,6 +44,15 @@ class UserRepository:
             db.session.rollback()
             raise ValueError("A user already exists") from e
 
+    @staticmethod
+    def set_password(user: User, password_hash: str) -> None:
+        # The only way a password reaches the column. UserService does the
+        # hashing; anything that is not a bcrypt hash (plaintext, '') is
+        # refused rather than stored and left to break every later login.
+        if not isinstance(password_hash, str) or not bcrypt.identify(password_hash):
+            raise ValueError("Password must be stored as a bcrypt hash")
+        user.password = password_hash
+
     @staticmethod
     def save(user: User) -> User:
         db.session.add(user)
@@ -61,21 +86,38 @@ class UserRepository:
     def find_all_users() -> List[User]:
         return db.session.query(User).all()
 
+    @staticmethod
+    def find_all_user_rows(fields: Sequence[str]) -> List[Row]:
+        # find_all_users as plain column tuples: no identity map, no
+        # attribute instrumentation, only the columns the caller serializes.
+        return db.session.execute(select(*[getattr(User, field) for field in fields])).all()
+
+    @staticmethod
+    def list_users(role: Optional[Role] = None, is_verified: Optional[bool] = None, sort_by: str = 'created_at',
+                   descending: bool = True, limit: int = 50,
+                   cursor: Optional[str] = None) -> Tuple[List[User], Optional[str]]:
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort users by '{sort_by}'")
+        query = db.session.query(User)
+        if role is not None:
+            query = query.filter(User.role == role)
+        if is_verified is not None:
+            query = query.filter(User.is_verified.is_(is_verified))
+        return keyset_page(query, SORT_COLUMNS[sort_by], User.id, limit, cursor, descending)
+
     @staticmethod
     def update_user(user_id: int, updated_data: Dict[str, Any]) -> Optional[User]:
         user = UserRepository.find_by_user_id(user_id)
         if not user:
             return None
-        allowed_fields = {"first_name", "last_name", "email", "role", "verification_code"}
         if "password" in updated_data:
-            if hasattr(user, "set_password"):
-                user.set_password(updated_data["password"])
-            else:
-                user.password = updated_data["password"]
-            updated_data.pop("password", None)
+            UserRepository.set_password(user, updated_data["password"])
+        allowed_fields = {"first_name", "last_name", "email", "role", "verification_code"}
         for key, value in list(updated_data.items()):
             if key in allowed_fields:
                 setattr(user, key, value)
+        if CREDENTIAL_FIELDS & updated_data.keys():
+            user.token_version = User.token_version + 1
         try:
             db.session.commit()
             db.session.refresh(user)
@@ -84,6 +126,14 @@ class UserRepository:
             db.session.rollback()
             raise ValueError("Update failed due to data constraint (Maybe email already taken)") from e
 
+    @staticmethod
+    def revoke_tokens(user_id: int) -> bool:
+        revoked = db.session.execute(
+            update(User).where(User.id == user_id).values(token_version=User.token_version + 1)
+        ).rowcount
+        db.session.commit()
+        return bool(revoked)
+
     @staticmethod
     def delete_user(user_id: int) -> bool:
         user = UserRepository.find_by_user_id(user_id)
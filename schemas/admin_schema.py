@@ -0,0 +1,83 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel, EmailStr, Field
+from schemas.order_schema import OrderResponseSchema, OrderStatusSchema
+from schemas.payment_schema import PaymentResponseSchema, PaymentStatusSchema, PaymentMethodSchema
+from schemas.user_schema import UserResponseSchema, UserRole
+
+
+class UserSummary(BaseModel):
+    id: int
+    first_name: str
+    last_name: str
+    email: EmailStr
+
+    class Config:
+        from_attributes = True
+
+
+class ArtworkSummary(BaseModel):
+    id: int
+    name: str
+    price: float
+    artist_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class AdminOrderResponse(OrderResponseSchema):
+    buyer: UserSummary
+    artwork: ArtworkSummary
+    payments: List[PaymentResponseSchema] = []
+
+
+class AdminPaymentOrder(OrderResponseSchema):
+    buyer: UserSummary
+
+
+class AdminPaymentResponse(PaymentResponseSchema):
+    order: AdminPaymentOrder
+
+
+class UserListingSchema(BaseModel):
+    role: Optional[UserRole] = None
+    is_verified: Optional[bool] = None
+    sort_by: Literal['created_at', 'email', 'id'] = 'created_at'
+    descending: bool = True
+    limit: int = Field(default=50, gt=0, le=200)
+    cursor: Optional[str] = None
+
+
+class OrderListingSchema(BaseModel):
+    status: Optional[OrderStatusSchema] = None
+    buyer_id: Optional[int] = None
+    artwork_id: Optional[int] = None
+    sort_by: Literal['created_at', 'total_price', 'id'] = 'created_at'
+    descending: bool = True
+    limit: int = Field(default=50, gt=0, le=200)
+    cursor: Optional[str] = None
+
+
+class PaymentListingSchema(BaseModel):
+    status: Optional[PaymentStatusSchema] = None
+    payment_method: Optional[PaymentMethodSchema] = None
+    order_id: Optional[int] = None
+    sort_by: Literal['created_at', 'amount', 'id'] = 'created_at'
+    descending: bool = True
+    limit: int = Field(default=50, gt=0, le=200)
+    cursor: Optional[str] = None
+
+
+class UserPage(BaseModel):
+    items: List[UserResponseSchema]
+    next_cursor: Optional[str] = None
+
+
+class OrderPage(BaseModel):
+    items: List[AdminOrderResponse]
+    next_cursor: Optional[str] = None
+
+
+class PaymentPage(BaseModel):
+    items: List[AdminPaymentResponse]
+    next_cursor: Optional[str] = None
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, constr, Field
+from typing import Optional, List, Literal, Dict
+from pydantic import BaseModel, constr, Field, model_validator
 
 
 class CreateArtworkSchema(BaseModel):
@@ -21,6 +21,60 @@ class ArtWorkResponse(BaseModel):
     is_available: bool
     created_at: datetime
     artist_id: int
+    derivatives: Optional[Dict[str, str]] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ArtworkImportReport(BaseModel):
+    total: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+
+class ArtworkSearchResult(ArtWorkResponse):
+    score: float
+    # Escaped HTML: only the <mark> tags around matched terms are markup.
+    highlighted_name: str
+    snippet: str
+
+
+class BrowseArtworkSchema(BaseModel):
+    category: Optional[str] = None
+    min_price: Optional[float] = Field(default=None, ge=0)
+    max_price: Optional[float] = Field(default=None, ge=0)
+    artist_id: Optional[int] = None
+    sort_by: Literal['created_at', 'price', 'id'] = 'created_at'
+    descending: bool = True
+    limit: int = Field(default=20, gt=0, le=100)
+    cursor: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_price_range(self):
+        if self.min_price is not None and self.max_price is not None and self.min_price > self.max_price:
+            raise ValueError("min_price cannot be greater than max_price")
+        return self
+
+
+class ArtworkPage(BaseModel):
+    items: List[ArtWorkResponse]
+    next_cursor: Optional[str] = None
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class CatalogFacets(BaseModel):
+    categories: List[FacetCount]
+    price_bands: List[FacetCount]
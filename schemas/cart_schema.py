@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import List
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field, AliasChoices
+from schemas.artwork_schema import ArtWorkResponse
 
 class CartSchema(BaseModel):
     buyer_id: int
@@ -11,16 +12,20 @@ class CartItemSchemaResponse(BaseModel):
     artwork_id: int
     quantity: int
     subtotal: float
+    is_available: bool = True
+    artwork: Optional[ArtWorkResponse] = None
 
     class Config:
         from_attributes = True
 
 class CartResponse(BaseModel):
-    id: int
+    id: int = Field(validation_alias=AliasChoices('cart_id', 'id'))
     buyer_id: int
     created_at: datetime
     updated_at: datetime
     items: List[CartItemSchemaResponse] = []
+    item_count: int = 0
+    total: float = 0.0
 
     class Config:
         from_attributes = True
\ No newline at end of file
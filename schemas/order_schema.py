@@ -1,6 +1,7 @@
 from datetime import datetime
 from enum import Enum
-from pydantic import BaseModel, Field
+from typing import List, Optional
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
 
 
 class OrderStatusSchema(str, Enum):
@@ -27,4 +28,36 @@ class OrderResponseSchema(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class OrderTransitionSchema(BaseModel):
+    to_status: OrderStatusSchema
+    order_ids: Optional[List[int]] = None
+    status: Optional[OrderStatusSchema] = None
+    buyer_id: Optional[int] = None
+    artwork_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if self.order_ids is None and self.status is None and self.buyer_id is None and self.artwork_id is None:
+            raise ValueError("Select the orders to transition by id or by filter")
+        return self
+
+
+class OrderTransitionReport(BaseModel):
+    to_status: OrderStatusSchema
+    moved: List[int]
+    rejected: List[int]
+
+
+class OrderArchiveReport(BaseModel):
+    orders: int = 0
+    payments: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+
+# Validates a whole list of ORM rows in one call instead of one model_validate
+# per order.
+OrderResponseList = TypeAdapter(List[OrderResponseSchema])
@@ -18,7 +18,6 @@ class CreatePaymentSchema(BaseModel):
     order_id: int
     amount: float = Field(..., gt=0)
     payment_method: PaymentMethodSchema
-    payment_status: PaymentStatusSchema = PaymentStatusSchema.PENDING
 
 
 class PaymentResponseSchema(BaseModel):
@@ -30,4 +29,4 @@ class PaymentResponseSchema(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
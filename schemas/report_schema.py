@@ -0,0 +1,61 @@
+from datetime import date
+from typing import List
+from pydantic import BaseModel, Field, model_validator
+
+
+class SalesPeriodSchema(BaseModel):
+    start: date
+    end: date
+    limit: int = Field(default=10, ge=1, le=100)
+
+    @model_validator(mode="after")
+    def check_period(self):
+        if self.end < self.start:
+            raise ValueError("end must not be before start")
+        return self
+
+
+class SalesTotals(BaseModel):
+    order_count: int = 0
+    units: int = 0
+    revenue: float = 0.0
+
+    class Config:
+        from_attributes = True
+
+
+class DailySales(SalesTotals):
+    day: date
+
+
+class CategorySales(SalesTotals):
+    category: str
+
+
+class BuyerValue(SalesTotals):
+    buyer_id: int
+
+
+class ArtistSalesReport(BaseModel):
+    artist_id: int
+    start: date
+    end: date
+    totals: SalesTotals
+    days: List[DailySales]
+
+
+class SalesDashboard(BaseModel):
+    start: date
+    end: date
+    top_categories: List[CategorySales]
+    top_buyers: List[BuyerValue]
+
+
+class ReconciliationReport(BaseModel):
+    run_id: int
+    orders_checked: int = 0
+    payments_checked: int = 0
+    discrepancies: int = 0
+    chunks: int = 0
+    completed: bool = False
+    elapsed_seconds: float = 0.0
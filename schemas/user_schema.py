@@ -2,7 +2,7 @@ import secrets
 from datetime import datetime
 from enum import Enum
 from typing import Optional
-from pydantic import BaseModel, constr, EmailStr, model_validator
+from pydantic import BaseModel, constr, EmailStr, model_validator, field_validator
 
 class UserRole(str, Enum):
     BUYER = "BUYER"
@@ -40,5 +40,18 @@ class UserResponseSchema(BaseModel):
     is_verified: bool
     created_at: datetime
 
+    @field_validator("role", mode="before")
+    @classmethod
+    def role_from_model(cls, value):
+        # models.user.Role uses lowercase values; match on the member name.
+        return value.name if isinstance(value, Enum) else value
+
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class AccessTokenSchema(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    user: UserResponseSchema
@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from typing import Optional
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from models.user import Role, User
+from repositories.cache import InMemoryCacheBackend, build_cache_backend
+from repositories.user_repo import UserRepository
+
+DEFAULT_TOKEN_TTL = 15 * 60
+DEFAULT_PRINCIPAL_TTL = 30
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: int
+    role: Role
+    token_version: int
+
+
+class AccessTokenService:
+    # Tokens are signed (not encrypted) and carry the user id, role and token
+    # version, so checking one needs no session store. What it does need is
+    # the user's current token version, to honour revocation; that comes from
+    # a short-lived principal cache, so most requests never reach the
+    # database. Revocation is immediate in this process (and everywhere with
+    # the Redis backend) and takes at most the cache TTL elsewhere.
+    def __init__(self, secret_key: str, ttl_seconds: int = DEFAULT_TOKEN_TTL, principal_cache=None):
+        self.ttl_seconds = ttl_seconds
+        self.serializer = URLSafeTimedSerializer(secret_key, salt="access-token")
+        if principal_cache is None:
+            principal_cache = InMemoryCacheBackend(ttl_seconds=DEFAULT_PRINCIPAL_TTL)
+        self.principal_cache = principal_cache
+
+    def issue(self, user: User) -> str:
+        return self.serializer.dumps({"uid": user.id, "role": user.role.name, "ver": user.token_version})
+
+    def authenticate(self, token: str) -> Principal:
+        try:
+            payload = self.serializer.loads(token, max_age=self.ttl_seconds)
+        except SignatureExpired:
+            raise InvalidToken("Access token has expired")
+        except BadSignature:
+            raise InvalidToken("Invalid access token")
+        current = self._current(payload["uid"])
+        if current is None or current["token_version"] != payload["ver"]:
+            raise InvalidToken("Access token has been revoked")
+        return Principal(user_id=payload["uid"], role=Role[current["role"]], token_version=payload["ver"])
+
+    def _current(self, user_id: int) -> Optional[dict]:
+        key = str(user_id)
+        cached = self.principal_cache.get(key)
+        if cached is None:
+            user = UserRepository.find_by_user_id(user_id)
+            if user is None:
+                # Not cached: a miss costs one primary-key lookup, and caching
+                # it would need invalidating whenever a user is created.
+                return None
+            cached = {"token_version": user.token_version, "role": user.role.name}
+            self.principal_cache.set(key, cached)
+        return cached
+
+    def invalidate(self, user_id: int) -> None:
+        self.principal_cache.delete(str(user_id))
+
+
+def build_access_token_service(config) -> AccessTokenService:
+    return AccessTokenService(
+        config["SECRET_KEY"],
+        ttl_seconds=config.get("ACCESS_TOKEN_TTL", DEFAULT_TOKEN_TTL),
+        principal_cache=build_cache_backend(config, prefix="PRINCIPAL_CACHE", namespace="principal",
+                                            default_ttl=DEFAULT_PRINCIPAL_TTL),
+    )
@@ -1,6 +1,18 @@
+from typing import Optional
+from config.sqlite import retry_on_lock
+from models.order import OrderStatus
+from models.payment import PaymentStatus, PaymentMethod
+from models.user import Role
 from repositories import OrderRepository
 from repositories import PaymentRepository
 from repositories import UserRepository
+from repositories import RollupRepository
+from schemas.admin_schema import UserListingSchema, OrderListingSchema, PaymentListingSchema, UserPage, OrderPage, \
+    PaymentPage, AdminOrderResponse, AdminPaymentResponse
+from schemas.order_schema import OrderTransitionSchema, OrderTransitionReport
+from schemas.serialization import UserResponseRows, OrderResponseRows, PaymentResponseRows
+from schemas.report_schema import SalesPeriodSchema, CategorySales, BuyerValue, ArtistSalesReport, SalesDashboard
+from services.artist_service import ArtworkService
 
 
 class AdminService:
@@ -8,12 +20,72 @@ class AdminService:
         self.user_repo = UserRepository()
         self.payment_repo = PaymentRepository()
         self.order_repo = OrderRepository()
+        self.rollup_repo = RollupRepository()
 
-    def get_all_users(self):
-        return self.user_repo.find_all_users()
+    # Listings are keyset-paginated (at most one page of rows in memory) and
+    # eager-load what each row shows, so a page costs the same few queries
+    # however large the underlying table is.
+    def list_users(self, filters: Optional[UserListingSchema] = None) -> UserPage:
+        filters = filters or UserListingSchema()
+        params = filters.model_dump()
+        if filters.role is not None:
+            params['role'] = Role[filters.role.name]
+        users, next_cursor = self.user_repo.list_users(**params)
+        return UserPage(items=UserResponseRows.validate(users), next_cursor=next_cursor)
 
-    def get_all_orders(self):
-        return self.order_repo.get_all_orders()
+    # Full-table exports read column tuples rather than ORM objects and turn
+    # them into JSON bytes with one bulk validate and one bulk dump.
+    def export_users(self) -> bytes:
+        return UserResponseRows.dump_json(self.user_repo.find_all_user_rows(UserResponseRows.fields))
 
-    def get_all_payments(self):
-        return self.payment_repo.get_all_payments()
+    def export_orders(self, include_archived: bool = False) -> bytes:
+        return OrderResponseRows.dump_json(self.order_repo.get_all_order_rows(OrderResponseRows.fields,
+                                                                              include_archived))
+
+    def export_payments(self, include_archived: bool = False) -> bytes:
+        return PaymentResponseRows.dump_json(self.payment_repo.get_all_payment_rows(PaymentResponseRows.fields,
+                                                                                    include_archived))
+
+    def list_orders(self, filters: Optional[OrderListingSchema] = None) -> OrderPage:
+        filters = filters or OrderListingSchema()
+        params = filters.model_dump()
+        if filters.status is not None:
+            params['status'] = OrderStatus[filters.status.name]
+        orders, next_cursor = self.order_repo.list_orders(**params)
+        return OrderPage(items=[AdminOrderResponse.model_validate(order) for order in orders],
+                         next_cursor=next_cursor)
+
+    def list_payments(self, filters: Optional[PaymentListingSchema] = None) -> PaymentPage:
+        filters = filters or PaymentListingSchema()
+        params = filters.model_dump()
+        if filters.status is not None:
+            params['status'] = PaymentStatus[filters.status.name]
+        if filters.payment_method is not None:
+            params['payment_method'] = PaymentMethod[filters.payment_method.name]
+        payments, next_cursor = self.payment_repo.list_payments(**params)
+        return PaymentPage(items=[AdminPaymentResponse.model_validate(payment) for payment in payments],
+                           next_cursor=next_cursor)
+
+    def transition_orders(self, request: OrderTransitionSchema) -> OrderTransitionReport:
+        filters = {key: value for key, value in request.model_dump(include={'status', 'buyer_id', 'artwork_id'}).items()
+                   if value is not None}
+        if 'status' in filters:
+            filters['status'] = OrderStatus[filters['status'].name]
+        moved, rejected = retry_on_lock(lambda: self.order_repo.bulk_transition(
+            OrderStatus[request.to_status.name], order_ids=request.order_ids, **filters
+        ))
+        return OrderTransitionReport(to_status=request.to_status, moved=moved, rejected=rejected)
+
+    # Reports read the sales rollups, never the orders table, so they cost the
+    # same however many orders have been placed.
+    def artist_sales(self, artist_id: int, period: SalesPeriodSchema) -> ArtistSalesReport:
+        return ArtworkService(artist_id).get_my_sales(period)
+
+    def sales_dashboard(self, period: SalesPeriodSchema) -> SalesDashboard:
+        return SalesDashboard(
+            start=period.start,
+            end=period.end,
+            top_categories=[CategorySales.model_validate(row)
+                            for row in self.rollup_repo.top_categories(period.start, period.end, period.limit)],
+            top_buyers=[BuyerValue.model_validate(row) for row in self.rollup_repo.top_buyers(period.limit)],
+        )
@@ -1,19 +1,91 @@
+import time
+from typing import IO
+from flask import current_app, has_app_context
+from pydantic import ValidationError
 from repositories.artwork_repo import ArtworkRepository
+from repositories.rollup_repo import RollupRepository
+from schemas.artwork_schema import CreateArtworkSchema, ArtworkImportReport, ImportRowError
+from schemas.report_schema import SalesPeriodSchema, SalesTotals, DailySales, ArtistSalesReport
+from services.artwork_import import iter_records, chunked, describe_error, to_row
 
 class ArtworkService:
-    def __init__(self, artist_id: int):
+    def __init__(self, artist_id: int, image_pipeline=None):
         self.artwork_repo = ArtworkRepository()
+        self.rollup_repo = RollupRepository()
         self.artist_id = artist_id
+        if image_pipeline is None and has_app_context():
+            image_pipeline = current_app.extensions.get('image_pipeline')
+        self.image_pipeline = image_pipeline
 
     def upload_artwork(self, artwork_data):
-        return self.artwork_repo.create_artwork(
+        artwork = self.artwork_repo.create_artwork(
             name=artwork_data.name,
             description=artwork_data.description,
             image_url=artwork_data.image_url,
             price=artwork_data.price,
             category=artwork_data.category,
-            artist_id=artwork_data.artist_id
+            artist_id=self.artist_id
         )
+        if self.image_pipeline is not None:
+            self.image_pipeline.submit(artwork.id, artwork.image_url)
+        return artwork
+
+    def bulk_import(self, stream: IO[str], fmt: str = 'csv', chunk_size: int = 1000,
+                    max_errors: int = 1000) -> ArtworkImportReport:
+        report = ArtworkImportReport()
+        started = time.perf_counter()
+
+        def record_error(line: int, error: str):
+            report.failed += 1
+            if len(report.errors) < max_errors:
+                report.errors.append(ImportRowError(line=line, error=error))
+
+        for chunk in chunked(iter_records(stream, fmt), chunk_size):
+            report.total += len(chunk)
+            lines, rows = [], []
+            for line, record in chunk:
+                try:
+                    if isinstance(record, Exception):
+                        raise record
+                    artwork = CreateArtworkSchema.model_validate(record)
+                except (ValidationError, ValueError) as e:
+                    record_error(line, describe_error(e))
+                    continue
+                lines.append(line)
+                rows.append(to_row(artwork, self.artist_id))
+            if not rows:
+                continue
+
+            try:
+                created = self.artwork_repo.bulk_create_artworks(rows)
+            except ValueError:
+                # Something in the chunk violates a constraint; redo it row by
+                # row inside savepoints to find out which rows are at fault.
+                created = []
+                for line, (row, error) in zip(lines, self.artwork_repo.create_artworks_isolated(rows)):
+                    if error:
+                        record_error(line, error)
+                    else:
+                        created.append(row)
+            report.inserted += len(created)
+            if self.image_pipeline is not None:
+                for row in created:
+                    self.image_pipeline.submit(row.id, row.image_url)
+
+        report.elapsed_seconds = time.perf_counter() - started
+        if report.elapsed_seconds > 0:
+            report.rows_per_second = report.total / report.elapsed_seconds
+        return report
 
     def get_my_artworks(self):
-        return self.artwork_repo.find_by_artist_id(self.artist_id)
\ No newline at end of file
+        return self.artwork_repo.find_by_artist_id(self.artist_id)
+
+    def get_my_sales(self, period: SalesPeriodSchema) -> ArtistSalesReport:
+        return ArtistSalesReport(
+            artist_id=self.artist_id,
+            start=period.start,
+            end=period.end,
+            totals=SalesTotals.model_validate(self.rollup_repo.artist_totals(self.artist_id, period.start, period.end)),
+            days=[DailySales.model_validate(row)
+                  for row in self.rollup_repo.artist_daily_sales(self.artist_id, period.start, period.end)],
+        )
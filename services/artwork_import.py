@@ -0,0 +1,56 @@
+import csv
+import json
+from itertools import islice
+from typing import IO, Any, Dict, Iterator, List, Tuple
+from pydantic import ValidationError
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+def iter_records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Any]]:
+    # Yields (line number, raw record) pairs lazily so a 50k-row file is never
+    # held in memory. Unparseable JSON lines come through as the exception.
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, {key: value for key, value in record.items() if value not in (None, "")}
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, e
+    else:
+        raise ValueError(f"Unsupported import format '{fmt}', expected one of {', '.join(IMPORT_FORMATS)}")
+
+
+def chunked(records: Iterator[Tuple[int, Any]], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def describe_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in item['loc']) or 'record'}: {item['msg']}" for item in error.errors()
+        )
+    if isinstance(error, json.JSONDecodeError):
+        return f"invalid JSON: {error.msg}"
+    return str(error)
+
+
+def to_row(artwork: Any, artist_id: int) -> Dict[str, Any]:
+    return {
+        "name": artwork.name,
+        "description": artwork.description,
+        "image_url": artwork.image_url,
+        "price": artwork.price,
+        "category": artwork.category,
+        "artist_id": artist_id,
+        "is_available": True,
+    }
@@ -1,23 +1,124 @@
+from typing import Optional, List, Dict, Any
+from config.sqlite import retry_on_lock
 from repositories.artwork_repo import ArtworkRepository
+from models.order import OrderStatus
+from models.payment import PaymentMethod, PaymentStatus
 from repositories.order_repo import OrderRepository
+from repositories.payment_repo import PaymentRepository
+from repositories.redis_cart_repo import current_cart_repository
+from repositories.facet_repo import FacetRepository
+from models.artwork_facet import CATEGORY, PRICE_BAND, PRICE_BANDS
+from schemas.artwork_schema import ArtworkPage, BrowseArtworkSchema, ArtworkSearchResult, \
+    CatalogFacets, FacetCount
+from schemas.cart_schema import CartResponse
+from schemas.order_schema import OrderResponseSchema, OrderResponseList
+from schemas.payment_schema import CreatePaymentSchema, PaymentResponseSchema
+from schemas.serialization import ArtworkResponseRows
+from services.idempotency import run_idempotent
 
 class BuyerService:
     def __init__(self, user_id: int):
         self.artwork_repo = ArtworkRepository()
+        self.cart_repo = current_cart_repository()
         self.user_id = user_id
 
-    def browse_artwork(self):
-        return self.artwork_repo.find_all_available()
+    def browse_artwork(self, filters: Optional[BrowseArtworkSchema] = None) -> ArtworkPage:
+        filters = filters or BrowseArtworkSchema()
+        artworks, next_cursor = self.artwork_repo.browse_available(**filters.model_dump())
+        return ArtworkPage(
+            items=ArtworkResponseRows.validate(artworks),
+            next_cursor=next_cursor
+        )
+
+    def export_available_artwork(self) -> bytes:
+        # The whole available catalog as JSON bytes, serialized in bulk.
+        return ArtworkResponseRows.dump_json(self.artwork_repo.find_all_available_rows(ArtworkResponseRows.fields))
+
+    def search_artwork(self, query: str, filters: Optional[Dict[str, Any]] = None,
+                       limit: int = 20) -> List[ArtworkSearchResult]:
+        rows = self.artwork_repo.search(query, filters, limit)
+        return [ArtworkSearchResult.model_validate(row) for row in rows]
+
+    def get_facets(self) -> CatalogFacets:
+        facets = FacetRepository.get_facets()
+        categories = sorted(facets[CATEGORY].items(), key=lambda item: (-item[1], item[0]))
+        return CatalogFacets(
+            categories=[FacetCount(value=value, count=count) for value, count in categories],
+            price_bands=[FacetCount(value=label, count=facets[PRICE_BAND][label])
+                         for label, _, _ in PRICE_BANDS if label in facets[PRICE_BAND]]
+        )
+
+    def get_cart_view(self) -> Optional[CartResponse]:
+        view = self.cart_repo.get_cart_view(self.user_id)
+        if view is None:
+            return None
+        cart, item_count, total = view
+        return CartResponse.model_validate(cart).model_copy(update={'item_count': item_count, 'total': total})
+
+    # Each write below takes an optional client-chosen idempotency key: a retry
+    # with the same key gets the first call's result instead of a duplicate.
+    def checkout(self, idempotency_key: Optional[str] = None) -> List[OrderResponseSchema]:
+        # get_cart_by_buyer flushes any write-behind cart state first.
+        cart = self.cart_repo.get_cart_by_buyer(self.user_id)
+        cart_id = cart.cart_id if cart is not None else None
+
+        def checkout_cart():
+            if cart_id is None:
+                raise ValueError("Cart is empty")
+            return OrderResponseList.validate_python(OrderRepository.checkout_cart(self.user_id, cart_id),
+                                                     from_attributes=True)
+
+        if idempotency_key is None:
+            orders = retry_on_lock(checkout_cart)
+        else:
+            orders = run_idempotent(
+                f"checkout:{self.user_id}", idempotency_key, {}, checkout_cart,
+                serialize=lambda result: OrderResponseList.dump_python(result, mode='json'),
+                replay=OrderResponseList.validate_python
+            )
+        if cart_id is not None:
+            self.cart_repo.evict(cart_id)
+        return orders
+
+    def place_order(self, artwork_id: int, quantity: int, idempotency_key: Optional[str] = None):
+        def place_order():
+            return OrderRepository.place_order(self.user_id, artwork_id, quantity)
+
+        if idempotency_key is None:
+            return retry_on_lock(place_order)
+        # A replay returns the order the first call created, as it is now.
+        return run_idempotent(
+            f"place_order:{self.user_id}", idempotency_key, {'artwork_id': artwork_id, 'quantity': quantity},
+            place_order,
+            serialize=lambda order: OrderResponseSchema.model_validate(order).model_dump(mode='json'),
+            replay=lambda response: OrderRepository.get_orders_by_id(response['id'], include_archived=True)
+        )
 
-    def place_order(self, artwork_id: int, quantity: int):
-        artwork = ArtworkRepository.find_by_artwork_id(artwork_id)
-        if not artwork or not artwork.is_available:
-            raise ValueError('Artwork not found')
+    def create_payment(self, payment_data: CreatePaymentSchema,
+                       idempotency_key: Optional[str] = None) -> PaymentResponseSchema:
+        def create_payment():
+            order = OrderRepository.get_orders_by_id(payment_data.order_id)
+            if order is None or order.buyer_id != self.user_id:
+                raise ValueError("Order not found")
+            if order.status != OrderStatus.PENDING:
+                raise ValueError("Order is not awaiting payment")
+            if abs(payment_data.amount - order.total_price) > 0.005:
+                raise ValueError("Payment amount does not match the order total")
+            # Buyers only ever start a payment; its outcome comes from the
+            # gateway worker, which also moves the order to PAID.
+            payment = PaymentRepository.create_payment(
+                payment_data.order_id,
+                payment_data.amount,
+                PaymentMethod[payment_data.payment_method.name],
+                PaymentStatus.PENDING
+            )
+            return PaymentResponseSchema.model_validate(payment)
 
-        total_price = artwork.price * quantity
-        return OrderRepository.create_order(
-            buyer_id=self.user_id,
-            artwork_id=artwork_id,
-            quantity=quantity,
-            total_price=total_price
+        if idempotency_key is None:
+            return retry_on_lock(create_payment)
+        return run_idempotent(
+            f"create_payment:{self.user_id}", idempotency_key, payment_data.model_dump(mode='json'),
+            create_payment,
+            serialize=lambda payment: payment.model_dump(mode='json'),
+            replay=PaymentResponseSchema.model_validate
         )
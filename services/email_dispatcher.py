@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import queue
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional
+from flask import current_app, has_app_context
+from config.config import db
+from config.sqlite import retry_on_lock
+from models.email_outbox import OutboxStatus
+from repositories.email_outbox_repo import EmailOutboxRepository, EmailOutcome
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VERIFICATION_URL = "http://localhost:5000/verify?token={token}"
+
+
+def verification_email(recipient: str, first_name: str, token: str) -> Dict[str, str]:
+    url = DEFAULT_VERIFICATION_URL
+    if has_app_context():
+        url = current_app.config.get('VERIFICATION_URL', url)
+    return {
+        'kind': 'verification',
+        'recipient': recipient,
+        'subject': 'Verify your email address',
+        'body': f"Hi {first_name},\n\nConfirm your email address to finish signing up:\n\n"
+                f"{url.format(token=token)}\n",
+    }
+
+
+def is_permanent(error: Exception) -> bool:
+    # 5xx replies (unknown mailbox, rejected content) will not change on a
+    # retry; timeouts, dropped connections and 4xx replies may.
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class SmtpConnectionPool:
+    # Up to `size` authenticated SMTP sessions, kept open between batches so
+    # each email costs one MAIL/RCPT/DATA exchange instead of a new TCP (and
+    # TLS) handshake. A connection is used by one thread at a time.
+    def __init__(self, host: str, port: int = 25, size: int = 4, timeout: float = 10.0,
+                 starttls: bool = False, username: Optional[str] = None, password: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+        self.starttls = starttls
+        self.username = username
+        self.password = password
+        self.connections_opened = 0
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        with self._lock:
+            self.connections_opened += 1
+        return smtp
+
+    def send_batch(self, sender: str, jobs) -> List[Optional[Exception]]:
+        # Runs in a worker thread; returns None or the error for each job.
+        try:
+            smtp = self._idle.get_nowait()
+        except queue.Empty:
+            smtp = None
+        errors: List[Optional[Exception]] = []
+        for job in jobs:
+            message = EmailMessage()
+            message['From'] = sender
+            message['To'] = job.recipient
+            message['Subject'] = job.subject
+            message.set_content(job.body)
+            try:
+                if smtp is None:
+                    smtp = self._connect()
+                smtp.send_message(message)
+                errors.append(None)
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError) as e:
+                # The session is gone (or never started); later jobs in this
+                # batch reconnect, and fail fast if the server is down.
+                self._close(smtp)
+                smtp = None
+                errors.append(e)
+                if len(errors) < len(jobs):
+                    try:
+                        smtp = self._connect()
+                    except (smtplib.SMTPException, OSError) as down:
+                        errors.extend(down for _ in range(len(jobs) - len(errors)))
+                        break
+            except smtplib.SMTPException as e:
+                # smtplib has already reset the transaction; the session is fine.
+                errors.append(e)
+        if smtp is not None:
+            self._idle.put(smtp)
+        return errors
+
+    @staticmethod
+    def _close(smtp: Optional[smtplib.SMTP]) -> None:
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+@dataclass
+class EmailMetrics:
+    batches: int = 0
+    claimed: int = 0
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+    lost_claims: int = 0
+    smtp_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def as_dict(self) -> Dict[str, Any]:
+        metrics = asdict(self)
+        elapsed = time.monotonic() - metrics.pop('started_at')
+        metrics['sent_per_second'] = self.sent / elapsed if elapsed > 0 else 0.0
+        metrics['sent_per_smtp_second'] = self.sent / self.smtp_seconds if self.smtp_seconds else 0.0
+        return metrics
+
+
+class EmailDispatcher:
+    # Drains the outbox on an asyncio loop: claim a batch (one short
+    # transaction), split it across the pool's connections and send the parts
+    # concurrently (smtplib blocks, so each part runs in a thread), then
+    # settle the batch in one transaction. Failures back off with full jitter
+    # until max_attempts; permanent (5xx) failures and exhausted retries are
+    # dead-lettered.
+    def __init__(self, app, pool: SmtpConnectionPool, sender: str, batch_size: int = 100,
+                 lease_seconds: float = 120.0, max_attempts: int = 6, base_delay: float = 30.0,
+                 max_delay: float = 3600.0, interval_seconds: float = 1.0):
+        self.app = app
+        self.pool = pool
+        self.sender = sender
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.interval_seconds = interval_seconds
+        self.metrics = EmailMetrics()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _in_app(self, operation):
+        with self.app.app_context():
+            try:
+                return retry_on_lock(operation)
+            finally:
+                db.session.remove()
+
+    def _outcome(self, job, error: Optional[Exception]) -> EmailOutcome:
+        if error is None:
+            return EmailOutcome(job.id, job.attempts, OutboxStatus.SENT)
+        message = f"{error.__class__.__name__}: {error}"[:200]
+        if is_permanent(error) or job.attempts >= self.max_attempts:
+            return EmailOutcome(job.id, job.attempts, OutboxStatus.DEAD, error=message)
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (job.attempts - 1)))
+        return EmailOutcome(job.id, job.attempts, OutboxStatus.PENDING, error=message,
+                            next_attempt_at=datetime.utcnow() + timedelta(seconds=delay))
+
+    async def process_batch(self) -> int:
+        jobs = await asyncio.to_thread(
+            self._in_app, lambda: EmailOutboxRepository.claim_due(self.batch_size, self.lease_seconds))
+        if not jobs:
+            return 0
+        parts = [part for part in (jobs[n::self.pool.size] for n in range(self.pool.size)) if part]
+        with self._lock:
+            # One thread per connection; the loop's default executor is capped
+            # at a few threads per CPU and would leave connections idle.
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool.size, thread_name_prefix="email-smtp")
+            executor = self._executor
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        results = await asyncio.gather(*(loop.run_in_executor(executor, self.pool.send_batch, self.sender, part)
+                                         for part in parts))
+        smtp_seconds = time.perf_counter() - started
+        outcomes = [self._outcome(job, error)
+                    for part, errors in zip(parts, results) for job, error in zip(part, errors)]
+        settled = await asyncio.to_thread(self._in_app, lambda: EmailOutboxRepository.settle(outcomes))
+
+        with self._lock:
+            self.metrics.batches += 1
+            self.metrics.claimed += len(jobs)
+            self.metrics.smtp_seconds += smtp_seconds
+            self.metrics.lost_claims += len(outcomes) - settled
+            for outcome in outcomes:
+                if outcome.status == OutboxStatus.SENT:
+                    self.metrics.sent += 1
+                elif outcome.status == OutboxStatus.DEAD:
+                    self.metrics.dead += 1
+                    logger.warning("Dead-lettered email %s: %s", outcome.email_id, outcome.error)
+                else:
+                    self.metrics.retried += 1
+        return len(jobs)
+
+    async def drain(self, max_batches: Optional[int] = None) -> int:
+        # Sends batches until nothing is due; emails backing off are left for
+        # later.
+        processed = batches = 0
+        while max_batches is None or batches < max_batches:
+            claimed = await self.process_batch()
+            if not claimed:
+                break
+            processed += claimed
+            batches += 1
+        return processed
+
+    async def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claimed = await self.process_batch()
+            except Exception:
+                logger.exception("Email batch failed")
+                claimed = 0
+            if not claimed:
+                await asyncio.to_thread(self._stop.wait, self.interval_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        due, pending, dead = self._in_app(EmailOutboxRepository.queue_depth)
+        with self._lock:
+            stats = self.metrics.as_dict()
+        stats.update(queue_due=due, queue_pending=pending, dead_letters=dead,
+                     connections_opened=self.pool.connections_opened)
+        return stats
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="email-dispatcher",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.pool.close()
+
+
+def build_email_dispatcher(app) -> Optional[EmailDispatcher]:
+    config = app.config
+    if not config.get('SMTP_HOST'):
+        return None
+    pool = SmtpConnectionPool(
+        config['SMTP_HOST'],
+        port=config.get('SMTP_PORT', 25),
+        size=config.get('EMAIL_CONNECTIONS', 4),
+        timeout=config.get('SMTP_TIMEOUT', 10.0),
+        starttls=config.get('SMTP_STARTTLS', False),
+        username=config.get('SMTP_USERNAME'),
+        password=config.get('SMTP_PASSWORD'),
+    )
+    return EmailDispatcher(
+        app,
+        pool,
+        sender=config.get('EMAIL_SENDER', 'no-reply@artworksales.local'),
+        batch_size=config.get('EMAIL_BATCH_SIZE', 100),
+        max_attempts=config.get('EMAIL_MAX_ATTEMPTS', 6),
+        base_delay=config.get('EMAIL_RETRY_BASE_DELAY', 30.0),
+        interval_seconds=config.get('EMAIL_DISPATCH_INTERVAL', 1.0),
+    )
@@ -0,0 +1,59 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional, TypeVar
+from flask import current_app, has_app_context
+from sqlalchemy import inspect
+from config.config import db
+from config.sqlite import retry_on_lock, single_transaction
+from repositories.idempotency_repo import IdempotencyRepository
+
+T = TypeVar("T")
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+
+def request_fingerprint(request: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _setting(name: str, default):
+    return current_app.config.get(name, default) if has_app_context() else default
+
+
+def run_idempotent(scope: str, key: str, request: Dict[str, Any], operation: Callable[[], T],
+                   serialize: Callable[[T], Any], replay: Callable[[Any], T],
+                   ttl_seconds: Optional[int] = None) -> T:
+    # Runs operation at most once per (scope, key) while the key is live. The
+    # claim, the operation's writes and the stored response commit together
+    # in one transaction, so a request either leaves its complete response
+    # behind or no trace at all and can simply be retried. A repeat gets
+    # replay(stored response); the same key with a different request is refused.
+    ttl_seconds = ttl_seconds if ttl_seconds is not None else _setting('IDEMPOTENCY_TTL', DEFAULT_TTL_SECONDS)
+    fingerprint = request_fingerprint(request)
+
+    def claim_and_run():
+        with single_transaction():
+            stored = IdempotencyRepository.claim(scope, key, fingerprint, ttl_seconds)
+            if stored is not None:
+                return _snapshot(stored), None
+            result = operation()
+            IdempotencyRepository.complete(scope, key, serialize(result))
+            return None, result
+
+    stored, result = retry_on_lock(claim_and_run)
+    if stored is None:
+        # Hand back a model bound to the caller's session, not the closed one.
+        if inspect(result, raiseerr=False) is not None:
+            return db.session.merge(result, load=False)
+        return result
+    if stored['fingerprint'] != fingerprint:
+        raise ValueError(f"Idempotency key '{key}' was already used for a different request")
+    if not stored['completed']:
+        # Only rows written before claims and responses shared a transaction
+        # can be committed without a response; they expire with their TTL.
+        raise RuntimeError(f"A request with idempotency key '{key}' is still in progress")
+    return replay(json.loads(stored['response']))
+
+
+def _snapshot(row) -> Dict[str, Any]:
+    return {'fingerprint': row.fingerprint, 'completed': row.completed_at is not None, 'response': row.response}
@@ -0,0 +1,152 @@
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from PIL import Image, ImageOps
+from repositories.artwork_repo import ArtworkRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (160, 480, 960)
+DEFAULT_FORMATS = ("webp", "jpeg")
+FORMAT_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+DEFAULT_MAX_PIXELS = 40_000_000
+
+
+@dataclass(frozen=True)
+class ImageSourcePolicy:
+    # Where artist-supplied image URLs may be read from. image_url is user
+    # input, so local reads are confined to local_root and remote reads to
+    # the allow-listed schemes and hosts; both are capped in bytes, and the
+    # decoder refuses images over max_pixels before decompressing them.
+    local_root: str
+    allowed_hosts: FrozenSet[str] = frozenset()
+    allowed_schemes: FrozenSet[str] = frozenset({"https"})
+    max_bytes: int = DEFAULT_MAX_BYTES
+    max_pixels: int = DEFAULT_MAX_PIXELS
+
+
+class _RefuseRedirects(urllib.request.HTTPRedirectHandler):
+    # A redirect could lead anywhere, including past the host allow-list.
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        raise urllib.error.HTTPError(req.full_url, code, f"Refusing redirect to {newurl}", headers, fp)
+
+
+_opener = urllib.request.build_opener(_RefuseRedirects)
+
+
+def _read_capped(stream, max_bytes: int) -> bytes:
+    data = stream.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise ValueError(f"Image source is larger than {max_bytes} bytes")
+    return data
+
+
+def read_source(image_url: str, policy: ImageSourcePolicy, timeout: float = 10) -> bytes:
+    parsed = urllib.parse.urlsplit(image_url)
+    if parsed.scheme in ("http", "https"):
+        host = (parsed.hostname or "").lower()
+        if parsed.scheme not in policy.allowed_schemes or \
+                (host not in policy.allowed_hosts and parsed.netloc.lower() not in policy.allowed_hosts):
+            raise ValueError(f"Image host '{parsed.netloc}' is not allowed")
+        with _opener.open(image_url, timeout=timeout) as response:
+            return _read_capped(response, policy.max_bytes)
+    if parsed.scheme not in ("", "file"):
+        raise ValueError(f"Image URL scheme '{parsed.scheme}' is not allowed")
+
+    root = os.path.realpath(policy.local_root)
+    path = os.path.realpath(os.path.join(root, parsed.path if parsed.scheme == "file" else image_url))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError("Image path is outside the media root")
+    with open(path, "rb") as source:
+        return _read_capped(source, policy.max_bytes)
+
+
+def store_content_addressed(data: bytes, extension: str, storage_root: str) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    relative_path = f"{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+    path = os.path.join(storage_root, relative_path)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+    return relative_path
+
+
+def render_derivatives(image_url: str, storage_root: str, url_prefix: str,
+                       sizes: Iterable[int] = DEFAULT_SIZES,
+                       formats: Iterable[str] = DEFAULT_FORMATS,
+                       policy: Optional[ImageSourcePolicy] = None) -> Dict[str, str]:
+    # Runs in a worker process: decode once, then downscale from the largest
+    # size to the smallest so each resize starts from the nearest derivative.
+    policy = policy or ImageSourcePolicy(local_root=storage_root)
+    with Image.open(io.BytesIO(read_source(image_url, policy))) as original:
+        # open() has only read the header; refuse a decompression bomb before
+        # the pixels are decoded.
+        if original.width * original.height > policy.max_pixels:
+            raise ValueError(f"Image is {original.width}x{original.height}, over {policy.max_pixels} pixels")
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    derivatives = {}
+    for size in sorted(sizes, reverse=True):
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        for fmt in formats:
+            frame = image.convert("RGB") if fmt == "jpeg" else image
+            buffer = io.BytesIO()
+            frame.save(buffer, **FORMAT_OPTIONS[fmt])
+            relative_path = store_content_addressed(buffer.getvalue(), EXTENSIONS[fmt], storage_root)
+            derivatives[f"{fmt}_{size}"] = f"{url_prefix.rstrip('/')}/{relative_path}"
+    return derivatives
+
+
+class ImagePipeline:
+    def __init__(self, app, storage_root: str, url_prefix: str = "/media",
+                 sizes: Tuple[int, ...] = DEFAULT_SIZES, formats: Tuple[str, ...] = DEFAULT_FORMATS,
+                 max_workers: Optional[int] = None, source_policy: Optional[ImageSourcePolicy] = None):
+        self.app = app
+        self.storage_root = storage_root
+        self.source_policy = source_policy or ImageSourcePolicy(local_root=storage_root)
+        self.url_prefix = url_prefix
+        self.sizes = sizes
+        self.formats = formats
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, artwork_id: int, image_url: str) -> Future:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        recorded = Future()
+        rendering = self._executor.submit(render_derivatives, image_url, self.storage_root,
+                                          self.url_prefix, self.sizes, self.formats, self.source_policy)
+        rendering.add_done_callback(lambda done: self._record(artwork_id, done, recorded))
+        return recorded
+
+    def _record(self, artwork_id: int, rendering: Future, recorded: Future) -> None:
+        try:
+            derivatives = rendering.result()
+            with self.app.app_context():
+                ArtworkRepository.update_artwork(artwork_id, {"derivatives": derivatives})
+            recorded.set_result(derivatives)
+        except Exception as e:
+            logger.exception("Could not generate image derivatives for artwork %s", artwork_id)
+            recorded.set_exception(e)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,32 @@
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from config.sqlite import retry_on_lock
+from repositories.archive_repo import ArchiveRepository
+from schemas.order_schema import OrderArchiveReport
+
+
+def archive_closed_orders(older_than_days: int, batch_size: int = 500, max_batches: Optional[int] = None,
+                          pause_seconds: float = 0.0,
+                          clock: Callable[[], datetime] = datetime.utcnow) -> OrderArchiveReport:
+    # Each batch is its own short transaction, and the optional pause between
+    # batches hands the write lock back to live writers, so archiving years of
+    # history never stalls checkout for longer than one batch.
+    if older_than_days < 0 or batch_size < 1:
+        raise ValueError("older_than_days must be >= 0 and batch_size >= 1")
+    closed_before = clock() - timedelta(days=older_than_days)
+    report = OrderArchiveReport()
+    started = time.perf_counter()
+    while max_batches is None or report.batches < max_batches:
+        orders, payments = retry_on_lock(lambda: ArchiveRepository.archive_batch(closed_before, batch_size))
+        if not orders:
+            break
+        report.orders += orders
+        report.payments += payments
+        report.batches += 1
+        if orders < batch_size:
+            break
+        if pause_seconds:
+            time.sleep(pause_seconds)
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,74 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from passlib.hash import bcrypt
+
+DEFAULT_ROUNDS = 12
+
+
+def hash_password(password: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    # Runs in a worker process. When the password matches a hash made with a
+    # different cost, the replacement is computed in the same round trip.
+    hasher = bcrypt.using(rounds=rounds)
+    if not hasher.verify(password, hashed):
+        return False, None
+    return True, hasher.hash(password) if hasher.needs_update(hashed) else None
+
+
+class PasswordHasher:
+    # bcrypt at a useful cost takes a few hundred milliseconds of pure CPU, so
+    # it runs in a bounded pool of worker processes instead of on the request
+    # thread. At most max_pending hashes queue up; past that a caller waits up
+    # to queue_timeout seconds for a slot and then gets a RuntimeError, so a
+    # login flood degrades into errors instead of an ever-growing backlog.
+    # max_workers=0 hashes inline, for scripts and tests.
+    def __init__(self, rounds: int = DEFAULT_ROUNDS, max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, queue_timeout: float = 5.0):
+        self.rounds = rounds
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending or max(1, self.max_workers) * 4)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _run(self, fn, *args):
+        if not self.max_workers:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise RuntimeError("Too many password hashes in progress, try again shortly")
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                executor = self._executor
+            return executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(hash_password, password, self.rounds)
+
+    def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        # Returns whether the password matches and, if the stored hash uses an
+        # outdated cost, its replacement.
+        return self._run(verify_and_update, password, hashed, self.rounds)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+def build_password_hasher(config) -> PasswordHasher:
+    return PasswordHasher(
+        rounds=config.get('PASSWORD_HASH_ROUNDS', DEFAULT_ROUNDS),
+        max_workers=config.get('PASSWORD_HASH_WORKERS'),
+        max_pending=config.get('PASSWORD_HASH_MAX_PENDING'),
+        queue_timeout=config.get('PASSWORD_HASH_QUEUE_TIMEOUT', 5.0),
+    )
@@ -0,0 +1,77 @@
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+
+# A decline is final; an unavailable gateway (timeout, outage) is worth
+# retrying later.
+class GatewayDeclined(ValueError):
+    pass
+
+
+class GatewayUnavailable(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class ChargeRequest:
+    payment_id: int
+    order_id: int
+    amount: float
+    payment_method: str
+    attempt: int
+
+    @property
+    def idempotency_key(self) -> str:
+        # Stable across attempts, so a gateway that saw a timed-out charge
+        # succeed does not take the money twice when it is retried.
+        return f"payment-{self.payment_id}"
+
+
+class PaymentGateway(Protocol):
+    # Returns the gateway's reference for a successful charge.
+    def charge(self, request: ChargeRequest) -> str:
+        ...
+
+
+class FakePaymentGateway:
+    # Local stand-in for a real gateway: sleeps for the configured latency and
+    # fails (transiently) or declines at the configured rates.
+    def __init__(self, latency_seconds: float = 0.0, failure_rate: float = 0.0, decline_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        self.decline_rate = decline_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.charges = {}
+
+    def charge(self, request: ChargeRequest) -> str:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        with self._lock:
+            roll = self._random.random()
+            if roll < self.failure_rate:
+                raise GatewayUnavailable(f"Gateway timed out charging payment {request.payment_id}")
+            if roll < self.failure_rate + self.decline_rate:
+                raise GatewayDeclined(f"Card declined for payment {request.payment_id}")
+            reference = self.charges.get(request.idempotency_key)
+            if reference is None:
+                reference = self.charges[request.idempotency_key] = f"fake_{uuid.uuid4().hex[:16]}"
+            return reference
+
+
+def build_payment_gateway(config) -> Optional[PaymentGateway]:
+    kind = config.get("PAYMENT_GATEWAY")
+    if kind is None:
+        return None
+    if kind == "fake":
+        return FakePaymentGateway(
+            latency_seconds=config.get("PAYMENT_FAKE_LATENCY", 0.05),
+            failure_rate=config.get("PAYMENT_FAKE_FAILURE_RATE", 0.0),
+            decline_rate=config.get("PAYMENT_FAKE_DECLINE_RATE", 0.0),
+        )
+    raise ValueError(f"Unknown payment gateway '{kind}'")
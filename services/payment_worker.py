@@ -0,0 +1,189 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from config.config import db
+from config.sqlite import retry_on_lock
+from models.payment import PaymentStatus
+from repositories.payment_repo import PaymentRepository, PaymentOutcome
+from services.payment_gateway import ChargeRequest, GatewayDeclined, PaymentGateway, build_payment_gateway
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PaymentMetrics:
+    batches: int = 0
+    claimed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retried: int = 0
+    lost_claims: int = 0
+    gateway_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def as_dict(self) -> Dict[str, Any]:
+        metrics = asdict(self)
+        elapsed = time.monotonic() - metrics.pop('started_at')
+        settled = self.succeeded + self.failed
+        metrics['settled_per_second'] = settled / elapsed if elapsed > 0 else 0.0
+        metrics['mean_gateway_seconds'] = self.gateway_seconds / self.claimed if self.claimed else 0.0
+        return metrics
+
+
+class PaymentWorker:
+    # Moves PENDING payments to SUCCESS or FAILED off the request thread.
+    # Each of `workers` loops claims a batch (one short transaction), charges
+    # the batch through the gateway on a shared thread pool with no
+    # transaction open, then settles the outcomes and the orders in another
+    # short transaction. Gateway timeouts and outages are retried with full
+    # jitter exponential backoff until max_attempts; declines fail at once.
+    def __init__(self, app, gateway: PaymentGateway, workers: int = 1, batch_size: int = 20,
+                 concurrency: int = 8, interval_seconds: float = 1.0, lease_seconds: float = 60.0,
+                 max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 300.0):
+        self.app = app
+        self.gateway = gateway
+        self.workers = workers
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.interval_seconds = interval_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = PaymentMetrics()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _charge(self, job) -> PaymentOutcome:
+        started = time.perf_counter()
+        request = ChargeRequest(payment_id=job.id, order_id=job.order_id, amount=job.amount,
+                                payment_method=job.payment_method.name, attempt=job.attempts)
+        try:
+            reference = self.gateway.charge(request)
+            outcome = PaymentOutcome(job.id, job.attempts, PaymentStatus.SUCCESS, reference=reference)
+        except GatewayDeclined as e:
+            outcome = PaymentOutcome(job.id, job.attempts, PaymentStatus.FAILED, error=str(e)[:200])
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"[:200]
+            if job.attempts >= self.max_attempts:
+                outcome = PaymentOutcome(job.id, job.attempts, PaymentStatus.FAILED, error=error)
+            else:
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (job.attempts - 1)))
+                outcome = PaymentOutcome(job.id, job.attempts, PaymentStatus.PENDING, error=error,
+                                         next_attempt_at=datetime.utcnow() + timedelta(seconds=delay))
+        with self._lock:
+            self.metrics.gateway_seconds += time.perf_counter() - started
+        return outcome
+
+    def process_batch(self) -> int:
+        with self.app.app_context():
+            try:
+                jobs = retry_on_lock(lambda: PaymentRepository.claim_due(self.batch_size, self.lease_seconds))
+            finally:
+                db.session.remove()
+        if not jobs:
+            return 0
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                    thread_name_prefix="payment-charge")
+            executor = self._executor
+        outcomes = list(executor.map(self._charge, jobs))
+        with self.app.app_context():
+            try:
+                settled, unpaid = retry_on_lock(lambda: PaymentRepository.settle(outcomes))
+            finally:
+                db.session.remove()
+        if unpaid:
+            logger.warning("Payments succeeded for orders that could not be marked PAID: %s", unpaid)
+
+        settled = set(settled)
+        with self._lock:
+            self.metrics.batches += 1
+            self.metrics.claimed += len(jobs)
+            self.metrics.lost_claims += len(outcomes) - len(settled)
+            for outcome in outcomes:
+                if outcome.payment_id not in settled:
+                    continue
+                if outcome.status == PaymentStatus.SUCCESS:
+                    self.metrics.succeeded += 1
+                elif outcome.status == PaymentStatus.FAILED:
+                    self.metrics.failed += 1
+                else:
+                    self.metrics.retried += 1
+        return len(jobs)
+
+    def drain(self, max_batches: Optional[int] = None) -> int:
+        # Processes batches until nothing is due; payments backing off are
+        # left for later.
+        processed = batches = 0
+        while max_batches is None or batches < max_batches:
+            claimed = self.process_batch()
+            if not claimed:
+                break
+            processed += claimed
+            batches += 1
+        return processed
+
+    def stats(self) -> Dict[str, Any]:
+        with self.app.app_context():
+            try:
+                due, pending = PaymentRepository.queue_depth()
+            finally:
+                db.session.remove()
+        with self._lock:
+            stats = self.metrics.as_dict()
+        stats.update(queue_due=due, queue_pending=pending)
+        return stats
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claimed = self.process_batch()
+            except Exception:
+                logger.exception("Payment batch failed")
+                claimed = 0
+            if not claimed:
+                self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._run, name=f"payment-worker-{n}", daemon=True)
+                         for n in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        # Claimed batches finish; anything unclaimed stays queued.
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def build_payment_worker(app) -> Optional[PaymentWorker]:
+    gateway = build_payment_gateway(app.config)
+    if gateway is None:
+        return None
+    return PaymentWorker(
+        app,
+        gateway,
+        workers=app.config.get('PAYMENT_WORKERS', 1),
+        batch_size=app.config.get('PAYMENT_BATCH_SIZE', 20),
+        concurrency=app.config.get('PAYMENT_CONCURRENCY', 8),
+        interval_seconds=app.config.get('PAYMENT_WORKER_INTERVAL', 1.0),
+        lease_seconds=app.config.get('PAYMENT_LEASE_SECONDS', 60.0),
+        max_attempts=app.config.get('PAYMENT_MAX_ATTEMPTS', 5),
+    )
@@ -0,0 +1,141 @@
+import json
+import time
+from itertools import groupby
+from operator import attrgetter
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+from sqlalchemy.engine import Row
+from config.sqlite import retry_on_lock
+from models.reconciliation import DiscrepancyKind
+from models.sales_rollup import REVENUE_STATUSES
+from repositories.reconciliation_repo import ReconciliationRepository, RECONCILIATION_SOURCES
+from schemas.report_schema import ReconciliationReport
+
+# Amounts are stored as floats; anything within half a cent matches.
+AMOUNT_TOLERANCE = 0.005
+
+
+def merge_join(orders: Iterable[Row], payments: Iterable[Row]) -> Iterator[Tuple[Optional[Row], List[Row]]]:
+    # Both inputs are sorted by order id. Yields every order with its
+    # payments, and (None, payments) for payments whose order is not there.
+    # Only one order's payments are held at a time.
+    groups = groupby(payments, key=attrgetter('order_id'))
+    group = next(groups, None)
+    for order in orders:
+        while group is not None and group[0] < order.id:
+            yield None, list(group[1])
+            group = next(groups, None)
+        if group is not None and group[0] == order.id:
+            yield order, list(group[1])
+            group = next(groups, None)
+        else:
+            yield order, []
+    while group is not None:
+        yield None, list(group[1])
+        group = next(groups, None)
+
+
+def find_discrepancies(order: Optional[Row], payments: List[Row]) -> List[dict]:
+    # An order that is PAID or further along needs exactly one successful
+    # payment for its total; any other order should have none.
+    if order is None:
+        return [_discrepancy(DiscrepancyKind.ORPHAN_PAYMENT, payment.order_id, payment=payment)
+                for payment in payments]
+    charged = sum(payment.amount for payment in payments)
+    if order.status not in REVENUE_STATUSES:
+        if not payments:
+            return []
+        return [_discrepancy(DiscrepancyKind.UNPAID_ORDER_CHARGED, order.id, order=order, payment=payments[-1],
+                             actual_amount=charged)]
+    if not payments:
+        return [_discrepancy(DiscrepancyKind.MISSING_PAYMENT, order.id, order=order)]
+    if len(payments) > 1:
+        return [_discrepancy(DiscrepancyKind.DUPLICATE_PAYMENT, order.id, order=order, payment=payments[-1],
+                             actual_amount=charged)]
+    if abs(charged - order.total_price) > AMOUNT_TOLERANCE:
+        return [_discrepancy(DiscrepancyKind.AMOUNT_MISMATCH, order.id, order=order, payment=payments[0],
+                             actual_amount=charged)]
+    return []
+
+
+def _discrepancy(kind: DiscrepancyKind, order_id: int, order: Optional[Row] = None, payment: Optional[Row] = None,
+                 actual_amount: Optional[float] = None) -> dict:
+    return {
+        'kind': kind,
+        'order_id': order_id,
+        'payment_id': payment.id if payment is not None else None,
+        'order_status': order.status.value if order is not None else None,
+        'expected_amount': order.total_price if order is not None else None,
+        'actual_amount': actual_amount if actual_amount is not None else (payment.amount if payment is not None else None),
+    }
+
+
+def _reconcile_chunk(run_id: int, source: str, chunk_size: int) -> None:
+    after = ReconciliationRepository.checkpoints(run_id)[source].last_order_id
+    up_to = ReconciliationRepository.chunk_bound(source, after, chunk_size)
+    yield_per = min(chunk_size, 1000)
+    orders = payments = 0
+    last_order_id = after
+    found = []
+    for order, matched in merge_join(ReconciliationRepository.stream_orders(source, after, up_to, yield_per),
+                                     ReconciliationRepository.stream_payments(source, after, up_to, yield_per)):
+        if order is not None:
+            orders += 1
+            last_order_id = order.id
+        payments += len(matched)
+        found.extend(find_discrepancies(order, matched))
+    ReconciliationRepository.record_chunk(run_id, source, up_to if up_to is not None else last_order_id,
+                                          orders, payments, found, completed=up_to is None)
+
+
+def reconcile_payments(chunk_size: int = 5000, run_id: Optional[int] = None,
+                       max_chunks: Optional[int] = None) -> ReconciliationReport:
+    # Walks orders and successful payments, live then archived, as two
+    # order-id-sorted streams in chunks of chunk_size orders. Each chunk is
+    # one short transaction that records its discrepancies and advances the
+    # checkpoint, so memory stays flat however large the tables are, and a run
+    # that stops (or hits max_chunks) resumes where it left off via run_id.
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    if run_id is None:
+        run_id = ReconciliationRepository.start_run(chunk_size).id
+    elif ReconciliationRepository.get_run(run_id) is None:
+        raise ValueError(f"Reconciliation run {run_id} not found")
+    started = time.perf_counter()
+    chunks = 0
+    for source in RECONCILIATION_SOURCES:
+        while ReconciliationRepository.checkpoints(run_id)[source].completed_at is None:
+            if max_chunks is not None and chunks >= max_chunks:
+                break
+            retry_on_lock(lambda: _reconcile_chunk(run_id, source, chunk_size))
+            chunks += 1
+
+    checkpoints = ReconciliationRepository.checkpoints(run_id).values()
+    completed = all(checkpoint.completed_at is not None for checkpoint in checkpoints)
+    if completed and ReconciliationRepository.get_run(run_id).finished_at is None:
+        ReconciliationRepository.finish_run(run_id)
+    return ReconciliationReport(
+        run_id=run_id,
+        orders_checked=sum(checkpoint.orders_checked for checkpoint in checkpoints),
+        payments_checked=sum(checkpoint.payments_checked for checkpoint in checkpoints),
+        discrepancies=sum(checkpoint.discrepancies for checkpoint in checkpoints),
+        chunks=chunks,
+        completed=completed,
+        elapsed_seconds=time.perf_counter() - started,
+    )
+
+
+def write_discrepancies_jsonl(run_id: int, output: TextIO) -> int:
+    written = 0
+    for row in ReconciliationRepository.stream_discrepancies(run_id):
+        output.write(json.dumps({
+            'run_id': row.run_id,
+            'source': row.source,
+            'kind': row.kind.value,
+            'order_id': row.order_id,
+            'payment_id': row.payment_id,
+            'order_status': row.order_status,
+            'expected_amount': row.expected_amount,
+            'actual_amount': row.actual_amount,
+        }) + "\n")
+        written += 1
+    return written
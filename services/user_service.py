@@ -1,13 +1,30 @@
 from typing import Optional
+from flask import current_app, has_app_context
 from pydantic import EmailStr, validate_email
+from config.sqlite import retry_on_lock
 from repositories.user_repo import UserRepository
-from schemas.user_schema import CreateUserSchema, UserResponseSchema, LoginUserSchema
-from passlib.hash import bcrypt
+from schemas.user_schema import CreateUserSchema, UserResponseSchema, LoginUserSchema, AccessTokenSchema
+from services.access_tokens import AccessTokenService, Principal
+from services.email_dispatcher import verification_email
+from services.login_throttle import LoginThrottle
+from services.password_hasher import PasswordHasher
 import re
 
 class UserService:
-    def __init__(self):
+    def __init__(self, password_hasher: Optional[PasswordHasher] = None,
+                 login_throttle: Optional[LoginThrottle] = None,
+                 access_tokens: Optional[AccessTokenService] = None):
         self.repo = UserRepository()
+        if access_tokens is None and has_app_context():
+            access_tokens = current_app.extensions.get('access_tokens')
+        self.access_tokens = access_tokens
+        if password_hasher is None and has_app_context():
+            password_hasher = current_app.extensions.get('password_hasher')
+        if login_throttle is None and has_app_context():
+            login_throttle = current_app.extensions.get('login_throttle')
+        self.login_throttle = login_throttle
+        # Outside an app (scripts, tests) hashing runs inline.
+        self.password_hasher = password_hasher or PasswordHasher(max_workers=0)
 
     @staticmethod
     def validate_password_strength(password: str) -> None:
@@ -37,17 +54,21 @@ class UserService:
             raise ValueError(f'User with email {user_data.email} already exists')
 
         self.validate_password_strength(user_data.password)
-        hashed_password = bcrypt.hash(user_data.password)
+        hashed_password = self.password_hasher.hash(user_data.password)
         verification_token = user_data.generate_token()
 
-        new_user = self.repo.create_user(
+        # The email check's read transaction is still open after the slow hash;
+        # if another writer committed meanwhile, SQLite refuses the upgrade, so
+        # the insert is retried from a fresh snapshot (the hash is not redone).
+        new_user = retry_on_lock(lambda: self.repo.create_user(
             first_name=user_data.first_name,
             last_name=user_data.last_name,
             email=user_data.email,
             role=user_data.role,
             password=hashed_password,
-            verification_code=verification_token
-        )
+            verification_code=verification_token,
+            outbox=[verification_email(user_data.email, user_data.first_name, verification_token)]
+        ))
         return UserResponseSchema.model_validate(new_user)
 
     def verify_user(self, token: str) -> bool:
@@ -59,20 +80,60 @@ class UserService:
         self.repo.save(user)
         return True
 
-    def login_user(self, login_data: LoginUserSchema) -> UserResponseSchema:
+    def login_user(self, login_data: LoginUserSchema, client_id: Optional[str] = None) -> UserResponseSchema:
+        return UserResponseSchema.model_validate(self._check_credentials(login_data, client_id))
+
+    def login(self, login_data: LoginUserSchema, client_id: Optional[str] = None) -> AccessTokenSchema:
+        # login_user plus a signed access token for subsequent requests.
+        if self.access_tokens is None:
+            raise RuntimeError('Access tokens are not configured')
+        user = self._check_credentials(login_data, client_id)
+        return AccessTokenSchema(
+            access_token=self.access_tokens.issue(user),
+            expires_in=self.access_tokens.ttl_seconds,
+            user=UserResponseSchema.model_validate(user)
+        )
+
+    def authenticate(self, token: str) -> Principal:
+        if self.access_tokens is None:
+            raise RuntimeError('Access tokens are not configured')
+        return self.access_tokens.authenticate(token)
+
+    def revoke_tokens(self, user_id: int) -> None:
+        if not self.repo.revoke_tokens(user_id):
+            raise ValueError(f'User with id {user_id} not found')
+        self._forget_principal(user_id)
+
+    def _forget_principal(self, user_id: int) -> None:
+        if self.access_tokens is not None:
+            self.access_tokens.invalidate(user_id)
+
+    def _check_credentials(self, login_data: LoginUserSchema, client_id: Optional[str]):
         try:
             validate_email(login_data.email)
         except Exception:
             raise ValueError(f'Invalid email address format: {login_data.email}')
+        if self.login_throttle is not None:
+            self.login_throttle.admit(login_data.email, client_id)
 
         user = self.repo.find_by_email(login_data.email)
         if not user:
             raise ValueError(f'User with email {login_data.email} not found')
-        if not bcrypt.verify(login_data.password, user.password):
+        matches, new_hash = self.password_hasher.verify(login_data.password, user.password)
+        if not matches:
             raise ValueError(f'Incorrect password')
+        if self.login_throttle is not None:
+            self.login_throttle.succeeded(login_data.email)
+        if new_hash:
+            # The stored hash predates the current cost factor.
+            user = retry_on_lock(lambda: self._store_password(user, new_hash))
         if not user.is_verified:
             raise ValueError(f'Email {login_data.email} has not been verified yet')  # FIXED: message was backwards
-        return UserResponseSchema.model_validate(user)
+        return user
+
+    def _store_password(self, user, hashed_password: str):
+        self.repo.set_password(user, hashed_password)
+        return self.repo.save(user)
 
     def get_user_by_id(self, user_id: int) -> Optional[UserResponseSchema]:
         user = self.repo.find_by_user_id(user_id)
@@ -91,13 +152,20 @@ class UserService:
         return UserResponseSchema.model_validate(user)
 
     def update_user(self, user_id: int, update_data: dict) -> UserResponseSchema:
+        if "password" in update_data:
+            if not isinstance(update_data["password"], str):
+                raise ValueError('Password required')
+            self.validate_password_strength(update_data["password"])
+            update_data = {**update_data, "password": self.password_hasher.hash(update_data["password"])}
         updated_user = self.repo.update_user(user_id, update_data)
         if not updated_user:
             raise ValueError(f'User with id {user_id} not found')
+        self._forget_principal(user_id)
         return UserResponseSchema.model_validate(updated_user)
 
     def delete_user(self, user_id: int) -> bool:
         result = self.repo.delete_user(user_id)
         if not result:
             raise ValueError(f'User with id {user_id} not found')
+        self._forget_principal(user_id)
         return result
\ No newline at end of file
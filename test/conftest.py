@@ -0,0 +1,50 @@
+import pytest
+from app import create_app
+from config.config import db
+from models.user import User, Role
+
+
+def _app_for(uri: str):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": uri, "TESTING": True})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def app():
+    yield from _app_for("sqlite://")
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    # A real database file, for tests where several threads or processes need
+    # their own connections instead of sharing the in-memory one.
+    yield from _app_for(f"sqlite:///{tmp_path / 'test.db'}")
+
+
+@pytest.fixture
+def make_user(request):
+    if "file_app" not in request.fixturenames:
+        request.getfixturevalue("app")
+    counter = iter(range(1, 1_000_000))
+
+    def _make_user(role: Role = Role.BUYER, **fields) -> User:
+        n = next(counter)
+        user = User(
+            first_name=fields.pop("first_name", "Test"),
+            last_name=fields.pop("last_name", "User"),
+            email=fields.pop("email", f"user{n}@example.com"),
+            password=fields.pop("password", "not-a-real-hash"),
+            role=role,
+            verification_code=fields.pop("verification_code", f"code-{n}"),
+            **fields
+        )
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    return _make_user
@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from config.config import db
+from models.artwork import ArtWork
+from models.order import Order, OrderStatus
+from models.payment import Payment, PaymentMethod, PaymentStatus
+from models.user import Role
+from repositories.order_repo import OrderRepository
+from schemas.admin_schema import OrderListingSchema, PaymentListingSchema, UserListingSchema
+from schemas.order_schema import OrderStatusSchema
+from schemas.user_schema import UserRole
+from services.admin_service import AdminService
+
+
+@pytest.fixture
+def seed_orders(make_user):
+    artist_id = make_user(Role.ARTIST).id
+
+    def _seed(count):
+        buyers = [make_user(Role.BUYER) for _ in range(count)]
+        artworks = [ArtWork(name=f"Piece {i}", description="d", image_url="u", price=10.0 + i,
+                            category="Painting", artist_id=artist_id) for i in range(count)]
+        db.session.add_all(artworks)
+        db.session.flush()
+        orders = [Order(buyer_id=buyer.id, artwork_id=artwork.id, total_price=artwork.price,
+                        status=OrderStatus.PAID if i % 2 else OrderStatus.PENDING)
+                  for i, (buyer, artwork) in enumerate(zip(buyers, artworks))]
+        db.session.add_all(orders)
+        db.session.flush()
+        db.session.add_all([Payment(order_id=order.id, amount=order.total_price, payment_method=PaymentMethod.CARD,
+                                    status=PaymentStatus.SUCCESS) for order in orders])
+        db.session.commit()
+
+    return _seed
+
+
+def count_selects(call):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    db.session.expunge_all()
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        result = call()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    return result, sum(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+
+
+@pytest.mark.parametrize("listing", ["list_users", "list_orders", "list_payments"])
+def test_query_count_per_page_is_constant(seed_orders, listing):
+    service = AdminService()
+    seed_orders(3)
+    small, small_queries = count_selects(lambda: getattr(service, listing)())
+    seed_orders(40)
+    big, big_queries = count_selects(lambda: getattr(service, listing)())
+    assert len(small.items) < len(big.items) <= 50
+    assert small_queries == big_queries <= 2
+
+
+def test_order_rows_carry_buyer_artwork_and_payments(seed_orders):
+    seed_orders(3)
+    page = AdminService().list_orders()
+    order = page.items[0]
+    assert order.buyer.email.endswith("@example.com")
+    assert order.artwork.name.startswith("Piece")
+    assert [payment.amount for payment in order.payments] == [order.total_price]
+
+
+def test_pages_walk_the_whole_table_without_repeats(seed_orders):
+    seed_orders(25)
+    service = AdminService()
+    seen, cursor = [], None
+    while True:
+        page = service.list_orders(OrderListingSchema(sort_by="total_price", descending=False, limit=10,
+                                                      cursor=cursor))
+        seen += [order.id for order in page.items]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 25
+
+
+def test_filters(seed_orders):
+    seed_orders(6)
+    service = AdminService()
+    paid = service.list_orders(OrderListingSchema(status=OrderStatusSchema.PAID))
+    assert len(paid.items) == 3 and {order.status for order in paid.items} == {OrderStatusSchema.PAID}
+    artists = service.list_users(UserListingSchema(role=UserRole.ARTIST))
+    assert [user.role for user in artists.items] == [UserRole.ARTIST]
+    payments = service.list_payments(PaymentListingSchema(order_id=paid.items[0].id))
+    assert [payment.order.id for payment in payments.items] == [paid.items[0].id]
+    assert payments.items[0].order.buyer.id == paid.items[0].buyer_id
+
+
+def test_unlisted_relationships_raise_instead_of_lazy_loading(seed_orders):
+    seed_orders(1)
+    orders, _ = OrderRepository.list_orders()
+    with pytest.raises(InvalidRequestError):
+        orders[0].buyer.carts
@@ -0,0 +1,132 @@
+import fakeredis
+import pytest
+from sqlalchemy import event
+from config.config import db
+from models.artwork import ArtWork
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from repositories.facet_repo import FacetRepository
+from repositories.cache import artwork_cache, InMemoryCacheBackend, RedisCacheBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request, clock):
+    if request.param == "memory":
+        return InMemoryCacheBackend(max_entries=2, ttl_seconds=60, clock=clock)
+    return RedisCacheBackend(fakeredis.FakeRedis(), max_entries=2, ttl_seconds=60, clock=clock)
+
+
+@pytest.fixture
+def artwork(make_user):
+    artist = make_user(Role.ARTIST)
+    artwork = ArtWork(name="Blue Sunset", description="d", image_url="u", price=150.0,
+                      category="Painting", artist_id=artist.id)
+    db.session.add(artwork)
+    db.session.commit()
+    return artwork.id
+
+
+@pytest.fixture
+def count_queries(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_backend_evicts_least_recently_used(backend, clock):
+    backend.set("1", {"id": 1})
+    clock.now += 1
+    backend.set("2", {"id": 2})
+    clock.now += 1
+    assert backend.get("1") == {"id": 1}
+    clock.now += 1
+    backend.set("3", {"id": 3})
+    assert backend.get("2") is None
+    assert backend.get("1") == {"id": 1}
+    assert backend.get("3") == {"id": 3}
+    assert backend.stats.evictions == 1
+
+
+def test_in_memory_backend_expires_entries(clock):
+    backend = InMemoryCacheBackend(ttl_seconds=60, clock=clock)
+    backend.set("1", {"id": 1})
+    clock.now += 59
+    assert backend.get("1") == {"id": 1}
+    clock.now += 2
+    assert backend.get("1") is None
+    assert backend.stats.as_dict() == {"hits": 1, "misses": 1, "evictions": 0, "invalidations": 0}
+
+
+def test_redis_backend_sets_ttl():
+    client = fakeredis.FakeRedis()
+    RedisCacheBackend(client, ttl_seconds=30).set("7", {"id": 7})
+    assert 0 < client.pttl("artwork:7") <= 30_000
+
+
+def test_find_by_artwork_id_reads_through(backend, artwork, count_queries):
+    artwork_cache.configure(backend)
+    db.session.expunge_all()
+    first = ArtworkRepository.find_by_artwork_id(artwork)
+    queries_after_miss = len(count_queries)
+    db.session.expunge_all()
+    second = ArtworkRepository.find_by_artwork_id(artwork)
+    assert len(count_queries) == queries_after_miss == 1
+    assert (second.id, second.name, second.price, second.created_at) == \
+        (first.id, first.name, first.price, first.created_at)
+    assert second in db.session
+    assert artwork_cache.stats.hits == 1
+    assert ArtworkRepository.find_by_artwork_id(artwork + 1) is None
+
+
+def test_cached_artwork_lazy_loads_relationships(backend, artwork):
+    artwork_cache.configure(backend)
+    ArtworkRepository.find_by_artwork_id(artwork)
+    db.session.expunge_all()
+    assert ArtworkRepository.find_by_artwork_id(artwork).artist.role == Role.ARTIST
+
+
+def test_update_and_delete_invalidate_entry(backend, artwork):
+    artwork_cache.configure(backend)
+    ArtworkRepository.find_by_artwork_id(artwork)
+    ArtworkRepository.update_artwork(artwork, {"price": 175.0})
+    db.session.expunge_all()
+    assert ArtworkRepository.find_by_artwork_id(artwork).price == 175.0
+    ArtworkRepository.delete_artwork(artwork)
+    db.session.expunge_all()
+    assert ArtworkRepository.find_by_artwork_id(artwork) is None
+    assert artwork_cache.stats.invalidations == 2
+
+
+def test_update_starts_from_the_database_not_a_stale_cache_hit(backend, artwork):
+    artwork_cache.configure(backend)
+    FacetRepository.rebuild()
+    db.session.expunge_all()
+    ArtworkRepository.find_by_artwork_id(artwork)
+    # Reserved without invalidating (as a caller does until it commits), so
+    # the cache still says the artwork is for sale.
+    ArtworkRepository.reserve_artworks([artwork])
+    db.session.commit()
+    db.session.expunge_all()
+    stale = ArtworkRepository.find_by_artwork_id(artwork)
+    assert stale.is_available
+    updated = ArtworkRepository.update_artwork(artwork, {"price": 20.0})
+    assert not updated.is_available
+    assert FacetRepository.rebuild() == {}
@@ -0,0 +1,76 @@
+import pytest
+from datetime import datetime, timedelta
+from config.config import db
+from models.artwork import ArtWork
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+
+
+@pytest.fixture
+def artist(make_user):
+    return make_user(Role.ARTIST)
+
+
+@pytest.fixture
+def catalog(artist):
+    start = datetime(2024, 1, 1)
+    artworks = []
+    for i in range(25):
+        artworks.append(ArtWork(
+            name=f"Piece {i}",
+            description="Test piece",
+            image_url=f"https://example.com/{i}.jpg",
+            price=float(100 + (i % 5) * 50),
+            category="Painting" if i % 2 == 0 else "Sculpture",
+            artist_id=artist.id,
+            is_available=i % 10 != 9,
+            created_at=start + timedelta(hours=i // 2),
+        ))
+    db.session.add_all(artworks)
+    db.session.commit()
+    return artworks
+
+
+def walk(**kwargs):
+    seen, cursor = [], None
+    while True:
+        page, cursor = ArtworkRepository.browse_available(cursor=cursor, **kwargs)
+        seen.extend(page)
+        if cursor is None:
+            return seen
+
+
+def test_browse_available_pages_cover_catalog_once(catalog):
+    seen = walk(limit=4)
+    expected = sorted((a for a in catalog if a.is_available), key=lambda a: (a.created_at, a.id), reverse=True)
+    assert [a.id for a in seen] == [a.id for a in expected]
+
+
+def test_browse_available_first_page_is_bounded(catalog):
+    page, cursor = ArtworkRepository.browse_available(limit=5)
+    assert len(page) == 5
+    assert cursor is not None
+
+
+@pytest.mark.parametrize("sort_by", ["price", "id", "created_at"])
+@pytest.mark.parametrize("descending", [True, False])
+def test_browse_available_sort_orders(catalog, sort_by, descending):
+    seen = walk(limit=3, sort_by=sort_by, descending=descending)
+    keys = [(getattr(a, sort_by), a.id) for a in seen]
+    assert keys == sorted(keys, reverse=descending)
+    assert len(seen) == len({a.id for a in seen}) == sum(a.is_available for a in catalog)
+
+
+def test_browse_available_filters(catalog, artist, make_user):
+    seen = walk(limit=2, category="Painting", min_price=150, max_price=200, artist_id=artist.id)
+    assert seen
+    assert all(a.category == "Painting" and 150 <= a.price <= 200 and a.is_available for a in seen)
+    assert walk(artist_id=make_user(Role.ARTIST).id) == []
+
+
+def test_browse_available_rejects_foreign_or_garbled_cursor(catalog):
+    _, cursor = ArtworkRepository.browse_available(limit=2, sort_by="price")
+    with pytest.raises(ValueError):
+        ArtworkRepository.browse_available(limit=2, sort_by="created_at", cursor=cursor)
+    with pytest.raises(ValueError):
+        ArtworkRepository.browse_available(limit=2, cursor="not-a-cursor")
@@ -0,0 +1,71 @@
+import pytest
+from config.config import db
+from models.artwork import ArtWork
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+
+
+@pytest.fixture
+def artist(make_user):
+    return make_user(Role.ARTIST)
+
+
+@pytest.fixture
+def gallery(artist):
+    artworks = {
+        "sunset": ArtWork(name="Blue Sunset", description="Warm evening light over a calm ocean",
+                          image_url="u", price=150.0, category="Painting", artist_id=artist.id),
+        "wave": ArtWork(name="Ocean Study", description="A crashing wave at sunset",
+                        image_url="u", price=90.0, category="Photography", artist_id=artist.id),
+        "bronze": ArtWork(name="Bronze Heron", description="Cast bronze bird on a plinth",
+                          image_url="u", price=900.0, category="Sculpture", artist_id=artist.id),
+        "sold": ArtWork(name="Sunset Over Lagos", description="Sold out sunset print",
+                        image_url="u", price=60.0, category="Print", artist_id=artist.id, is_available=False),
+    }
+    db.session.add_all(artworks.values())
+    db.session.commit()
+    return {key: artwork.id for key, artwork in artworks.items()}
+
+
+def test_search_ranks_name_matches_first_and_highlights(gallery):
+    results = ArtworkRepository.search("sunset")
+    assert [r.id for r in results] == [gallery["sunset"], gallery["wave"]]
+    assert results[0].highlighted_name == "Blue <mark>Sunset</mark>"
+    assert "<mark>sunset</mark>" in results[1].snippet
+    assert results[0].score >= results[1].score
+
+
+def test_highlights_escape_the_artists_text(artist):
+    db.session.add(ArtWork(name="<script>alert(1)</script> Sunset", description="Sunset & <b>\"dusk\"</b>",
+                           image_url="u", price=10.0, category="Painting", artist_id=artist.id))
+    db.session.commit()
+    result, = ArtworkRepository.search("sunset")
+    assert result.highlighted_name == "&lt;script&gt;alert(1)&lt;/script&gt; <mark>Sunset</mark>"
+    assert result.snippet == "<mark>Sunset</mark> &amp; &lt;b&gt;&quot;dusk&quot;&lt;/b&gt;"
+
+
+def test_search_matches_prefix_and_category(gallery):
+    assert [r.id for r in ArtworkRepository.search("bro")] == [gallery["bronze"]]
+    assert [r.id for r in ArtworkRepository.search("sculpture")] == [gallery["bronze"]]
+
+
+def test_search_applies_filters(gallery, artist):
+    assert [r.id for r in ArtworkRepository.search("sunset", {"max_price": 100})] == [gallery["wave"]]
+    assert [r.id for r in ArtworkRepository.search("sunset", {"category": "Painting"})] == [gallery["sunset"]]
+    assert [r.id for r in ArtworkRepository.search("sunset", {"is_available": False})] == [gallery["sold"]]
+    assert ArtworkRepository.search("sunset", {"artist_id": artist.id + 100}) == []
+    with pytest.raises(ValueError):
+        ArtworkRepository.search("sunset", {"colour": "blue"})
+
+
+def test_search_index_follows_updates_and_deletes(gallery):
+    ArtworkRepository.update_artwork(gallery["bronze"], {"name": "Copper Crane"})
+    assert ArtworkRepository.search("heron") == []
+    assert [r.id for r in ArtworkRepository.search("copper crane")] == [gallery["bronze"]]
+    ArtworkRepository.delete_artwork(gallery["bronze"])
+    assert ArtworkRepository.search("copper") == []
+
+
+@pytest.mark.parametrize("query", ["", "   ", "\"(*", "sunset\" OR name:*", "NEAR("])
+def test_search_never_exposes_fts_syntax(gallery, query):
+    ArtworkRepository.search(query)
@@ -0,0 +1,173 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from config.config import db
+from models.artwork import ArtWork
+from models.cart_item import CartItem
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from repositories.cart_repo import CartRepository
+from services.buyer_service import BuyerService
+
+
+@pytest.fixture
+def catalog(make_user):
+    buyer = make_user(Role.BUYER)
+    artist = make_user(Role.ARTIST)
+    artworks = [ArtWork(name=f"Piece {i}", description="d", image_url="u", price=10.0 * (i + 1),
+                        category="Painting", artist_id=artist.id) for i in range(3)]
+    db.session.add_all(artworks)
+    db.session.commit()
+    return buyer.id, [artwork.id for artwork in artworks]
+
+
+def lines(buyer_id):
+    cart = CartRepository.get_cart_by_buyer(buyer_id)
+    return {item.artwork_id: (item.quantity, item.subtotal) for item in cart.items}
+
+
+def test_add_to_cart_inserts_then_increments(catalog):
+    buyer_id, artwork_ids = catalog
+    CartRepository.add_to_cart(buyer_id, artwork_ids[0])
+    CartRepository.add_to_cart(buyer_id, artwork_ids[0], quantity=2)
+    assert lines(buyer_id) == {artwork_ids[0]: (3, 30.0)}
+
+
+def test_subtotal_uses_current_price(catalog):
+    buyer_id, artwork_ids = catalog
+    CartRepository.add_to_cart(buyer_id, artwork_ids[1])
+    db.session.get(ArtWork, artwork_ids[1]).price = 25.0
+    db.session.commit()
+    CartRepository.add_to_cart(buyer_id, artwork_ids[1])
+    assert lines(buyer_id) == {artwork_ids[1]: (2, 50.0)}
+
+
+def test_add_to_cart_issues_one_write_statement(catalog):
+    buyer_id, artwork_ids = catalog
+    CartRepository.add_to_cart(buyer_id, artwork_ids[0])
+    db.session.expunge_all()
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement.split()[0].upper())
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        CartRepository.add_to_cart(buyer_id, artwork_ids[0])
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    assert statements == ["BEGIN", "SELECT", "INSERT"]
+
+
+def test_add_many_to_cart_merges_duplicates(catalog):
+    buyer_id, artwork_ids = catalog
+    CartRepository.add_to_cart(buyer_id, artwork_ids[0])
+    CartRepository.add_many_to_cart(buyer_id, [(artwork_ids[0], 1), (artwork_ids[2], 2), (artwork_ids[0], 1)])
+    assert lines(buyer_id) == {artwork_ids[0]: (3, 30.0), artwork_ids[2]: (2, 60.0)}
+
+
+def test_add_many_to_cart_is_all_or_nothing(catalog):
+    buyer_id, artwork_ids = catalog
+    with pytest.raises(ValueError, match="Artwork not found: 999"):
+        CartRepository.add_many_to_cart(buyer_id, [(artwork_ids[0], 1), (999, 1)])
+    assert db.session.query(CartItem).count() == 0
+
+
+def test_rejects_non_positive_quantity(catalog):
+    buyer_id, artwork_ids = catalog
+    with pytest.raises(ValueError):
+        CartRepository.add_to_cart(buyer_id, artwork_ids[0], quantity=0)
+
+
+def test_one_line_per_artwork_is_enforced(catalog):
+    buyer_id, artwork_ids = catalog
+    cart = CartRepository.add_to_cart(buyer_id, artwork_ids[0])
+    db.session.add(CartItem(cart_id=cart.cart_id, artwork_id=artwork_ids[0], quantity=1, subtotal=10.0))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def count_selects(call):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    db.session.expunge_all()
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        result = call()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    return result, sum(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+
+
+def test_cart_view_totals_come_from_sql(catalog):
+    buyer_id, artwork_ids = catalog
+    CartRepository.add_many_to_cart(buyer_id, [(artwork_ids[0], 2), (artwork_ids[2], 1)])
+    view = BuyerService(buyer_id).get_cart_view()
+    assert view.item_count == 3
+    assert view.total == pytest.approx(50.0)
+    assert {item.artwork.name for item in view.items} == {"Piece 0", "Piece 2"}
+    assert view.id == CartRepository.get_cart_by_buyer(buyer_id).cart_id
+
+
+def test_cart_view_is_none_without_a_cart(catalog):
+    buyer_id, _ = catalog
+    assert BuyerService(buyer_id).get_cart_view() is None
+
+
+def test_cart_view_query_count_is_constant(catalog, make_user):
+    buyer_id, artwork_ids = catalog
+    artist_id = db.session.get(ArtWork, artwork_ids[0]).artist_id
+    more = [ArtWork(name=f"Extra {i}", description="d", image_url="u", price=5.0, category="Print",
+                    artist_id=artist_id) for i in range(20)]
+    db.session.add_all(more)
+    db.session.commit()
+    big_buyer = make_user(Role.BUYER).id
+    CartRepository.add_to_cart(buyer_id, artwork_ids[0])
+    CartRepository.add_many_to_cart(big_buyer, [(artwork.id, 1) for artwork in more])
+
+    small, small_queries = count_selects(lambda: BuyerService(buyer_id).get_cart_view())
+    big, big_queries = count_selects(lambda: BuyerService(big_buyer).get_cart_view())
+    assert len(small.items) == 1 and len(big.items) == 20
+    assert small_queries == big_queries == 2
+
+
+def test_price_change_reprices_every_cart(catalog, make_user):
+    buyer_id, artwork_ids = catalog
+    other_buyer = make_user(Role.BUYER).id
+    CartRepository.add_to_cart(buyer_id, artwork_ids[0], quantity=2)
+    CartRepository.add_many_to_cart(other_buyer, [(artwork_ids[0], 1), (artwork_ids[1], 1)])
+
+    ArtworkRepository.update_artwork(artwork_ids[0], {"price": 12.5})
+    assert lines(buyer_id) == {artwork_ids[0]: (2, 25.0)}
+    assert lines(other_buyer) == {artwork_ids[0]: (1, 12.5), artwork_ids[1]: (1, 20.0)}
+
+
+def test_unavailable_artwork_is_flagged_and_left_out_of_totals(catalog):
+    buyer_id, artwork_ids = catalog
+    CartRepository.add_many_to_cart(buyer_id, [(artwork_ids[0], 1), (artwork_ids[1], 1)])
+    ArtworkRepository.update_artwork(artwork_ids[1], {"is_available": False})
+    view = BuyerService(buyer_id).get_cart_view()
+    assert {item.artwork_id: item.is_available for item in view.items} == {artwork_ids[0]: True, artwork_ids[1]: False}
+    assert (view.item_count, view.total) == (1, 10.0)
+
+    ArtworkRepository.update_artwork(artwork_ids[1], {"is_available": True})
+    assert BuyerService(buyer_id).get_cart_view().total == 30.0
+
+
+def test_reprice_only_runs_when_price_or_availability_change(catalog):
+    buyer_id, artwork_ids = catalog
+    CartRepository.add_to_cart(buyer_id, artwork_ids[0])
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        ArtworkRepository.update_artwork(artwork_ids[0], {"name": "Renamed"})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    assert not any("cart_items" in statement for statement in statements)
+
+
+def test_failed_update_leaves_cart_lines_alone(catalog):
+    buyer_id, artwork_ids = catalog
+    CartRepository.add_to_cart(buyer_id, artwork_ids[0])
+    with pytest.raises(ValueError):
+        ArtworkRepository.update_artwork(artwork_ids[0], {"price": 99.0, "category": None})
+    assert lines(buyer_id) == {artwork_ids[0]: (1, 10.0)}
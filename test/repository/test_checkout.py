@@ -0,0 +1,89 @@
+import fakeredis
+import pytest
+from unittest.mock import patch
+from sqlalchemy import event
+from config.config import db
+from models.artwork import ArtWork
+from models.cart_item import CartItem
+from models.order import Order
+from models.user import Role
+from repositories.cart_repo import CartRepository
+from repositories.redis_cart_repo import RedisCartRepository
+from schemas.order_schema import OrderResponseSchema, OrderStatusSchema
+from services.buyer_service import BuyerService
+
+
+@pytest.fixture
+def catalog(make_user):
+    buyer = make_user(Role.BUYER)
+    artist = make_user(Role.ARTIST)
+    artworks = [ArtWork(name=f"Piece {i}", description="d", image_url="u", price=10.0 * (i + 1),
+                        category="Painting", artist_id=artist.id) for i in range(20)]
+    db.session.add_all(artworks)
+    db.session.commit()
+    return buyer.id, [artwork.id for artwork in artworks]
+
+
+def test_checkout_turns_the_cart_into_orders(catalog):
+    buyer_id, artwork_ids = catalog
+    CartRepository.add_many_to_cart(buyer_id, [(artwork_id, 2) for artwork_id in artwork_ids])
+
+    commits = []
+    listener = lambda conn: commits.append(conn)
+    event.listen(db.engine, "commit", listener)
+    try:
+        orders = BuyerService(buyer_id).checkout()
+    finally:
+        event.remove(db.engine, "commit", listener)
+
+    assert len(orders) == 20 and all(isinstance(order, OrderResponseSchema) for order in orders)
+    assert [order.artwork_id for order in orders] == artwork_ids
+    assert orders[3].total_price == 80.0 and orders[3].quantity == 2
+    assert {order.status for order in orders} == {OrderStatusSchema.PENDING}
+    assert len(commits) == 1
+    assert db.session.query(CartItem).count() == 0
+    assert db.session.query(Order).filter_by(buyer_id=buyer_id).count() == 20
+
+
+def test_unavailable_artwork_aborts_the_whole_checkout(catalog):
+    buyer_id, artwork_ids = catalog
+    CartRepository.add_many_to_cart(buyer_id, [(artwork_ids[0], 1), (artwork_ids[1], 1)])
+    db.session.get(ArtWork, artwork_ids[1]).is_available = False
+    db.session.commit()
+
+    with pytest.raises(ValueError, match=f"no longer available: {artwork_ids[1]}"):
+        BuyerService(buyer_id).checkout()
+    assert db.session.query(Order).count() == 0
+    assert db.session.query(CartItem).count() == 2
+
+
+def test_stale_price_aborts_checkout(catalog):
+    buyer_id, artwork_ids = catalog
+    CartRepository.add_to_cart(buyer_id, artwork_ids[0])
+    db.session.query(CartItem).update({"subtotal": 1.0})
+    db.session.commit()
+    with pytest.raises(ValueError, match="Prices changed"):
+        BuyerService(buyer_id).checkout()
+    assert db.session.query(Order).count() == 0
+
+
+def test_empty_cart_cannot_be_checked_out(catalog):
+    buyer_id, _ = catalog
+    with pytest.raises(ValueError, match="Cart is empty"):
+        BuyerService(buyer_id).checkout()
+    CartRepository.get_cart_or_create_cart(buyer_id)
+    with pytest.raises(ValueError, match="Cart is empty"):
+        BuyerService(buyer_id).checkout()
+
+
+def test_checkout_flushes_and_evicts_redis_carts(catalog):
+    buyer_id, artwork_ids = catalog
+    repo = RedisCartRepository(fakeredis.FakeRedis())
+    repo.add_many_to_cart(buyer_id, [(artwork_ids[0], 1), (artwork_ids[1], 3)])
+    with patch("services.buyer_service.current_cart_repository", return_value=repo):
+        orders = BuyerService(buyer_id).checkout()
+    assert [(order.artwork_id, order.quantity) for order in orders] == [(artwork_ids[0], 1), (artwork_ids[1], 3)]
+    assert repo.pending() == 0
+    repo.add_to_cart(buyer_id, artwork_ids[2])
+    repo.flush()
+    assert [(item.artwork_id, item.quantity) for item in db.session.query(CartItem)] == [(artwork_ids[2], 1)]
@@ -0,0 +1,157 @@
+import asyncio
+import socket
+import time
+from datetime import datetime, timedelta
+import pytest
+from aiosmtpd.controller import Controller
+from config.config import db
+from models.email_outbox import EmailOutbox, OutboxStatus
+from models.user import User
+from repositories.email_outbox_repo import EmailOutboxRepository, EmailOutcome
+from schemas.user_schema import CreateUserSchema
+from services.email_dispatcher import EmailDispatcher, SmtpConnectionPool
+from services.password_hasher import PasswordHasher
+from services.user_service import UserService
+
+
+class RecordingHandler:
+    # Accepts everything except recipients listed in `replies`, which get that
+    # reply (e.g. "451 ..." or "550 ...") at RCPT TO.
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+        self.replies = {}
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        reply = self.replies.get(address)
+        if reply:
+            return reply
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.append((envelope.rcpt_tos[0], envelope.content.decode()))
+        return "250 Message accepted"
+
+
+@pytest.fixture
+def smtp_server():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    handler.port = port
+    yield handler
+    controller.stop()
+
+
+def dispatcher_for(app, server, connections=2, **options):
+    options.setdefault('base_delay', 0.0)
+    pool = SmtpConnectionPool("127.0.0.1", server.port, size=connections, timeout=5)
+    return EmailDispatcher(app, pool, sender="no-reply@example.com", **options)
+
+
+def enqueue(count, recipient="buyer{n}@example.com"):
+    emails = [EmailOutboxRepository.enqueue("verification", recipient.format(n=n), f"Subject {n}", "Hello")
+              for n in range(count)]
+    db.session.commit()
+    return [email.id for email in emails]
+
+
+def statuses(ids):
+    db.session.rollback()
+    return [db.session.get(EmailOutbox, email_id).status for email_id in ids]
+
+
+def test_registration_queues_its_verification_email_in_the_same_transaction(app):
+    registration = CreateUserSchema(first_name="John", last_name="Smith", email="john@example.com",
+                                    password="Password1!", confirm_password="Password1!")
+    UserService(PasswordHasher(rounds=4, max_workers=0)).register(registration)
+    user = db.session.query(User).filter_by(email="john@example.com").one()
+    email = db.session.query(EmailOutbox).one()
+    assert (email.kind, email.recipient, email.status) == ("verification", "john@example.com", OutboxStatus.PENDING)
+    assert user.verification_code in email.body
+
+    with pytest.raises(ValueError):
+        UserService(PasswordHasher(rounds=4, max_workers=0)).register(registration)
+    assert db.session.query(EmailOutbox).count() == 1
+
+
+def test_batches_are_sent_over_pooled_connections(file_app, smtp_server):
+    ids = enqueue(12)
+    dispatcher = dispatcher_for(file_app, smtp_server, connections=3, batch_size=5)
+    assert asyncio.run(dispatcher.drain()) == 12
+    assert statuses(ids) == [OutboxStatus.SENT] * 12
+    assert sorted(to for to, _ in smtp_server.messages) == sorted(f"buyer{n}@example.com" for n in range(12))
+    # Three batches, but never more than one session per pooled connection.
+    assert len(smtp_server.sessions) <= 3 and dispatcher.pool.connections_opened <= 3
+    stats = dispatcher.stats()
+    assert (stats['batches'], stats['sent'], stats['queue_pending'], stats['dead_letters']) == (3, 12, 0, 0)
+    dispatcher.stop()
+
+
+def test_transient_replies_retry_and_permanent_ones_dead_letter(file_app, smtp_server):
+    smtp_server.replies = {"busy@example.com": "451 Try again later",
+                           "gone@example.com": "550 No such mailbox"}
+    busy, gone, ok = enqueue(1, "busy@example.com") + enqueue(1, "gone@example.com") + enqueue(1, "ok@example.com")
+    dispatcher = dispatcher_for(file_app, smtp_server, max_attempts=3)
+    asyncio.run(dispatcher.drain())
+    assert statuses([busy, gone, ok]) == [OutboxStatus.DEAD, OutboxStatus.DEAD, OutboxStatus.SENT]
+    assert db.session.get(EmailOutbox, busy).attempts == 3
+    assert db.session.get(EmailOutbox, gone).attempts == 1
+    assert "550" in db.session.get(EmailOutbox, gone).last_error
+    assert dispatcher.stats()['retried'] == 2
+
+    smtp_server.replies = {}
+    assert EmailOutboxRepository.requeue_dead([busy]) == 1
+    asyncio.run(dispatcher.drain())
+    assert statuses([busy, gone]) == [OutboxStatus.SENT, OutboxStatus.DEAD]
+    dispatcher.stop()
+
+
+def test_unreachable_server_backs_off(file_app):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    ids = enqueue(3)
+    pool = SmtpConnectionPool("127.0.0.1", port, size=1, timeout=1)
+    dispatcher = EmailDispatcher(file_app, pool, sender="no-reply@example.com", base_delay=60.0)
+    assert asyncio.run(dispatcher.drain()) == 3
+    assert statuses(ids) == [OutboxStatus.PENDING] * 3
+    email = db.session.get(EmailOutbox, ids[0])
+    assert email.attempts == 1 and email.next_attempt_at > datetime.utcnow() - timedelta(seconds=1)
+    assert EmailOutboxRepository.claim_due(batch_size=5, lease_seconds=60,
+                                           now=datetime.utcnow() - timedelta(seconds=1)) == []
+    dispatcher.stop()
+
+
+def test_stale_claims_are_not_settled(app):
+    ids = enqueue(1)
+    first, = EmailOutboxRepository.claim_due(batch_size=1, lease_seconds=0)
+    second, = EmailOutboxRepository.claim_due(batch_size=1, lease_seconds=60,
+                                              now=datetime.utcnow() + timedelta(seconds=1))
+    assert EmailOutboxRepository.settle([EmailOutcome(first.id, first.attempts, OutboxStatus.SENT)]) == 0
+    assert EmailOutboxRepository.settle([EmailOutcome(second.id, second.attempts, OutboxStatus.SENT)]) == 1
+    assert statuses(ids) == [OutboxStatus.SENT]
+
+
+def test_background_dispatcher_sends_every_email_once(file_app, smtp_server):
+    ids = enqueue(200)
+    dispatcher = dispatcher_for(file_app, smtp_server, connections=4, batch_size=50, interval_seconds=0.01)
+    started = time.perf_counter()
+    dispatcher.start()
+    deadline = time.monotonic() + 20
+    while dispatcher.stats()['queue_pending'] and time.monotonic() < deadline:
+        time.sleep(0.02)
+    elapsed = time.perf_counter() - started
+    dispatcher.stop()
+
+    assert statuses(ids) == [OutboxStatus.SENT] * 200
+    assert len(smtp_server.messages) == 200
+    stats = dispatcher.stats()
+    print(f"sent {stats['sent']} emails at {stats['sent'] / elapsed:,.0f}/sec "
+          f"over {stats['connections_opened']} connections")
+    assert stats['lost_claims'] == 0 and stats['connections_opened'] <= 4
@@ -0,0 +1,114 @@
+import io
+import threading
+import pytest
+from sqlalchemy import event
+from config.config import db
+from models.artwork import ArtWork
+from models.artwork_facet import ArtworkFacet
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from repositories.facet_repo import FacetRepository
+from services.artist_service import ArtworkService
+from services.buyer_service import BuyerService
+
+
+@pytest.fixture
+def artist(make_user):
+    return make_user(Role.ARTIST)
+
+
+def create(artist, category="Painting", price=150.0, is_available=True):
+    return ArtworkRepository.create_artwork(name="Piece", description="d", image_url="u", price=price,
+                                            category=category, artist_id=artist.id, is_available=is_available)
+
+
+def test_create_update_delete_maintain_counts(artist):
+    first = create(artist, "Painting", 150.0)
+    second = create(artist, "Painting", 80.0)
+    create(artist, "Sculpture", 7000.0, is_available=False)
+    assert FacetRepository.get_facets() == {
+        "category": {"Painting": 2},
+        "price_band": {"100-500": 1, "0-100": 1},
+    }
+
+    ArtworkRepository.update_artwork(first.id, {"price": 600.0, "category": "Print"})
+    ArtworkRepository.update_artwork(second.id, {"is_available": False})
+    assert FacetRepository.get_facets() == {"category": {"Print": 1}, "price_band": {"500-1000": 1}}
+
+    ArtworkRepository.delete_artwork(first.id)
+    assert FacetRepository.get_facets() == {"category": {}, "price_band": {}}
+    assert FacetRepository.rebuild() == {}
+
+
+def test_concurrent_updates_of_one_artwork_each_apply_once(file_app, artist):
+    artwork_id = create(artist, "Painting", 150.0).id
+    categories = ["Print", "Sculpture", "Photography", "Drawing"]
+    barrier = threading.Barrier(len(categories))
+    errors = []
+
+    def update(category):
+        with file_app.app_context():
+            try:
+                # Each caller has already read the artwork when they all race.
+                db.session.get(ArtWork, artwork_id)
+                barrier.wait()
+                ArtworkRepository.update_artwork(artwork_id, {"category": category, "price": 600.0})
+            except Exception as e:
+                errors.append(repr(e))
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=update, args=(category,)) for category in categories]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db.session.commit()
+    assert errors == []
+    assert sum(FacetRepository.get_facets()["category"].values()) == 1
+    assert FacetRepository.rebuild() == {}
+
+
+def test_bulk_import_maintains_counts(artist):
+    stream = io.StringIO("name,description,price,image_url,category\n"
+                         + "".join(f"Piece {i},d,{50 + i * 100},u,Drawing\n" for i in range(6)))
+    ArtworkService(artist.id).bulk_import(stream, chunk_size=4)
+    assert FacetRepository.get_facets()["category"] == {"Drawing": 6}
+    assert FacetRepository.rebuild() == {}
+
+
+def test_failed_update_leaves_counts_alone(artist):
+    artwork = create(artist, "Painting", 150.0)
+    with pytest.raises(ValueError):
+        ArtworkRepository.update_artwork(artwork.id, {"category": None})
+    assert FacetRepository.get_facets()["category"] == {"Painting": 1}
+
+
+def test_rebuild_repairs_and_reports_drift(artist):
+    create(artist, "Painting", 150.0)
+    db.session.query(ArtworkFacet).filter_by(facet="category", value="Painting").update({"count": 5})
+    db.session.add(ArtworkFacet(facet="category", value="Ghost", count=2))
+    db.session.commit()
+    assert FacetRepository.rebuild() == {("category", "Painting"): (5, 1), ("category", "Ghost"): (2, 0)}
+    assert FacetRepository.get_facets()["category"] == {"Painting": 1}
+
+
+def test_get_facets_reads_only_the_facet_table(artist):
+    for price in (10, 200, 700, 2000, 9000):
+        create(artist, "Painting", price)
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", listener)
+    facets = BuyerService(user_id=1).get_facets()
+    event.remove(db.engine, "before_cursor_execute", listener)
+    assert len(statements) == 1 and "artworks " not in statements[0]
+    assert [band.value for band in facets.price_bands] == ["0-100", "100-500", "500-1000", "1000-5000", "5000+"]
+    assert facets.categories[0].count == 5
+
+
+def test_rebuild_command(app, artist):
+    create(artist)
+    result = app.test_cli_runner().invoke(args=["artworks", "rebuild-facets"])
+    assert result.exit_code == 0
+    assert "0 drifted" in result.output
@@ -0,0 +1,157 @@
+import threading
+from datetime import datetime, timedelta
+import pytest
+from config.config import db
+from models.idempotency_key import IdempotencyKey
+from models.order import Order, OrderStatus
+from models.payment import Payment
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from repositories.cart_repo import CartRepository
+from repositories.idempotency_repo import IdempotencyRepository
+from repositories.order_repo import OrderRepository
+from schemas.payment_schema import CreatePaymentSchema, PaymentMethodSchema, PaymentStatusSchema
+from services.buyer_service import BuyerService
+from services.idempotency import run_idempotent, request_fingerprint
+
+WORKERS = 8
+
+
+@pytest.fixture
+def shop(make_user):
+    artist = make_user(Role.ARTIST)
+    buyer = make_user(Role.BUYER)
+    artworks = [ArtworkRepository.create_artwork(name=f"Piece {n}", description="d", image_url="u", price=50.0,
+                                                 category="Painting", artist_id=artist.id).id for n in range(3)]
+    return {'buyer_id': buyer.id, 'artworks': artworks}
+
+
+def payment_for(order_id):
+    return CreatePaymentSchema(order_id=order_id, amount=50.0, payment_method=PaymentMethodSchema.CARD)
+
+
+def test_repeated_place_order_returns_the_first_order(shop):
+    service = BuyerService(shop['buyer_id'])
+    first = service.place_order(shop['artworks'][0], 1, idempotency_key="order-1")
+    again = service.place_order(shop['artworks'][0], 1, idempotency_key="order-1")
+    assert again.id == first.id
+    assert db.session.query(Order).count() == 1
+    with pytest.raises(ValueError, match="different request"):
+        service.place_order(shop['artworks'][1], 1, idempotency_key="order-1")
+
+
+def test_repeated_checkout_replays_the_stored_response(shop):
+    CartRepository.add_many_to_cart(shop['buyer_id'], [(shop['artworks'][0], 1), (shop['artworks'][1], 1)])
+    service = BuyerService(shop['buyer_id'])
+    first = service.checkout(idempotency_key="checkout-1")
+    assert service.checkout(idempotency_key="checkout-1") == first
+    assert db.session.query(Order).count() == 2
+    with pytest.raises(ValueError, match="Cart is empty"):
+        service.checkout(idempotency_key="checkout-2")
+
+
+def test_repeated_payment_is_created_once(shop):
+    service = BuyerService(shop['buyer_id'])
+    order = service.place_order(shop['artworks'][0], 1)
+    first = service.create_payment(payment_for(order.id), idempotency_key="pay-1")
+    assert service.create_payment(payment_for(order.id), idempotency_key="pay-1") == first
+    assert db.session.query(Payment).count() == 1
+    assert service.create_payment(payment_for(order.id)).id != first.id
+
+
+def test_failed_request_releases_its_key(shop, make_user):
+    other_buyer = BuyerService(make_user(Role.BUYER).id)
+    order = BuyerService(shop['buyer_id']).place_order(shop['artworks'][0], 1)
+    with pytest.raises(ValueError, match="Order not found"):
+        other_buyer.create_payment(payment_for(order.id), idempotency_key="pay-1")
+    assert db.session.query(IdempotencyKey).count() == 0
+
+
+def test_payment_amount_must_match_the_order_total(shop):
+    service = BuyerService(shop['buyer_id'])
+    order = service.place_order(shop['artworks'][0], 1)
+    short = CreatePaymentSchema(order_id=order.id, amount=0.01, payment_method=PaymentMethodSchema.CARD)
+    with pytest.raises(ValueError, match="does not match the order total"):
+        service.create_payment(short, idempotency_key="pay-1")
+    assert db.session.query(Payment).count() == 0
+
+
+def test_only_pending_orders_take_payments_and_they_start_pending(shop):
+    service = BuyerService(shop['buyer_id'])
+    order = service.place_order(shop['artworks'][0], 1)
+    posted = CreatePaymentSchema.model_validate({'order_id': order.id, 'amount': 50.0, 'payment_method': "CARD",
+                                                 'payment_status': "SUCCESS"})
+    payment = service.create_payment(posted)
+    assert payment.status == PaymentStatusSchema.PENDING
+    OrderRepository.update_order(order.id, {"status": OrderStatus.CANCELED})
+    with pytest.raises(ValueError, match="not awaiting payment"):
+        service.create_payment(payment_for(order.id))
+    assert db.session.query(Payment).count() == 1
+
+
+def test_keys_expire_and_are_purged(shop):
+    calls = []
+
+    def run(key):
+        return run_idempotent("test", key, {}, lambda: calls.append(1) or len(calls),
+                              serialize=lambda result: result, replay=lambda response: response, ttl_seconds=60)
+
+    assert run("k") == 1 and run("k") == 1
+    db.session.query(IdempotencyKey).update({IdempotencyKey.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+    assert run("k") == 2
+    run("other")
+    assert IdempotencyRepository.purge_expired(datetime.utcnow() + timedelta(minutes=2), batch_size=1) == 2
+    assert db.session.query(IdempotencyKey).count() == 0
+
+
+def test_unfinished_key_reports_in_progress(shop):
+    IdempotencyRepository.claim("test", "k", request_fingerprint({}), 60)
+    db.session.commit()
+    with pytest.raises(RuntimeError, match="still in progress"):
+        run_idempotent("test", "k", {}, lambda: 1, serialize=lambda r: r, replay=lambda r: r)
+
+
+def test_failure_after_the_work_leaves_neither_key_nor_work(shop):
+    service = BuyerService(shop['buyer_id'])
+
+    def fail(order):
+        raise RuntimeError("crashed before the response was stored")
+
+    with pytest.raises(RuntimeError, match="crashed"):
+        run_idempotent("test", "k", {}, lambda: service.place_order(shop['artworks'][0], 1),
+                       serialize=fail, replay=lambda r: r)
+    assert db.session.query(IdempotencyKey).count() == 0
+    assert db.session.query(Order).count() == 0
+    assert run_idempotent("test", "k", {}, lambda: service.place_order(shop['artworks'][0], 1).id,
+                          serialize=lambda r: r, replay=lambda r: r) == \
+        db.session.query(Order).one().id
+
+
+def test_racing_requests_with_one_key_create_one_row(file_app, shop):
+    order_id = BuyerService(shop['buyer_id']).place_order(shop['artworks'][0], 1).id
+    db.session.commit()
+    barrier = threading.Barrier(WORKERS)
+    outcomes = []
+
+    def pay():
+        with file_app.app_context():
+            barrier.wait()
+            try:
+                payment = BuyerService(shop['buyer_id']).create_payment(payment_for(order_id), idempotency_key="race")
+                outcomes.append(payment.id)
+            except Exception as e:
+                outcomes.append(repr(e))
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=pay) for _ in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db.session.expire_all()
+    payment_ids = [payment.id for payment in db.session.query(Payment).all()]
+    assert len(payment_ids) == 1
+    assert outcomes == payment_ids * WORKERS
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+import pytest
+from config.config import db
+from models.archive import OrderArchive, PaymentArchive
+from models.order import Order, OrderStatus
+from models.payment import Payment, PaymentMethod
+from models.user import Role
+from repositories.archive_repo import ArchiveRepository
+from repositories.artwork_repo import ArtworkRepository
+from repositories.order_repo import OrderRepository
+from repositories.payment_repo import PaymentRepository
+from repositories.rollup_repo import RollupRepository
+from services.order_archiver import archive_closed_orders
+
+NOW = datetime(2026, 10, 1)
+
+
+@pytest.fixture
+def history(make_user):
+    buyer = make_user(Role.BUYER)
+    artist = make_user(Role.ARTIST)
+    artwork = ArtworkRepository.create_artwork(name="Piece", description="d", image_url="u", price=10.0,
+                                               category="Painting", artist_id=artist.id)
+
+    def order(status, closed_days_ago=None):
+        closed_at = NOW - timedelta(days=closed_days_ago) if closed_days_ago is not None else None
+        row = Order(buyer_id=buyer.id, artwork_id=artwork.id, total_price=10.0, status=status,
+                    created_at=NOW - timedelta(days=400), closed_at=closed_at)
+        db.session.add(row)
+        db.session.flush()
+        db.session.add(Payment(order_id=row.id, amount=10.0, payment_method=PaymentMethod.CARD))
+        db.session.commit()
+        return row.id
+
+    return {'buyer_id': buyer.id, 'artwork': artwork, 'order': order}
+
+
+def test_closing_an_order_stamps_closed_at(history):
+    first = history['order'](OrderStatus.PENDING)
+    second = history['order'](OrderStatus.PENDING)
+    assert OrderRepository.update_order(first, {"status": OrderStatus.CANCELED}).closed_at is not None
+    OrderRepository.bulk_transition(OrderStatus.PAID, [second])
+    assert OrderRepository.get_orders_by_id(second).closed_at is None
+    created = OrderRepository.create_order(history['buyer_id'], history['artwork'].id, 1, 10.0,
+                                           OrderStatus.COMPLETED)
+    assert created.closed_at is not None
+
+
+def test_archives_only_orders_closed_before_the_cutoff(history):
+    old = [history['order'](OrderStatus.COMPLETED, 200), history['order'](OrderStatus.CANCELED, 100)]
+    recent = history['order'](OrderStatus.COMPLETED, 10)
+    live = history['order'](OrderStatus.SHIPPED)
+
+    report = archive_closed_orders(90, clock=lambda: NOW)
+    assert (report.orders, report.payments, report.batches) == (2, 2, 1)
+    assert sorted(db.session.scalars(db.select(Order.id))) == [recent, live]
+    assert sorted(db.session.scalars(db.select(OrderArchive.id))) == old
+    assert db.session.query(Payment).count() == 2
+    assert sorted(db.session.scalars(db.select(PaymentArchive.order_id))) == old
+
+
+def test_archives_in_bounded_batches(history):
+    for _ in range(5):
+        history['order'](OrderStatus.COMPLETED, 365)
+    assert ArchiveRepository.archive_batch(NOW, batch_size=2) == (2, 2)
+    report = archive_closed_orders(0, batch_size=2, max_batches=1, clock=lambda: NOW)
+    assert (report.orders, report.batches) == (2, 1)
+    report = archive_closed_orders(0, batch_size=2, clock=lambda: NOW)
+    assert (report.orders, report.batches) == (1, 1)
+    assert db.session.query(Order).count() == 0
+    assert archive_closed_orders(0, clock=lambda: NOW).orders == 0
+
+
+def test_archived_ids_are_never_handed_out_again(history):
+    archived = history['order'](OrderStatus.COMPLETED, 365)
+    archived_payment = PaymentRepository.get_payment_by_order(archived)[0].id
+    archive_closed_orders(90, clock=lambda: NOW)
+
+    created = history['order'](OrderStatus.COMPLETED, 365)
+    assert created > archived
+    assert PaymentRepository.get_payment_by_order(created)[0].id > archived_payment
+    assert sorted(o.id for o in OrderRepository.get_orders_by_buyer_id(history['buyer_id'],
+                                                                        include_archived=True)) == [archived, created]
+    assert archive_closed_orders(90, clock=lambda: NOW).orders == 1
+
+
+def test_reads_reach_archived_history_only_when_asked(history):
+    archived = history['order'](OrderStatus.COMPLETED, 365)
+    live = history['order'](OrderStatus.PENDING)
+    payment_id = PaymentRepository.get_payment_by_order(archived)[0].id
+    archive_closed_orders(90, clock=lambda: NOW)
+
+    assert OrderRepository.get_orders_by_id(archived) is None
+    assert OrderRepository.get_orders_by_id(archived, include_archived=True).status == OrderStatus.COMPLETED
+    assert [o.id for o in OrderRepository.get_orders_by_buyer_id(history['buyer_id'])] == [live]
+    assert sorted(o.id for o in OrderRepository.get_orders_by_buyer_id(history['buyer_id'],
+                                                                        include_archived=True)) == [archived, live]
+    assert len(OrderRepository.get_orders_by_artwork_id(history['artwork'].id, include_archived=True)) == 2
+    assert len(OrderRepository.get_order_by_order_status(OrderStatus.COMPLETED, include_archived=True)) == 1
+    assert len(OrderRepository.get_all_orders(include_archived=True)) == 2
+    assert PaymentRepository.get_payment_by_id(payment_id) is None
+    assert PaymentRepository.get_payment_by_id(payment_id, include_archived=True).order_id == archived
+    assert len(PaymentRepository.get_payment_by_order(archived, include_archived=True)) == 1
+    assert len(PaymentRepository.get_all_payments(include_archived=True)) == 2
+
+
+def test_archiving_keeps_rollups_and_sold_artworks(history):
+    sold = OrderRepository.create_order(history['buyer_id'], history['artwork'].id, 1, 10.0, OrderStatus.PAID).id
+    for status in (OrderStatus.SHIPPED, OrderStatus.DELIVERED, OrderStatus.COMPLETED):
+        OrderRepository.update_order(sold, {"status": status})
+    ArtworkRepository.update_artwork(history['artwork'].id, {"is_available": False})
+    archive_closed_orders(0, clock=lambda: datetime.utcnow() + timedelta(seconds=1))
+    assert OrderRepository.get_orders_by_id(sold) is None
+
+    assert RollupRepository.rebuild() == {'artist_day': 0, 'category_day': 0, 'buyer': 0}
+    # A stray pending order for the sold piece must not put it back on sale.
+    stray = history['order'](OrderStatus.PENDING)
+    OrderRepository.update_order(stray, {"status": OrderStatus.CANCELED})
+    assert ArtworkRepository.find_by_artwork_id(history['artwork'].id).is_available is False
@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import event, insert
+from config.config import db
+from models.artwork import ArtWork
+from models.order import Order, OrderStatus, ORDER_TRANSITIONS, allowed_from
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from repositories.facet_repo import FacetRepository
+from repositories.order_repo import OrderRepository
+from schemas.order_schema import OrderTransitionSchema, OrderStatusSchema
+from services.admin_service import AdminService
+from services.buyer_service import BuyerService
+
+
+@pytest.fixture
+def orders(make_user):
+    buyer = make_user(Role.BUYER)
+    artist = make_user(Role.ARTIST)
+    artwork = ArtWork(name="Piece", description="d", image_url="u", price=10.0, category="Painting",
+                      artist_id=artist.id)
+    db.session.add(artwork)
+    db.session.flush()
+
+    def _orders(*statuses, buyer_id=buyer.id):
+        rows = [Order(buyer_id=buyer_id, artwork_id=artwork.id, total_price=10.0, status=status)
+                for status in statuses]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [row.id for row in rows]
+
+    return _orders
+
+
+def statuses(order_ids):
+    db.session.expire_all()
+    return [db.session.get(Order, order_id).status for order_id in order_ids]
+
+
+def test_state_machine():
+    assert allowed_from(OrderStatus.SHIPPED) == {OrderStatus.PAID}
+    assert allowed_from(OrderStatus.CANCELED) == {OrderStatus.PENDING, OrderStatus.PAID}
+    assert not ORDER_TRANSITIONS[OrderStatus.COMPLETED]
+
+
+def test_bulk_transition_moves_only_eligible_orders(orders):
+    paid = orders(OrderStatus.PAID, OrderStatus.PAID)
+    pending, delivered = orders(OrderStatus.PENDING, OrderStatus.DELIVERED)
+    moved, rejected = OrderRepository.bulk_transition(OrderStatus.SHIPPED, paid + [pending, delivered, 999])
+    assert moved == sorted(paid)
+    assert rejected == sorted([pending, delivered, 999])
+    assert statuses(paid + [pending, delivered]) == [OrderStatus.SHIPPED] * 2 + [OrderStatus.PENDING,
+                                                                                 OrderStatus.DELIVERED]
+
+
+def test_bulk_transition_by_filter(orders, make_user):
+    other_buyer = make_user(Role.BUYER).id
+    mine = orders(OrderStatus.PENDING, OrderStatus.SHIPPED)
+    theirs = orders(OrderStatus.PENDING, buyer_id=other_buyer)
+    moved, rejected = OrderRepository.bulk_transition(OrderStatus.PAID, buyer_id=other_buyer)
+    assert (moved, rejected) == (theirs, [])
+    moved, rejected = OrderRepository.bulk_transition(OrderStatus.PAID, status=OrderStatus.PENDING)
+    assert (moved, rejected) == ([mine[0]], [])
+
+
+def test_bulk_transition_needs_a_selection():
+    with pytest.raises(ValueError):
+        OrderRepository.bulk_transition(OrderStatus.PAID)
+    with pytest.raises(ValueError):
+        OrderRepository.bulk_transition(OrderStatus.PAID, total_price=10.0)
+
+
+def test_ten_thousand_orders_move_in_one_update(orders):
+    orders(OrderStatus.PAID)
+    buyer_id, artwork_id = db.session.query(Order.buyer_id, Order.artwork_id).one()
+    db.session.execute(insert(Order), [{"buyer_id": buyer_id, "artwork_id": artwork_id, "total_price": 1.0,
+                                        "status": OrderStatus.PAID} for _ in range(10_000)])
+    db.session.commit()
+    ids = [order_id for order_id, in db.session.query(Order.id)]
+
+    updates = []
+    listener = lambda conn, cursor, statement, *args: updates.append(statement)
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        moved, rejected = OrderRepository.bulk_transition(OrderStatus.SHIPPED, ids)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    assert len(moved) == 10_001 and rejected == []
+    assert sum(statement.startswith("UPDATE") for statement in updates) == 1
+
+
+def test_update_order_enforces_transitions(orders):
+    order_id, = orders(OrderStatus.DELIVERED)
+    with pytest.raises(ValueError, match="from DELIVERED to PAID"):
+        OrderRepository.update_order(order_id, {"status": OrderStatus.PAID})
+    assert OrderRepository.update_order(order_id, {"status": OrderStatus.COMPLETED}).status == OrderStatus.COMPLETED
+
+
+def test_canceling_puts_the_artwork_back_on_sale(make_user):
+    artist = make_user(Role.ARTIST)
+    buyer = make_user(Role.BUYER)
+    artwork_id = ArtworkRepository.create_artwork(name="Only One", description="d", image_url="u", price=50.0,
+                                                  category="Print", artist_id=artist.id).id
+    order = BuyerService(buyer.id).place_order(artwork_id, 1)
+    assert ArtworkRepository.find_by_artwork_id(artwork_id).is_available is False
+
+    report = AdminService().transition_orders(OrderTransitionSchema(to_status=OrderStatusSchema.CANCELED,
+                                                                    order_ids=[order.id]))
+    assert report.moved == [order.id]
+    assert ArtworkRepository.find_by_artwork_id(artwork_id).is_available is True
+    assert FacetRepository.rebuild() == {}
+
+
+def test_transition_schema_requires_selection():
+    with pytest.raises(ValueError):
+        OrderTransitionSchema(to_status=OrderStatusSchema.PAID)
@@ -0,0 +1,143 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from config.config import db
+from models.order import Order, OrderStatus
+from models.payment import Payment, PaymentStatus, PaymentMethod
+from models.user import Role
+from repositories.order_repo import OrderRepository
+from repositories.payment_repo import PaymentRepository, PaymentOutcome
+from repositories.rollup_repo import RollupRepository
+from services.payment_gateway import FakePaymentGateway, GatewayUnavailable, ChargeRequest
+from services.payment_worker import PaymentWorker
+
+
+@pytest.fixture
+def payments(file_app, make_user):
+    buyer = make_user(Role.BUYER)
+    artist = make_user(Role.ARTIST)
+
+    def _payments(count, amount=25.0):
+        from repositories.artwork_repo import ArtworkRepository
+        ids = []
+        for n in range(count):
+            artwork = ArtworkRepository.create_artwork(name=f"Piece {n}", description="d", image_url="u",
+                                                       price=amount, category="Print", artist_id=artist.id)
+            order = OrderRepository.place_order(buyer.id, artwork.id, 1)
+            ids.append(PaymentRepository.create_payment(order.id, amount, PaymentMethod.CARD).id)
+        db.session.commit()
+        return ids
+
+    _payments.buyer_id = buyer.id
+    return _payments
+
+
+def worker_for(app, gateway, **options):
+    options.setdefault('base_delay', 0.0)
+    return PaymentWorker(app, gateway, **options)
+
+
+def statuses(payment_ids):
+    db.session.rollback()
+    return [db.session.get(Payment, payment_id).status for payment_id in payment_ids]
+
+
+def test_claims_are_leased_and_counted(payments):
+    ids = payments(3)
+    claimed = PaymentRepository.claim_due(batch_size=2, lease_seconds=60)
+    assert [row.id for row in claimed] == ids[:2] and {row.attempts for row in claimed} == {1}
+    assert [row.id for row in PaymentRepository.claim_due(batch_size=5, lease_seconds=60)] == ids[2:]
+    assert PaymentRepository.claim_due(batch_size=5, lease_seconds=60) == []
+    assert PaymentRepository.queue_depth() == (0, 3)
+    later = datetime.utcnow() + timedelta(seconds=61)
+    assert len(PaymentRepository.claim_due(batch_size=5, lease_seconds=60, now=later)) == 3
+
+
+def test_successful_charges_mark_payments_and_orders_paid(file_app, payments):
+    ids = payments(5)
+    worker = worker_for(file_app, FakePaymentGateway(), batch_size=2)
+    assert worker.drain() == 5
+    assert statuses(ids) == [PaymentStatus.SUCCESS] * 5
+    assert {order.status for order in db.session.query(Order)} == {OrderStatus.PAID}
+    assert all(db.session.get(Payment, payment_id).gateway_reference for payment_id in ids)
+    assert RollupRepository.buyer_lifetime_value(payments.buyer_id).revenue == 125.0
+
+    stats = worker.stats()
+    assert (stats['batches'], stats['succeeded'], stats['queue_pending']) == (3, 5, 0)
+    assert stats['settled_per_second'] > 0
+
+
+def test_declines_fail_at_once_and_leave_the_order_pending(file_app, payments):
+    ids = payments(2)
+    worker = worker_for(file_app, FakePaymentGateway(decline_rate=1.0))
+    worker.drain()
+    assert statuses(ids) == [PaymentStatus.FAILED] * 2
+    assert db.session.get(Payment, ids[0]).attempts == 1
+    assert "declined" in db.session.get(Payment, ids[0]).last_error
+    assert {order.status for order in db.session.query(Order)} == {OrderStatus.PENDING}
+
+
+def test_outages_are_retried_with_backoff_until_max_attempts(file_app, payments):
+    ids = payments(1)
+    worker = worker_for(file_app, FakePaymentGateway(failure_rate=1.0), max_attempts=3)
+    worker.drain()
+    assert statuses(ids) == [PaymentStatus.FAILED]
+    assert db.session.get(Payment, ids[0]).attempts == 3
+    assert worker.stats()['retried'] == 2
+
+    ids = payments(1)
+    backing_off = worker_for(file_app, FakePaymentGateway(failure_rate=1.0), base_delay=60.0)
+    assert backing_off.drain() == 1
+    assert statuses(ids) == [PaymentStatus.PENDING]
+    payment = db.session.get(Payment, ids[0])
+    assert (payment.attempts, payment.last_error.split(":")[0]) == (1, "GatewayUnavailable")
+    assert PaymentRepository.queue_depth()[1] == 1
+    assert PaymentRepository.claim_due(batch_size=5, lease_seconds=60,
+                                       now=payment.next_attempt_at - timedelta(microseconds=1)) == []
+
+
+def test_flaky_gateway_eventually_succeeds(file_app, payments):
+    class FlakyOnce(FakePaymentGateway):
+        def charge(self, request: ChargeRequest) -> str:
+            if request.attempt == 1:
+                raise GatewayUnavailable("timeout")
+            return super().charge(request)
+
+    ids = payments(3)
+    worker = worker_for(file_app, FlakyOnce())
+    worker.drain()
+    assert statuses(ids) == [PaymentStatus.SUCCESS] * 3
+    assert worker.stats()['retried'] == 3
+
+
+def test_stale_claims_and_canceled_orders_are_not_settled(payments):
+    ids = payments(2)
+    first, second = PaymentRepository.claim_due(batch_size=2, lease_seconds=0)
+    reclaimed = PaymentRepository.claim_due(batch_size=1, lease_seconds=60, now=datetime.utcnow() + timedelta(1))
+    assert reclaimed[0].attempts == 2
+    OrderRepository.update_order(second.order_id, {"status": OrderStatus.CANCELED})
+
+    settled, unpaid = PaymentRepository.settle([
+        PaymentOutcome(first.id, first.attempts, PaymentStatus.SUCCESS, reference="stale"),
+        PaymentOutcome(second.id, second.attempts, PaymentStatus.SUCCESS, reference="late"),
+    ])
+    assert (settled, unpaid) == ([second.id], [second.order_id])
+    assert statuses(ids) == [PaymentStatus.PENDING, PaymentStatus.SUCCESS]
+    assert db.session.get(Order, second.order_id).status == OrderStatus.CANCELED
+
+
+def test_worker_pool_settles_every_payment_exactly_once(file_app, payments):
+    ids = payments(60)
+    gateway = FakePaymentGateway(latency_seconds=0.005)
+    worker = worker_for(file_app, gateway, workers=3, batch_size=5, concurrency=4, interval_seconds=0.01)
+    worker.start()
+    deadline = time.monotonic() + 20
+    while worker.stats()['queue_pending'] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    worker.stop()
+
+    assert statuses(ids) == [PaymentStatus.SUCCESS] * 60
+    assert len(gateway.charges) == 60
+    stats = worker.stats()
+    print(f"settled {stats['succeeded']} payments at {stats['settled_per_second']:,.0f}/sec")
+    assert stats['succeeded'] == 60 and stats['lost_claims'] == 0
@@ -0,0 +1,194 @@
+import re
+from datetime import date, datetime
+import pytest
+from sqlalchemy import event
+from config.config import db
+from models.artwork import ArtWork
+from models.cart import Cart
+from models.cart_item import CartItem
+from models.order import Order, OrderStatus
+from models.payment import Payment, PaymentStatus, PaymentMethod
+from models.user import Role
+from repositories.archive_repo import ArchiveRepository
+from repositories.artwork_repo import ArtworkRepository
+from repositories.cart_repo import CartRepository
+from repositories.email_outbox_repo import EmailOutboxRepository
+from repositories.order_repo import OrderRepository
+from repositories.payment_repo import PaymentRepository
+from repositories.reconciliation_repo import ReconciliationRepository
+from repositories.rollup_repo import RollupRepository
+from repositories.user_repo import UserRepository
+
+TABLE_SCAN = re.compile(r"^SCAN (\w+)(?!.*\b(USING|VIRTUAL TABLE INDEX)\b)")
+
+
+@pytest.fixture
+def seeded(make_user):
+    buyer = make_user(Role.BUYER)
+    artist = make_user(Role.ARTIST)
+    spare_user = make_user(Role.BUYER)
+    artworks = [
+        ArtWork(name=f"Piece {i}", description="d", image_url="u", price=100.0 + i,
+                category="Painting", artist_id=artist.id)
+        for i in range(3)
+    ]
+    db.session.add_all(artworks)
+    db.session.flush()
+    cart = Cart(buyer_id=buyer.id)
+    db.session.add(cart)
+    db.session.flush()
+    db.session.add(CartItem(cart_id=cart.cart_id, artwork_id=artworks[0].id, quantity=1, subtotal=100.0))
+    order = Order(buyer_id=buyer.id, artwork_id=artworks[0].id, total_price=100.0, status=OrderStatus.PENDING)
+    spare_order = Order(buyer_id=buyer.id, artwork_id=artworks[1].id, total_price=101.0,
+                        status=OrderStatus.COMPLETED, closed_at=datetime(2026, 1, 1))
+    db.session.add_all([order, spare_order])
+    db.session.flush()
+    payment = Payment(order_id=order.id, amount=100.0, payment_method=PaymentMethod.CARD)
+    db.session.add(payment)
+    db.session.commit()
+    return {
+        "buyer": buyer.id, "buyer_email": buyer.email, "buyer_code": buyer.verification_code,
+        "artist": artist.id, "artworks": [a.id for a in artworks], "cart": cart.cart_id,
+        "order": order.id, "spare_order": spare_order.id, "payment": payment.id, "spare_user": spare_user.id,
+    }
+
+
+REPOSITORY_CALLS = [
+    ("ArtworkRepository.find_by_artwork_id", lambda s: ArtworkRepository.find_by_artwork_id(s["artworks"][0])),
+    ("ArtworkRepository.find_by_artist_id", lambda s: ArtworkRepository.find_by_artist_id(s["artist"])),
+    ("ArtworkRepository.find_all_available", lambda s: ArtworkRepository.find_all_available()),
+    ("ArtworkRepository.find_all_available_rows",
+     lambda s: ArtworkRepository.find_all_available_rows(("id", "name", "price"))),
+    ("ArtworkRepository.browse_available", lambda s: ArtworkRepository.browse_available(limit=2)),
+    ("ArtworkRepository.browse_available[price]",
+     lambda s: ArtworkRepository.browse_available(sort_by="price", min_price=50, max_price=500, limit=2)),
+    ("ArtworkRepository.browse_available[category]",
+     lambda s: ArtworkRepository.browse_available(category="Painting", limit=2)),
+    ("ArtworkRepository.browse_available[artist]",
+     lambda s: ArtworkRepository.browse_available(artist_id=s["artist"], limit=2)),
+    ("ArtworkRepository.search",
+     lambda s: ArtworkRepository.search("piece", {"category": "Painting", "max_price": 500}, limit=5)),
+    ("ArtworkRepository.update_artwork",
+     lambda s: ArtworkRepository.update_artwork(s["artworks"][0], {"price": 120.0})),
+    ("ArtworkRepository.has_sales", lambda s: ArtworkRepository.has_sales(s["artworks"][0])),
+    ("ArtworkRepository.delete_artwork", lambda s: ArtworkRepository.delete_artwork(s["artworks"][2])),
+    ("CartRepository.get_cart_or_create_cart", lambda s: CartRepository.get_cart_or_create_cart(s["buyer"])),
+    ("CartRepository.add_to_cart", lambda s: CartRepository.add_to_cart(s["buyer"], s["artworks"][1])),
+    ("CartRepository.get_cart_by_buyer", lambda s: CartRepository.get_cart_by_buyer(s["buyer"])),
+    ("CartRepository.remove_from_cart", lambda s: CartRepository.remove_from_cart(s["cart"], s["artworks"][0])),
+    ("CartRepository.clear_cart", lambda s: CartRepository.clear_cart(s["cart"])),
+    ("EmailOutboxRepository.claim_due", lambda s: EmailOutboxRepository.claim_due(batch_size=5, lease_seconds=60)),
+    ("EmailOutboxRepository.queue_depth", lambda s: EmailOutboxRepository.queue_depth()),
+    ("EmailOutboxRepository.requeue_dead", lambda s: EmailOutboxRepository.requeue_dead()),
+    ("OrderRepository.checkout_cart", lambda s: OrderRepository.checkout_cart(s["buyer"], s["cart"])),
+    ("OrderRepository.list_orders", lambda s: OrderRepository.list_orders(limit=1)),
+    ("OrderRepository.list_orders[status]",
+     lambda s: OrderRepository.list_orders(status=OrderStatus.PENDING, limit=1)),
+    ("OrderRepository.list_orders[buyer]", lambda s: OrderRepository.list_orders(buyer_id=s["buyer"], limit=1)),
+    ("OrderRepository.list_orders[total_price]",
+     lambda s: OrderRepository.list_orders(sort_by="total_price", limit=1)),
+    ("OrderRepository.get_orders_by_id", lambda s: OrderRepository.get_orders_by_id(s["order"])),
+    ("OrderRepository.get_orders_by_buyer_id", lambda s: OrderRepository.get_orders_by_buyer_id(s["buyer"])),
+    ("OrderRepository.get_orders_by_buyer_id[archived]",
+     lambda s: OrderRepository.get_orders_by_buyer_id(s["buyer"], include_archived=True)),
+    ("OrderRepository.get_orders_by_artwork_id",
+     lambda s: OrderRepository.get_orders_by_artwork_id(s["artworks"][0])),
+    ("OrderRepository.get_order_by_order_status",
+     lambda s: OrderRepository.get_order_by_order_status(OrderStatus.PENDING)),
+    ("OrderRepository.update_order", lambda s: OrderRepository.update_order(s["order"], {"quantity": 2})),
+    ("OrderRepository.delete_order", lambda s: OrderRepository.delete_order(s["spare_order"])),
+    ("OrderRepository.bulk_transition",
+     lambda s: OrderRepository.bulk_transition(OrderStatus.CANCELED, [s["order"], s["spare_order"]])),
+    ("OrderRepository.bulk_transition[buyer]",
+     lambda s: OrderRepository.bulk_transition(OrderStatus.PAID, buyer_id=s["buyer"])),
+    ("ArchiveRepository.archive_batch", lambda s: ArchiveRepository.archive_batch(datetime(2100, 1, 1))),
+    ("PaymentRepository.get_payment_by_order[archived]",
+     lambda s: PaymentRepository.get_payment_by_order(s["order"], include_archived=True)),
+    ("PaymentRepository.get_payment_by_id", lambda s: PaymentRepository.get_payment_by_id(s["payment"])),
+    ("PaymentRepository.get_payment_by_order", lambda s: PaymentRepository.get_payment_by_order(s["order"])),
+    ("PaymentRepository.list_payments", lambda s: PaymentRepository.list_payments(limit=1)),
+    ("PaymentRepository.list_payments[status]",
+     lambda s: PaymentRepository.list_payments(status=PaymentStatus.PENDING, limit=1)),
+    ("PaymentRepository.list_payments[amount]", lambda s: PaymentRepository.list_payments(sort_by="amount", limit=1)),
+    ("PaymentRepository.get_payment_by_status",
+     lambda s: PaymentRepository.get_payment_by_status(PaymentStatus.PENDING)),
+    ("PaymentRepository.update_payment",
+     lambda s: PaymentRepository.update_payment(s["payment"], {"payment_status": PaymentStatus.SUCCESS})),
+    ("PaymentRepository.delete_payment", lambda s: PaymentRepository.delete_payment(s["payment"])),
+    ("PaymentRepository.claim_due", lambda s: PaymentRepository.claim_due(batch_size=5, lease_seconds=60)),
+    ("PaymentRepository.queue_depth", lambda s: PaymentRepository.queue_depth()),
+    ("ReconciliationRepository.chunk_bound", lambda s: ReconciliationRepository.chunk_bound("live", 0, 2)),
+    ("ReconciliationRepository.stream_orders",
+     lambda s: list(ReconciliationRepository.stream_orders("archive", 0, s["order"]))),
+    ("ReconciliationRepository.stream_payments",
+     lambda s: list(ReconciliationRepository.stream_payments("live", 0, s["order"]))),
+    ("RollupRepository.artist_daily_sales",
+     lambda s: RollupRepository.artist_daily_sales(s["artist"], date(2026, 1, 1), date(2026, 12, 31))),
+    ("RollupRepository.artist_totals",
+     lambda s: RollupRepository.artist_totals(s["artist"], date(2026, 1, 1), date(2026, 12, 31))),
+    ("RollupRepository.category_daily_sales",
+     lambda s: RollupRepository.category_daily_sales(date(2026, 1, 1), date(2026, 12, 31), "Painting")),
+    ("RollupRepository.top_categories",
+     lambda s: RollupRepository.top_categories(date(2026, 1, 1), date(2026, 12, 31))),
+    ("RollupRepository.buyer_lifetime_value", lambda s: RollupRepository.buyer_lifetime_value(s["buyer"])),
+    ("RollupRepository.top_buyers", lambda s: RollupRepository.top_buyers()),
+    ("UserRepository.find_by_email", lambda s: UserRepository.find_by_email(s["buyer_email"])),
+    ("UserRepository.find_by_user_id", lambda s: UserRepository.find_by_user_id(s["buyer"])),
+    ("UserRepository.find_by_verification_code",
+     lambda s: UserRepository.find_by_verification_code(s["buyer_code"])),
+    ("UserRepository.list_users", lambda s: UserRepository.list_users(limit=1)),
+    ("UserRepository.list_users[role]", lambda s: UserRepository.list_users(role=Role.ARTIST, limit=1)),
+    ("UserRepository.list_users[email]", lambda s: UserRepository.list_users(sort_by="email", limit=1)),
+    ("UserRepository.update_user", lambda s: UserRepository.update_user(s["buyer"], {"first_name": "Renamed"})),
+    ("UserRepository.delete_user", lambda s: UserRepository.delete_user(s["spare_user"])),
+]
+# find_all_users, get_all_orders and get_all_payments (and their *_rows
+# variants) list whole tables, so a scan is the expected plan for them and they
+# are deliberately not checked.
+
+
+def capture_statements(call, seeded):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    db.session.expunge_all()
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        call(seeded)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def table_scans(statement, parameters):
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in plan if TABLE_SCAN.match(row[-1])]
+
+
+@pytest.mark.parametrize("name, call", REPOSITORY_CALLS, ids=[name for name, _ in REPOSITORY_CALLS])
+def test_repository_method_never_scans_a_table(seeded, name, call):
+    statements = capture_statements(call, seeded)
+    assert statements, f"{name} issued no SQL to explain"
+    scans = {statement: table_scans(statement, parameters) for statement, parameters in statements}
+    assert not any(scans.values()), f"{name} falls back to a table scan: {scans}"
+
+
+DUE_INDEX_CALLS = [
+    ("ix_payment_status_next_attempt_at", lambda s: PaymentRepository.claim_due(batch_size=5, lease_seconds=60)),
+    ("ix_payment_status_next_attempt_at", lambda s: PaymentRepository.queue_depth()),
+    ("ix_email_outbox_status_next_attempt_at",
+     lambda s: EmailOutboxRepository.claim_due(batch_size=5, lease_seconds=60)),
+    ("ix_email_outbox_status_next_attempt_at", lambda s: EmailOutboxRepository.queue_depth()),
+]
+
+
+@pytest.mark.parametrize("index, call", DUE_INDEX_CALLS, ids=[index for index, _ in DUE_INDEX_CALLS])
+def test_due_queries_use_the_due_index(seeded, index, call):
+    # Not scanning is not enough here: the planner would rather walk the
+    # status/created_at index and sort than use a status-only partial index.
+    statement, parameters = capture_statements(call, seeded)[0]
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    assert any(index in row[-1] for row in plan), plan
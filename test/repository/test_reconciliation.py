@@ -0,0 +1,112 @@
+import json
+from datetime import datetime
+from collections import Counter, namedtuple
+import pytest
+from config.config import db
+from models.archive import OrderArchive, PaymentArchive
+from models.order import Order, OrderStatus
+from models.payment import Payment, PaymentStatus, PaymentMethod
+from models.reconciliation import ReconciliationDiscrepancy, DiscrepancyKind
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from services.reconciliation import merge_join, reconcile_payments
+
+OrderRow = namedtuple('OrderRow', 'id status total_price')
+PaymentRow = namedtuple('PaymentRow', 'id order_id amount')
+
+
+@pytest.fixture
+def ledger(make_user):
+    buyer = make_user(Role.BUYER)
+    artist = make_user(Role.ARTIST)
+    artwork = ArtworkRepository.create_artwork(name="Piece", description="d", image_url="u", price=40.0,
+                                               category="Painting", artist_id=artist.id)
+
+    def order(status, total=40.0, paid=(), failed=0, archived=False):
+        order_model, payment_model = (OrderArchive, PaymentArchive) if archived else (Order, Payment)
+        row = order_model(buyer_id=buyer.id, artwork_id=artwork.id, total_price=total, status=status,
+                          **({'id': 10_000 + db.session.query(OrderArchive).count()} if archived else {}))
+        db.session.add(row)
+        db.session.flush()
+        payments = [(amount, PaymentStatus.SUCCESS) for amount in paid] + [(total, PaymentStatus.FAILED)] * failed
+        for n, (amount, status) in enumerate(payments):
+            extra = {'id': row.id * 10 + n, 'created_at': datetime(2025, 1, 1)} if archived else {}
+            db.session.add(payment_model(order_id=row.id, amount=amount, status=status,
+                                         payment_method=PaymentMethod.CARD, **extra))
+        db.session.commit()
+        return row.id
+
+    return order
+
+
+def found(run_id):
+    return {(row.source, row.kind, row.order_id) for row in
+            db.session.query(ReconciliationDiscrepancy).filter_by(run_id=run_id)}
+
+
+def test_merge_join_pairs_sorted_streams():
+    orders = [OrderRow(2, OrderStatus.PAID, 5.0), OrderRow(4, OrderStatus.PAID, 5.0), OrderRow(6, OrderStatus.PAID, 5.0)]
+    payments = [PaymentRow(1, 1, 5.0), PaymentRow(2, 2, 5.0), PaymentRow(3, 2, 5.0), PaymentRow(4, 3, 5.0),
+                PaymentRow(5, 6, 5.0), PaymentRow(6, 9, 5.0)]
+    joined = [(order.id if order else None, [payment.id for payment in matched])
+              for order, matched in merge_join(iter(orders), iter(payments))]
+    assert joined == [(None, [1]), (2, [2, 3]), (None, [4]), (4, []), (6, [5]), (None, [6])]
+
+
+def test_reports_each_kind_of_discrepancy(ledger):
+    ledger(OrderStatus.PAID, paid=[40.0], failed=1)
+    ledger(OrderStatus.COMPLETED, paid=[40.0])
+    ledger(OrderStatus.PENDING, failed=2)
+    ledger(OrderStatus.CANCELED)
+    missing = ledger(OrderStatus.PAID, failed=1)
+    short = ledger(OrderStatus.SHIPPED, paid=[35.0])
+    twice = ledger(OrderStatus.DELIVERED, paid=[40.0, 40.0])
+    charged = ledger(OrderStatus.CANCELED, paid=[40.0])
+    archived_ok = ledger(OrderStatus.COMPLETED, paid=[40.0], archived=True)
+    archived_missing = ledger(OrderStatus.COMPLETED, archived=True)
+
+    report = reconcile_payments(chunk_size=3)
+    assert report.completed and report.discrepancies == 5
+    assert (report.orders_checked, report.payments_checked) == (10, 7)
+    assert archived_ok and found(report.run_id) == {
+        ('live', DiscrepancyKind.MISSING_PAYMENT, missing),
+        ('live', DiscrepancyKind.AMOUNT_MISMATCH, short),
+        ('live', DiscrepancyKind.DUPLICATE_PAYMENT, twice),
+        ('live', DiscrepancyKind.UNPAID_ORDER_CHARGED, charged),
+        ('archive', DiscrepancyKind.MISSING_PAYMENT, archived_missing),
+    }
+    mismatch = db.session.query(ReconciliationDiscrepancy).filter_by(order_id=short).one()
+    assert (mismatch.expected_amount, mismatch.actual_amount, mismatch.order_status) == (40.0, 35.0, "SHIPPED")
+
+
+def test_resumes_from_checkpoint_without_repeating_chunks(ledger):
+    for n in range(7):
+        ledger(OrderStatus.PAID, paid=[40.0] if n % 2 else [])
+
+    partial = reconcile_payments(chunk_size=2, max_chunks=2)
+    assert (partial.completed, partial.orders_checked, partial.chunks) == (False, 4, 2)
+    resumed = reconcile_payments(run_id=partial.run_id, chunk_size=2)
+    assert resumed.completed and resumed.run_id == partial.run_id
+    assert (resumed.orders_checked, resumed.discrepancies) == (7, 4)
+    assert len(found(partial.run_id)) == 4
+
+    fresh = reconcile_payments(chunk_size=100)
+    assert (fresh.orders_checked, fresh.discrepancies, fresh.chunks) == (7, 4, 2)
+    assert reconcile_payments(run_id=fresh.run_id).chunks == 0
+    with pytest.raises(ValueError):
+        reconcile_payments(run_id=999)
+
+
+def test_cli_writes_discrepancies_as_jsonl(app, ledger, tmp_path):
+    missing = ledger(OrderStatus.PAID)
+    ledger(OrderStatus.PAID, paid=[40.0])
+    output = tmp_path / "discrepancies.jsonl"
+
+    result = app.test_cli_runner().invoke(args=["payments", "reconcile", "--chunk-size", "1", "--output",
+                                                str(output)])
+    assert result.exit_code == 0, result.output
+    assert "found 1 discrepancies" in result.output
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [(line['kind'], line['order_id'], line['source']) for line in lines] == \
+        [("MISSING_PAYMENT", missing, "live")]
+    assert Counter(line['expected_amount'] for line in lines) == {40.0: 1}
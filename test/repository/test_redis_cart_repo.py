@@ -0,0 +1,187 @@
+import fakeredis
+import pytest
+from unittest.mock import patch
+from sqlalchemy import event
+from config.config import db
+from models.artwork import ArtWork
+from models.cart_item import CartItem
+from models.user import Role
+from repositories.cart_repo import CartRepository
+from repositories.redis_cart_repo import RedisCartRepository, CartFlusher, build_cart_repository
+from services.buyer_service import BuyerService
+
+
+@pytest.fixture
+def repo():
+    return RedisCartRepository(fakeredis.FakeRedis())
+
+
+@pytest.fixture
+def catalog(make_user):
+    buyer = make_user(Role.BUYER)
+    artist = make_user(Role.ARTIST)
+    artworks = [ArtWork(name=f"Piece {i}", description="d", image_url="u", price=10.0 * (i + 1),
+                        category="Painting", artist_id=artist.id) for i in range(3)]
+    db.session.add_all(artworks)
+    db.session.commit()
+    return buyer.id, [artwork.id for artwork in artworks]
+
+
+def sql_lines(cart_id):
+    db.session.expire_all()
+    return {item.artwork_id: (item.quantity, item.subtotal)
+            for item in db.session.query(CartItem).filter_by(cart_id=cart_id)}
+
+
+def count_writes(call):
+    writes = []
+    listener = lambda conn, cursor, statement, *args: writes.append(statement)
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        call()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    return sum(statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")) for statement in writes)
+
+
+def test_writes_stay_in_redis_until_flushed(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    cart_id = repo.get_cart_or_create_cart(buyer_id).cart_id
+
+    assert count_writes(lambda: [repo.add_to_cart(buyer_id, artwork_ids[0]) for _ in range(5)]) == 0
+    repo.add_many_to_cart(buyer_id, [(artwork_ids[1], 2)])
+    assert sql_lines(cart_id) == {}
+    assert repo.pending() == 1
+
+    assert repo.flush() == 1
+    assert sql_lines(cart_id) == {artwork_ids[0]: (5, 50.0), artwork_ids[1]: (2, 40.0)}
+    assert repo.pending() == 0
+
+
+def test_remove_and_clear_are_written_behind(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    cart = repo.add_many_to_cart(buyer_id, [(artwork_ids[0], 1), (artwork_ids[1], 1)])
+    repo.flush()
+    assert repo.remove_from_cart(cart.cart_id, artwork_ids[0]) is True
+    assert repo.remove_from_cart(cart.cart_id, artwork_ids[0]) is False
+    repo.flush()
+    assert sql_lines(cart.cart_id) == {artwork_ids[1]: (1, 20.0)}
+    repo.clear_cart(cart.cart_id)
+    repo.flush()
+    assert sql_lines(cart.cart_id) == {}
+
+
+def test_existing_sql_cart_is_loaded_once(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    cart = CartRepository.add_to_cart(buyer_id, artwork_ids[2], quantity=3)
+    repo.add_to_cart(buyer_id, artwork_ids[2])
+    repo.flush()
+    assert sql_lines(cart.cart_id) == {artwork_ids[2]: (4, 120.0)}
+
+
+def test_unknown_artwork_is_rejected(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    with pytest.raises(ValueError, match="Artwork not found: 999"):
+        repo.add_many_to_cart(buyer_id, [(artwork_ids[0], 1), (999, 1)])
+    assert repo.pending() == 0
+
+
+def test_reads_flush_pending_changes(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    repo.add_to_cart(buyer_id, artwork_ids[0], quantity=2)
+    with patch("services.buyer_service.current_cart_repository", return_value=repo):
+        view = BuyerService(buyer_id).get_cart_view()
+    assert (view.item_count, view.total) == (2, 20.0)
+    assert repo.pending() == 0
+
+
+def test_changes_keep_the_buyer_key_alive(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    cart_id = repo.add_to_cart(buyer_id, artwork_ids[0]).cart_id
+    repo.client.expire(repo._buyer_key(buyer_id), 5)
+    repo.remove_from_cart(cart_id, artwork_ids[0])
+    assert repo.client.ttl(repo._buyer_key(buyer_id)) > 5
+    repo.client.delete(repo._buyer_key(buyer_id))
+    repo.clear_cart(cart_id)
+    assert int(repo.client.get(repo._buyer_key(buyer_id))) == cart_id
+
+
+def test_checkout_flushes_a_cart_whose_buyer_key_expired(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    repo.add_to_cart(buyer_id, artwork_ids[0], quantity=2)
+    repo.client.delete(repo._buyer_key(buyer_id))
+    with patch("services.buyer_service.current_cart_repository", return_value=repo):
+        orders = BuyerService(buyer_id).checkout()
+    assert [(order.artwork_id, order.quantity) for order in orders] == [(artwork_ids[0], 2)]
+
+
+def test_flush_started_before_checkout_cannot_restore_the_cart(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    cart_id = repo.add_to_cart(buyer_id, artwork_ids[0]).cart_id
+    # A background flush claims the cart and reads it, then stalls.
+    repo.client.smove(repo._dirty_key, repo._flushing_key, cart_id)
+    stale = repo._snapshot(cart_id)
+    with patch("services.buyer_service.current_cart_repository", return_value=repo):
+        BuyerService(buyer_id).checkout()
+    assert CartRepository.replace_cart_lines({cart_id: stale}) == set()
+    assert sql_lines(cart_id) == {}
+
+
+def test_older_snapshots_never_overwrite_newer_ones(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    cart_id = repo.add_to_cart(buyer_id, artwork_ids[0]).cart_id
+    older = repo._snapshot(cart_id)
+    repo.add_to_cart(buyer_id, artwork_ids[1])
+    repo.flush()
+    assert CartRepository.replace_cart_lines({cart_id: older}) == set()
+    assert sql_lines(cart_id) == {artwork_ids[0]: (1, 10.0), artwork_ids[1]: (1, 20.0)}
+
+
+def test_crashed_flush_is_recovered(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    cart_id = repo.add_to_cart(buyer_id, artwork_ids[0]).cart_id
+    with patch.object(CartRepository, "replace_cart_lines", side_effect=SystemExit):
+        with pytest.raises(SystemExit):
+            repo.flush()
+    # The process died mid-flush: the cart is parked in the flushing set.
+    assert repo.client.scard(repo._dirty_key) == 0
+    assert repo.recover() == 1
+    repo.flush()
+    assert sql_lines(cart_id) == {artwork_ids[0]: (1, 10.0)}
+
+
+def test_failed_flush_requeues_carts(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    repo.add_to_cart(buyer_id, artwork_ids[0])
+    with patch.object(CartRepository, "replace_cart_lines", side_effect=RuntimeError("locked")):
+        with pytest.raises(RuntimeError):
+            repo.flush()
+    assert repo.client.scard(repo._dirty_key) == 1
+    assert repo.flush() == 1
+
+
+def test_lost_redis_state_never_empties_sql(repo, catalog):
+    buyer_id, artwork_ids = catalog
+    cart_id = repo.add_to_cart(buyer_id, artwork_ids[0]).cart_id
+    repo.flush()
+    repo.add_to_cart(buyer_id, artwork_ids[1])
+    repo.client.delete(repo._cart_key(cart_id))
+    repo.flush()
+    assert sql_lines(cart_id) == {artwork_ids[0]: (1, 10.0)}
+
+
+def test_flusher_drains_on_stop(file_app, repo, catalog):
+    buyer_id, artwork_ids = catalog
+    cart_id = repo.add_to_cart(buyer_id, artwork_ids[0]).cart_id
+    db.session.commit()
+    flusher = CartFlusher(file_app, repo, interval_seconds=60)
+    flusher.start()
+    flusher.stop()
+    assert sql_lines(cart_id) == {artwork_ids[0]: (1, 10.0)}
+
+
+def test_build_cart_repository():
+    assert build_cart_repository({}) is CartRepository
+    assert isinstance(build_cart_repository({"CART_BACKEND": "redis"}), RedisCartRepository)
+    with pytest.raises(ValueError):
+        build_cart_repository({"CART_BACKEND": "memcached"})
@@ -0,0 +1,100 @@
+import threading
+import time
+import pytest
+from sqlalchemy.exc import OperationalError
+from config.config import db
+from config.sqlite import retry_on_lock
+from models.artwork import ArtWork
+from models.order import Order
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from repositories.cart_repo import CartRepository
+from repositories.facet_repo import FacetRepository
+from services.buyer_service import BuyerService
+
+WORKERS = 8
+
+
+@pytest.fixture
+def one_of_a_kind(make_user):
+    artist = make_user(Role.ARTIST)
+    return ArtworkRepository.create_artwork(name="Only One", description="d", image_url="u", price=900.0,
+                                            category="Painting", artist_id=artist.id).id
+
+
+def test_reserve_only_succeeds_once(one_of_a_kind):
+    assert set(ArtworkRepository.reserve_artworks([one_of_a_kind])) == {one_of_a_kind}
+    db.session.commit()
+    assert ArtworkRepository.reserve_artworks([one_of_a_kind]) == {}
+    assert FacetRepository.rebuild() == {}
+
+
+def test_sold_artwork_is_flagged_in_other_carts(one_of_a_kind, make_user):
+    winner, other = make_user(Role.BUYER).id, make_user(Role.BUYER).id
+    CartRepository.add_to_cart(other, one_of_a_kind)
+    BuyerService(winner).place_order(one_of_a_kind, 1)
+    view = BuyerService(other).get_cart_view()
+    assert [item.is_available for item in view.items] == [False]
+    with pytest.raises(ValueError, match="no longer available"):
+        BuyerService(other).checkout()
+
+
+def test_concurrent_buyers_cannot_double_sell(file_app, one_of_a_kind, make_user):
+    buyers = [make_user(Role.BUYER).id for _ in range(WORKERS)]
+    db.session.commit()
+    barrier = threading.Barrier(WORKERS)
+    outcomes = []
+
+    def buy(buyer_id):
+        with file_app.app_context():
+            barrier.wait()
+            try:
+                BuyerService(buyer_id).place_order(one_of_a_kind, 1)
+                outcomes.append("won")
+            except ValueError:
+                outcomes.append("sold out")
+            except Exception as e:
+                outcomes.append(repr(e))
+            finally:
+                db.session.remove()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=buy, args=(buyer_id,)) for buyer_id in buyers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{WORKERS} buyers settled in {elapsed * 1000:.1f}ms ({WORKERS / elapsed:,.0f} attempts/sec)")
+    assert sorted(outcomes) == ["sold out"] * (WORKERS - 1) + ["won"]
+    db.session.expire_all()
+    assert db.session.query(Order).filter_by(artwork_id=one_of_a_kind).count() == 1
+    assert db.session.get(ArtWork, one_of_a_kind).is_available is False
+
+
+def test_retry_on_lock_backs_off_then_succeeds(app):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise OperationalError("UPDATE", {}, Exception("database is locked"))
+        return "done"
+
+    assert retry_on_lock(flaky, base_delay=0.001) == "done"
+    assert len(calls) == 3
+
+
+def test_retry_on_lock_gives_up(app):
+    def locked():
+        raise OperationalError("UPDATE", {}, Exception("database is locked"))
+
+    with pytest.raises(RuntimeError, match="after 3 attempts"):
+        retry_on_lock(locked, attempts=3, base_delay=0.001)
+
+
+def test_wal_and_busy_timeout_are_enabled(file_app):
+    connection = db.session.connection()
+    assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+    assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
@@ -0,0 +1,143 @@
+from datetime import date, datetime
+import pytest
+from config.config import db
+from models.order import Order, OrderStatus
+from models.sales_rollup import ArtistDailySales, REVENUE_STATUSES
+from models.user import Role
+from repositories.artwork_repo import ArtworkRepository
+from repositories.order_repo import OrderRepository
+from repositories.rollup_repo import RollupRepository
+from schemas.report_schema import SalesPeriodSchema
+from services.admin_service import AdminService
+from services.artist_service import ArtworkService
+
+DAY = date(2026, 3, 14)
+PERIOD = (date(2026, 3, 1), date(2026, 3, 31))
+
+
+@pytest.fixture
+def shop(make_user):
+    artist = make_user(Role.ARTIST)
+    buyer = make_user(Role.BUYER)
+    paintings = [ArtworkRepository.create_artwork(name=f"Painting {n}", description="d", image_url="u",
+                                                  price=100.0, category="Painting", artist_id=artist.id)
+                 for n in range(3)]
+    print_ = ArtworkRepository.create_artwork(name="Print", description="d", image_url="u", price=40.0,
+                                              category="Print", artist_id=artist.id)
+
+    def order(artwork, status=OrderStatus.PENDING, total_price=None, quantity=1, created_at=datetime(2026, 3, 14, 9)):
+        row = Order(buyer_id=buyer.id, artwork_id=artwork.id, quantity=quantity, status=status,
+                    total_price=total_price if total_price is not None else artwork.price * quantity,
+                    created_at=created_at)
+        db.session.add(row)
+        db.session.flush()
+        if status in REVENUE_STATUSES:
+            RollupRepository.record_orders([row.id])
+        db.session.commit()
+        return row.id
+
+    return {'artist_id': artist.id, 'buyer_id': buyer.id, 'paintings': paintings, 'print': print_, 'order': order}
+
+
+def artist_totals(shop):
+    return tuple(RollupRepository.artist_totals(shop['artist_id'], *PERIOD))
+
+
+def test_paid_orders_count_until_canceled(shop):
+    first = shop['order'](shop['paintings'][0])
+    second = shop['order'](shop['print'], quantity=2)
+    assert artist_totals(shop) == (0, 0, 0.0)
+
+    OrderRepository.update_order(first, {"status": OrderStatus.PAID})
+    OrderRepository.update_order(second, {"status": OrderStatus.PAID})
+    assert artist_totals(shop) == (2, 3, 180.0)
+    OrderRepository.update_order(first, {"status": OrderStatus.SHIPPED})
+    assert artist_totals(shop) == (2, 3, 180.0)
+
+    OrderRepository.update_order(second, {"status": OrderStatus.CANCELED})
+    assert artist_totals(shop) == (1, 1, 100.0)
+    assert {row.category: row.revenue for row in RollupRepository.category_daily_sales(*PERIOD)} == {
+        "Painting": 100.0, "Print": 0.0}
+    assert RollupRepository.buyer_lifetime_value(shop['buyer_id']).revenue == 100.0
+    assert RollupRepository.rebuild() == {'artist_day': 0, 'category_day': 0, 'buyer': 0}
+
+
+def test_bulk_transitions_only_subtract_orders_that_were_sales(shop):
+    paid = [shop['order'](artwork, OrderStatus.PAID) for artwork in shop['paintings']]
+    pending = shop['order'](shop['print'])
+    moved, _ = OrderRepository.bulk_transition(OrderStatus.PAID, [pending])
+    assert moved == [pending]
+    assert artist_totals(shop) == (4, 4, 340.0)
+
+    moved, rejected = OrderRepository.bulk_transition(OrderStatus.CANCELED, paid[:2] + [pending])
+    assert (moved, rejected) == (sorted(paid[:2] + [pending]), [])
+    assert artist_totals(shop) == (1, 1, 100.0)
+    assert RollupRepository.rebuild() == {'artist_day': 0, 'category_day': 0, 'buyer': 0}
+
+
+def test_price_changes_create_and_delete_keep_rollups_in_step(shop):
+    repriced = shop['order'](shop['paintings'][0], OrderStatus.PAID)
+    OrderRepository.update_order(repriced, {"total_price": 75.0})
+    created = OrderRepository.create_order(shop['buyer_id'], shop['print'].id, 1, 40.0, OrderStatus.PAID)
+    assert RollupRepository.buyer_lifetime_value(shop['buyer_id']).revenue == 115.0
+    OrderRepository.delete_order(created.id)
+    assert RollupRepository.buyer_lifetime_value(shop['buyer_id']).revenue == 75.0
+    assert RollupRepository.rebuild() == {'artist_day': 0, 'category_day': 0, 'buyer': 0}
+
+
+def test_sold_artworks_keep_their_artist_and_category(shop, make_user):
+    sold = shop['order'](shop['paintings'][0], OrderStatus.PAID)
+    with pytest.raises(ValueError, match="has sales"):
+        ArtworkRepository.update_artwork(shop['paintings'][0].id, {"category": "Print"})
+    with pytest.raises(ValueError, match="has sales"):
+        ArtworkRepository.update_artwork(shop['paintings'][0].id, {"artist_id": make_user(Role.ARTIST).id})
+    assert ArtworkRepository.update_artwork(shop['paintings'][0].id, {"category": "Painting", "price": 90.0})
+    assert ArtworkRepository.update_artwork(shop['paintings'][1].id, {"category": "Print"}).category == "Print"
+
+    OrderRepository.update_order(sold, {"status": OrderStatus.CANCELED})
+    assert {row.category: row.revenue for row in RollupRepository.category_daily_sales(*PERIOD)} == {
+        "Painting": 0.0}
+    assert RollupRepository.rebuild() == {'artist_day': 0, 'category_day': 0, 'buyer': 0}
+
+
+def test_days_and_rankings(shop):
+    shop['order'](shop['paintings'][0], OrderStatus.PAID, created_at=datetime(2026, 3, 2, 23, 59))
+    shop['order'](shop['paintings'][1], OrderStatus.COMPLETED, created_at=datetime(2026, 3, 3, 0, 1))
+    shop['order'](shop['print'], OrderStatus.PAID, created_at=datetime(2026, 4, 1))
+    RollupRepository.rebuild()
+
+    days = RollupRepository.artist_daily_sales(shop['artist_id'], *PERIOD)
+    assert [(row.day, row.revenue) for row in days] == [(date(2026, 3, 2), 100.0), (date(2026, 3, 3), 100.0)]
+    assert [(row.category, row.revenue) for row in RollupRepository.top_categories(date(2026, 3, 1),
+                                                                                    date(2026, 4, 30))] == [
+        ("Painting", 200.0), ("Print", 40.0)]
+    assert [row.buyer_id for row in RollupRepository.top_buyers()] == [shop['buyer_id']]
+
+
+def test_rebuild_streams_history_and_repairs_drift(shop):
+    for artwork in shop['paintings']:
+        shop['order'](artwork, OrderStatus.PAID)
+    db.session.query(ArtistDailySales).update({ArtistDailySales.revenue: 1.0})
+    db.session.commit()
+
+    assert RollupRepository.rebuild(chunk_size=2) == {'artist_day': 1, 'category_day': 0, 'buyer': 0}
+    assert artist_totals(shop) == (3, 3, 300.0)
+    assert RollupRepository.rebuild(chunk_size=2) == {'artist_day': 0, 'category_day': 0, 'buyer': 0}
+
+
+def test_reports_through_services(shop):
+    shop['order'](shop['paintings'][0], OrderStatus.PAID)
+    period = SalesPeriodSchema(start=PERIOD[0], end=PERIOD[1])
+
+    report = ArtworkService(shop['artist_id']).get_my_sales(period)
+    assert report.totals.revenue == 100.0 and [day.day for day in report.days] == [DAY]
+    assert AdminService().artist_sales(shop['artist_id'], period) == report
+
+    dashboard = AdminService().sales_dashboard(period)
+    assert [category.category for category in dashboard.top_categories] == ["Painting"]
+    assert dashboard.top_buyers[0].buyer_id == shop['buyer_id']
+
+
+def test_period_must_not_run_backwards():
+    with pytest.raises(ValueError):
+        SalesPeriodSchema(start=PERIOD[1], end=PERIOD[0])
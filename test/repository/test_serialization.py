@@ -0,0 +1,77 @@
+import json
+from datetime import datetime
+import pytest
+from config.config import db
+from models.artwork import ArtWork
+from models.order import Order, OrderStatus
+from models.payment import Payment, PaymentMethod, PaymentStatus
+from models.user import Role
+from repositories.archive_repo import ArchiveRepository
+from repositories.artwork_repo import ArtworkRepository
+from repositories.order_repo import OrderRepository
+from repositories.payment_repo import PaymentRepository
+from repositories.user_repo import UserRepository
+from schemas.artwork_schema import ArtWorkResponse
+from schemas.order_schema import OrderResponseSchema
+from schemas.payment_schema import PaymentResponseSchema
+from schemas.serialization import UserResponseRows, ArtworkResponseRows, OrderResponseRows, PaymentResponseRows
+from schemas.user_schema import UserResponseSchema, UserRole
+from services.admin_service import AdminService
+from services.buyer_service import BuyerService
+
+
+@pytest.fixture
+def catalog(make_user):
+    buyer = make_user(Role.BUYER)
+    artist = make_user(Role.ARTIST)
+    make_user(Role.ADMIN, is_verified=True)
+    artworks = [ArtWork(name=f"Piece {i}", description="d", image_url="u", price=10.0 + i, category="Print",
+                        artist_id=artist.id, is_available=i != 2, derivatives={"webp_320": f"/m/{i}.webp"} if i else None)
+                for i in range(3)]
+    db.session.add_all(artworks)
+    db.session.flush()
+    orders = [Order(buyer_id=buyer.id, artwork_id=artwork.id, total_price=artwork.price, status=status,
+                    closed_at=datetime(2026, 1, 1) if status == OrderStatus.COMPLETED else None)
+              for artwork, status in zip(artworks, (OrderStatus.PENDING, OrderStatus.PAID, OrderStatus.COMPLETED))]
+    db.session.add_all(orders)
+    db.session.flush()
+    db.session.add_all([Payment(order_id=order.id, amount=order.total_price, payment_method=method, status=status)
+                        for order, method, status in zip(orders, (PaymentMethod.CARD, PaymentMethod.TRANSFER,
+                                                                  PaymentMethod.CARD),
+                                                         (PaymentStatus.PENDING, PaymentStatus.SUCCESS,
+                                                          PaymentStatus.SUCCESS))])
+    db.session.commit()
+    return buyer.id
+
+
+def per_object(schema, objects):
+    return [schema.model_validate(obj).model_dump(mode='json') for obj in objects]
+
+
+def test_bulk_export_matches_per_object_serialization(catalog):
+    admin = AdminService()
+    assert json.loads(admin.export_users()) == per_object(UserResponseSchema, UserRepository.find_all_users())
+    assert json.loads(admin.export_orders()) == per_object(OrderResponseSchema, OrderRepository.get_all_orders())
+    assert json.loads(admin.export_payments()) == per_object(PaymentResponseSchema,
+                                                             PaymentRepository.get_all_payments())
+    assert json.loads(BuyerService(catalog).export_available_artwork()) == \
+        per_object(ArtWorkResponse, ArtworkRepository.find_all_available())
+    assert {user['role'] for user in json.loads(admin.export_users())} == {"BUYER", "ARTIST", "ADMIN"}
+
+
+def test_archived_rows_are_included_on_request(catalog):
+    ArchiveRepository.archive_batch(datetime(2100, 1, 1))
+    admin = AdminService()
+    assert [order['status'] for order in json.loads(admin.export_orders())] == ["PENDING", "PAID"]
+    archived = json.loads(admin.export_orders(include_archived=True))
+    assert archived == per_object(OrderResponseSchema, OrderRepository.get_all_orders(include_archived=True))
+    assert len(json.loads(admin.export_payments(include_archived=True))) == 3
+
+
+def test_bulk_validation_accepts_orm_objects(catalog):
+    users = UserResponseRows.validate(UserRepository.find_all_users())
+    assert all(isinstance(user, UserResponseSchema) for user in users)
+    assert {user.role for user in users} == set(UserRole)
+    assert OrderResponseRows.schema is OrderResponseSchema
+    assert ArtworkResponseRows.fields == tuple(ArtWorkResponse.model_fields)
+    assert PaymentResponseRows.validate([]) == []
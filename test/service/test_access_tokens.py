@@ -0,0 +1,141 @@
+import fakeredis
+import pytest
+from passlib.hash import bcrypt
+from sqlalchemy import event
+from config.config import db
+from models.user import Role
+from repositories.cache import InMemoryCacheBackend, RedisCacheBackend
+from schemas.user_schema import LoginUserSchema
+from services.access_tokens import AccessTokenService, InvalidToken
+from services.password_hasher import PasswordHasher
+from services.user_service import UserService
+
+PASSWORD = "LamineYamal10!"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user(Role.ARTIST, email="artist@example.com", is_verified=True,
+                     password=bcrypt.using(rounds=4).hash(PASSWORD))
+
+
+def service_with(tokens: AccessTokenService) -> UserService:
+    return UserService(PasswordHasher(rounds=4, max_workers=0), access_tokens=tokens)
+
+
+def login(service: UserService) -> str:
+    return service.login(LoginUserSchema(email="artist@example.com", password=PASSWORD)).access_token
+
+
+@pytest.fixture
+def count_queries(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_login_issues_a_token_that_authenticates_from_cache(user, count_queries):
+    service = service_with(AccessTokenService("secret"))
+    issued = service.login(LoginUserSchema(email="artist@example.com", password=PASSWORD))
+    assert issued.token_type == "bearer" and issued.expires_in == 900 and issued.user.id == user.id
+
+    db.session.expunge_all()
+    count_queries.clear()
+    first = service.authenticate(issued.access_token)
+    assert (first.user_id, first.role, first.token_version) == (user.id, Role.ARTIST, 0)
+    assert len(count_queries) == 1
+    for _ in range(5):
+        assert service.authenticate(issued.access_token) == first
+    assert len(count_queries) == 1
+
+
+def test_tampered_foreign_and_expired_tokens_are_refused(user, monkeypatch):
+    tokens = AccessTokenService("secret", ttl_seconds=60)
+    token = login(service_with(tokens))
+    for bad in (token[:-2] + ("AA" if not token.endswith("AA") else "BB"),
+                login(service_with(AccessTokenService("other-secret")))):
+        with pytest.raises(InvalidToken, match="Invalid"):
+            tokens.authenticate(bad)
+
+    with monkeypatch.context() as patched:
+        patched.setattr("itsdangerous.timed.time.time", lambda: 1_000_000.0)
+        stale = login(service_with(tokens))
+    with pytest.raises(InvalidToken, match="expired"):
+        tokens.authenticate(stale)
+
+
+def test_credential_changes_and_deletion_revoke_tokens(user):
+    service = service_with(AccessTokenService("secret"))
+    token = login(service)
+    service.update_user(user.id, {"first_name": "Renamed"})
+    service.authenticate(token)
+
+    service.update_user(user.id, {"role": Role.BUYER})
+    with pytest.raises(InvalidToken, match="revoked"):
+        service.authenticate(token)
+    token = login(service)
+    assert service.authenticate(token).role == Role.BUYER
+
+    service.revoke_tokens(user.id)
+    with pytest.raises(InvalidToken, match="revoked"):
+        service.authenticate(token)
+    token = login(service)
+    service.delete_user(user.id)
+    with pytest.raises(InvalidToken, match="revoked"):
+        service.authenticate(token)
+
+
+def test_other_processes_see_revocation_within_the_cache_ttl(user):
+    clock = FakeClock()
+    here = service_with(AccessTokenService("secret"))
+    elsewhere = AccessTokenService("secret", principal_cache=InMemoryCacheBackend(ttl_seconds=30, clock=clock))
+    token = login(here)
+    elsewhere.authenticate(token)
+
+    here.update_user(user.id, {"password": "NewPassword1!"})
+    elsewhere.authenticate(token)
+    clock.now += 31
+    with pytest.raises(InvalidToken):
+        elsewhere.authenticate(token)
+
+
+def test_shared_redis_cache_revokes_everywhere_at_once(user):
+    client = fakeredis.FakeRedis()
+    here = service_with(AccessTokenService("secret", principal_cache=RedisCacheBackend(client, "principal")))
+    elsewhere = AccessTokenService("secret", principal_cache=RedisCacheBackend(client, "principal"))
+    token = login(here)
+    elsewhere.authenticate(token)
+    here.revoke_tokens(user.id)
+    with pytest.raises(InvalidToken):
+        elsewhere.authenticate(token)
+
+
+def test_a_deleted_users_token_never_authenticates_a_later_signup(user, make_user):
+    service = service_with(AccessTokenService("secret"))
+    token = login(service)
+    service.delete_user(user.id)
+    with pytest.raises(InvalidToken, match="revoked"):
+        service.authenticate(token)
+    assert service.access_tokens.principal_cache.get(str(user.id)) is None
+
+    # The miss was not cached, and the newcomer gets a fresh id rather than
+    # the deleted user's.
+    newcomer = make_user(Role.ADMIN, email="newcomer@example.com")
+    assert newcomer.id > user.id
+    with pytest.raises(InvalidToken, match="revoked"):
+        service.authenticate(token)
+    newcomer_token = service.access_tokens.issue(newcomer)
+    assert service.authenticate(newcomer_token).user_id == newcomer.id
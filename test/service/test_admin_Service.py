@@ -0,0 +1,49 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from pydantic import ValidationError
+from models.order import OrderStatus
+from models.payment import PaymentMethod
+from models.user import Role
+from schemas.admin_schema import OrderListingSchema, PaymentListingSchema, UserListingSchema
+from schemas.order_schema import OrderStatusSchema
+from schemas.payment_schema import PaymentMethodSchema
+from schemas.user_schema import UserRole
+from services.admin_service import AdminService
+
+
+@pytest.fixture
+def admin_service():
+    with patch("services.admin_service.UserRepository") as user_repo, \
+            patch("services.admin_service.OrderRepository") as order_repo, \
+            patch("services.admin_service.PaymentRepository") as payment_repo:
+        for repo, method in ((user_repo, "list_users"), (order_repo, "list_orders"),
+                             (payment_repo, "list_payments")):
+            getattr(repo.return_value, method).return_value = ([], None)
+        yield AdminService()
+
+
+def test_list_users_maps_role_to_model_enum(admin_service):
+    admin_service.list_users(UserListingSchema(role=UserRole.ARTIST, limit=10))
+    admin_service.user_repo.list_users.assert_called_once_with(
+        role=Role.ARTIST, is_verified=None, sort_by="created_at", descending=True, limit=10, cursor=None
+    )
+
+
+def test_list_orders_passes_filters_and_cursor(admin_service):
+    admin_service.order_repo.list_orders.return_value = ([], "next")
+    page = admin_service.list_orders(OrderListingSchema(status=OrderStatusSchema.SHIPPED, buyer_id=4,
+                                                        sort_by="total_price", cursor="abc"))
+    assert page.next_cursor == "next"
+    kwargs = admin_service.order_repo.list_orders.call_args.kwargs
+    assert kwargs["status"] is OrderStatus.SHIPPED
+    assert (kwargs["buyer_id"], kwargs["sort_by"], kwargs["cursor"]) == (4, "total_price", "abc")
+
+
+def test_list_payments_maps_method(admin_service):
+    admin_service.list_payments(PaymentListingSchema(payment_method=PaymentMethodSchema.TRANSFER))
+    assert admin_service.payment_repo.list_payments.call_args.kwargs["payment_method"] is PaymentMethod.TRANSFER
+
+
+def test_page_size_is_capped():
+    with pytest.raises(ValidationError):
+        OrderListingSchema(limit=10_000)
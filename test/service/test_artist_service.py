@@ -0,0 +1,46 @@
+import pytest
+from unittest.mock import MagicMock
+from repositories.artwork_repo import ArtworkRepository
+from schemas.artwork_schema import CreateArtworkSchema
+from services.artist_service import ArtworkService
+
+
+@pytest.fixture
+def mock_artwork_repo(mocker):
+    mock_repo = MagicMock(spec=ArtworkRepository)
+    mocker.patch("services.artist_service.ArtworkRepository", return_value=mock_repo)
+    return mock_repo
+
+
+@pytest.fixture
+def artwork_data():
+    return CreateArtworkSchema(
+        name="Sunset Painting",
+        description="Beautiful sunset over the ocean",
+        price=150.00,
+        image_url="https://example.com/sunset.jpg",
+        category="Painting",
+    )
+
+
+def test_upload_artwork_uses_service_artist(mock_artwork_repo, artwork_data):
+    service = ArtworkService(artist_id=10)
+    service.upload_artwork(artwork_data)
+    assert mock_artwork_repo.create_artwork.call_args.kwargs["artist_id"] == 10
+
+
+def test_upload_artwork_queues_derivatives(mock_artwork_repo, artwork_data):
+    created = MagicMock(id=7, image_url=artwork_data.image_url)
+    mock_artwork_repo.create_artwork.return_value = created
+    pipeline = MagicMock()
+    service = ArtworkService(artist_id=10, image_pipeline=pipeline)
+    result = service.upload_artwork(artwork_data)
+    assert result is created
+    pipeline.submit.assert_called_once_with(7, "https://example.com/sunset.jpg")
+
+
+def test_upload_artwork_without_pipeline(mock_artwork_repo, artwork_data):
+    service = ArtworkService(artist_id=10)
+    assert service.image_pipeline is None
+    service.upload_artwork(artwork_data)
+    mock_artwork_repo.create_artwork.assert_called_once()
@@ -0,0 +1,68 @@
+import io
+import json
+import pytest
+from config.config import db
+from models.artwork import ArtWork
+from models.user import Role
+from services.artist_service import ArtworkService
+
+CSV_HEADER = "name,description,price,image_url,category\n"
+
+
+@pytest.fixture
+def artist(make_user):
+    return make_user(Role.ARTIST)
+
+
+def csv_rows(count, start=0):
+    return "".join(f"Piece {i},Oil on canvas,{100 + i},https://example.com/{i}.jpg,Painting\n"
+                   for i in range(start, start + count))
+
+
+def test_bulk_import_csv_in_chunks(artist):
+    stream = io.StringIO(CSV_HEADER + csv_rows(25))
+    report = ArtworkService(artist.id).bulk_import(stream, fmt="csv", chunk_size=10)
+    assert (report.total, report.inserted, report.failed) == (25, 25, 0)
+    assert report.rows_per_second > 0
+    assert db.session.query(ArtWork).filter_by(artist_id=artist.id).count() == 25
+
+
+def test_bulk_import_reports_invalid_rows_without_aborting(artist):
+    stream = io.StringIO(
+        CSV_HEADER + csv_rows(3)
+        + "No,too short name,100,https://example.com/x.jpg,Painting\n"
+        + "Free Piece,Costs nothing,0,https://example.com/y.jpg,Painting\n"
+        + csv_rows(2, start=3)
+    )
+    report = ArtworkService(artist.id).bulk_import(stream, fmt="csv", chunk_size=4)
+    assert (report.total, report.inserted, report.failed) == (7, 5, 2)
+    assert [error.line for error in report.errors] == [5, 6]
+    assert "name" in report.errors[0].error
+    assert "price" in report.errors[1].error
+
+
+def test_bulk_import_isolates_rows_rejected_by_the_database(artist):
+    records = [
+        {"name": "Good One", "description": "d", "price": 10, "image_url": "u", "category": "Print"},
+        {"name": "No Category", "description": "d", "price": 10, "image_url": "u", "category": None},
+        {"name": "Good Two", "description": "d", "price": 12, "image_url": "u", "category": "Print"},
+    ]
+    stream = io.StringIO("".join(json.dumps(record) + "\n" for record in records) + "{not json\n")
+    report = ArtworkService(artist.id).bulk_import(stream, fmt="jsonl", chunk_size=10)
+    assert (report.total, report.inserted, report.failed) == (4, 2, 2)
+    assert sorted(error.line for error in report.errors) == [2, 4]
+    names = {a.name for a in db.session.query(ArtWork).all()}
+    assert names == {"Good One", "Good Two"}
+
+
+def test_bulk_import_rejects_unknown_format(artist):
+    with pytest.raises(ValueError):
+        ArtworkService(artist.id).bulk_import(io.StringIO(""), fmt="xml")
+
+
+def test_import_command(app, artist, tmp_path):
+    source = tmp_path / "gallery.csv"
+    source.write_text(CSV_HEADER + csv_rows(5))
+    result = app.test_cli_runner().invoke(args=["artworks", "import", str(source), "--artist-id", str(artist.id)])
+    assert result.exit_code == 0, result.output
+    assert "imported 5/5 rows" in result.output
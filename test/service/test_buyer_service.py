@@ -5,6 +5,8 @@ from repositories.artwork_repo import ArtworkRepository
 from repositories.order_repo import OrderRepository
 from services.buyer_service import BuyerService
 from models.order import OrderStatus
+from pydantic import ValidationError
+from schemas.artwork_schema import BrowseArtworkSchema
 
 
 @pytest.fixture
@@ -19,6 +21,7 @@ def sample_artworks():
     artwork1.is_available = True
     artwork1.artist_id = 10
     artwork1.created_at = datetime.now()
+    artwork1.derivatives = None
 
     artwork2 = MagicMock()
     artwork2.id = 2
@@ -30,6 +33,7 @@ def sample_artworks():
     artwork2.is_available = True
     artwork2.artist_id = 11
     artwork2.created_at = datetime.now()
+    artwork2.derivatives = None
 
     artwork3 = MagicMock()
     artwork3.id = 3
@@ -41,6 +45,7 @@ def sample_artworks():
     artwork3.is_available = True
     artwork3.artist_id = 12
     artwork3.created_at = datetime.now()
+    artwork3.derivatives = None
     return [artwork1, artwork2, artwork3]
 
 @pytest.fixture
@@ -55,6 +60,7 @@ def unavailable_artwork():
     artwork.is_available = False
     artwork.artist_id = 10
     artwork.created_at = datetime.now()
+    artwork.derivatives = None
     return artwork
 
 @pytest.fixture
@@ -83,60 +89,77 @@ def buyer_service(mock_artwork_repo):
 
 
 def test_browse_artwork_success(mock_artwork_repo, buyer_service, sample_artworks):
-    mock_artwork_repo.find_all_available.return_value = sample_artworks
-    result = buyer_service.browse_artwork()
+    mock_artwork_repo.browse_available.return_value = (sample_artworks, None)
+    result = buyer_service.browse_artwork().items
     assert len(result) == 3
     assert result[0].name == "Sunset Painting"
     assert result[1].name == "Abstract Art"
     assert result[2].name == "Portrait"
     assert all(artwork.is_available for artwork in result)
-    mock_artwork_repo.find_all_available.assert_called_once()
+    mock_artwork_repo.browse_available.assert_called_once()
 
 def test_browse_artwork_empty_list(mock_artwork_repo, buyer_service):
-    mock_artwork_repo.find_all_available.return_value = []
-    result = buyer_service.browse_artwork()
+    mock_artwork_repo.browse_available.return_value = ([], None)
+    page = buyer_service.browse_artwork()
+    result = page.items
     assert result == []
+    assert page.next_cursor is None
     assert len(result) == 0
-    mock_artwork_repo.find_all_available.assert_called_once()
+    mock_artwork_repo.browse_available.assert_called_once()
 
 def test_browser_artwork_single_item(mock_artwork_repo, buyer_service, sample_artworks):
-    mock_artwork_repo.find_all_available.return_value = [sample_artworks[0]]
-    result = buyer_service.browse_artwork()
+    mock_artwork_repo.browse_available.return_value = ([sample_artworks[0]], None)
+    result = buyer_service.browse_artwork().items
     assert len(result) == 1
     assert result[0].name == "Sunset Painting"
     assert result[0].price == 150.00
     assert result[0].is_available is True
-    mock_artwork_repo.find_all_available.assert_called_once()
+    mock_artwork_repo.browse_available.assert_called_once()
 
 def test_browser_artwork_verifies_prices(mock_artwork_repo, buyer_service, sample_artworks):
-    mock_artwork_repo.find_all_available.return_value = sample_artworks
-    result = buyer_service.browse_artwork()
+    mock_artwork_repo.browse_available.return_value = (sample_artworks, None)
+    result = buyer_service.browse_artwork().items
     assert result[0].price == 150.00
     assert result[1].price == 300.00
     assert result[2].price == 500.00
-    mock_artwork_repo.find_all_available.assert_called_once()
+    mock_artwork_repo.browse_available.assert_called_once()
 
 def test_browser_artwork_verify_categories(mock_artwork_repo, buyer_service, sample_artworks):
-    mock_artwork_repo.find_all_available.return_value = sample_artworks
-    result = buyer_service.browse_artwork()
+    mock_artwork_repo.browse_available.return_value = (sample_artworks, None)
+    result = buyer_service.browse_artwork().items
     assert result[0].category == "Painting"
     assert result[1].category == "Abstract"
     assert result[2].category == "Portrait"
-    mock_artwork_repo.find_all_available.assert_called_once()
+    mock_artwork_repo.browse_available.assert_called_once()
 
 def test_browser_artwork_verifies_artist_id(mock_artwork_repo, buyer_service, sample_artworks):
-    mock_artwork_repo.find_all_available.return_value = sample_artworks
-    result = buyer_service.browse_artwork()
+    mock_artwork_repo.browse_available.return_value = (sample_artworks, None)
+    result = buyer_service.browse_artwork().items
     assert result[0].artist_id == 10
     assert result[1].artist_id == 11
     assert result[2].artist_id == 12
-    mock_artwork_repo.find_all_available.assert_called_once()
+    mock_artwork_repo.browse_available.assert_called_once()
+
+def test_browse_artwork_passes_filters_and_cursor(mock_artwork_repo, buyer_service, sample_artworks):
+    mock_artwork_repo.browse_available.return_value = ([sample_artworks[0]], "next-page")
+    filters = BrowseArtworkSchema(category="Painting", min_price=100, max_price=200, limit=1, cursor="abc")
+    page = buyer_service.browse_artwork(filters)
+    assert page.next_cursor == "next-page"
+    assert page.items[0].category == "Painting"
+    mock_artwork_repo.browse_available.assert_called_once_with(
+        category="Painting", min_price=100, max_price=200, artist_id=None,
+        sort_by="created_at", descending=True, limit=1, cursor="abc"
+    )
+
+def test_browse_artwork_rejects_inverted_price_range():
+    with pytest.raises(ValidationError):
+        BrowseArtworkSchema(min_price=500, max_price=100)
 
 def test_place_order_success(buyer_service, sample_artworks, sample_order):
     artwork = sample_artworks[0]
-    with patch.object(ArtworkRepository, "find_by_artwork_id", return_value=artwork):
-        with patch.object(OrderRepository, "create_order", return_value=sample_order):
-            result = buyer_service.place_order(artwork_id=1, quantity=1)
+    with patch.object(OrderRepository, "place_order", return_value=sample_order) as place_order:
+        result = buyer_service.place_order(artwork_id=1, quantity=1)
+    place_order.assert_called_once_with(1, 1, 1)
     assert result.id == 1
     assert result.buyer_id == 1
     assert result.artwork_id == 1
@@ -154,8 +177,22 @@ def test_place_order_multiple_quantity(buyer_service, sample_artworks):
     order.total_price = 450.00
     order.status = OrderStatus.PENDING
     order.created_at = datetime.now()
-    with patch.object(ArtworkRepository, "find_by_artwork_id", return_value=artwork):
-        with patch.object(OrderRepository, "create_order", return_value=order):
-            result = buyer_service.place_order(artwork_id=1, quantity=3)
+    with patch.object(OrderRepository, "place_order", return_value=order):
+        result = buyer_service.place_order(artwork_id=1, quantity=3)
     assert result.quantity == 3
-    assert result.total_price == 450.00
\ No newline at end of file
+    assert result.total_price == 450.00
+
+
+def test_search_artwork_returns_ranked_results(mock_artwork_repo, buyer_service, sample_artworks):
+    row = MagicMock()
+    for field in ("id", "name", "description", "price", "image_url", "category", "is_available",
+                  "created_at", "artist_id", "derivatives"):
+        setattr(row, field, getattr(sample_artworks[0], field))
+    row.score = 3.2
+    row.highlighted_name = "<mark>Sunset</mark> Painting"
+    row.snippet = "Beautiful <mark>sunset</mark> over the ocean"
+    mock_artwork_repo.search.return_value = [row]
+    result = buyer_service.search_artwork("sunset", {"category": "Painting"}, limit=5)
+    assert result[0].highlighted_name == "<mark>Sunset</mark> Painting"
+    assert result[0].score == 3.2
+    mock_artwork_repo.search.assert_called_once_with("sunset", {"category": "Painting"}, 5)
@@ -0,0 +1,128 @@
+import io
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from PIL import Image
+from config.config import db
+from models.artwork import ArtWork
+from models.user import Role
+from services.image_pipeline import ImagePipeline, ImageSourcePolicy, read_source, render_derivatives
+
+
+@pytest.fixture
+def source_image(tmp_path):
+    # Uploads live under the media root, the only local directory sources may
+    # be read from.
+    path = tmp_path / "media" / "uploads" / "original.png"
+    path.parent.mkdir(parents=True)
+    Image.new("RGB", (2400, 1600), (200, 90, 40)).save(path)
+    return str(path)
+
+
+@pytest.fixture
+def image_server():
+    png = io.BytesIO()
+    Image.new("RGB", (64, 64)).save(png, format="PNG")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/redirect":
+                self.send_response(302)
+                self.send_header("Location", "http://169.254.169.254/latest/meta-data/")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(png.getvalue())
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", len(png.getvalue())
+    server.shutdown()
+    server.server_close()
+
+
+def test_render_derivatives_writes_each_size_and_format(tmp_path, source_image):
+    media = tmp_path / "media"
+    derivatives = render_derivatives(source_image, str(media), "/media", sizes=(160, 480), formats=("webp", "jpeg"))
+    assert set(derivatives) == {"webp_160", "jpeg_160", "webp_480", "jpeg_480"}
+    for key, url in derivatives.items():
+        path = media / url[len("/media/"):]
+        with Image.open(path) as image:
+            assert max(image.size) == int(key.split("_")[1])
+            assert image.format == key.split("_")[0].upper()
+        assert os.path.getsize(path) < os.path.getsize(source_image)
+
+
+def test_render_derivatives_is_content_addressed(tmp_path, source_image):
+    media = tmp_path / "media"
+    first = render_derivatives(source_image, str(media), "/media", sizes=(160,), formats=("webp",))
+    second = render_derivatives(source_image, str(media), "/media", sizes=(160,), formats=("webp",))
+    assert first == second
+    assert sum(len(files) for root, _, files in os.walk(media) if "uploads" not in root) == 1
+
+
+def test_pipeline_records_derivatives_on_artwork(file_app, make_user, tmp_path, source_image):
+    artist = make_user(Role.ARTIST)
+    artwork = ArtWork(name="Original", description="d", image_url=source_image, price=10.0,
+                      category="Painting", artist_id=artist.id)
+    db.session.add(artwork)
+    db.session.commit()
+    artwork_id = artwork.id
+    db.session.commit()
+    pipeline = ImagePipeline(file_app, storage_root=str(tmp_path / "media"), sizes=(160,), max_workers=1)
+    try:
+        derivatives = pipeline.submit(artwork_id, source_image).result(timeout=60)
+    finally:
+        pipeline.shutdown()
+    db.session.expire_all()
+    assert db.session.get(ArtWork, artwork_id).derivatives == derivatives
+    assert set(derivatives) == {"webp_160", "jpeg_160"}
+
+
+def test_pipeline_surfaces_unreadable_sources(app, tmp_path):
+    pipeline = ImagePipeline(app, storage_root=str(tmp_path / "media"), max_workers=1)
+    try:
+        with pytest.raises(FileNotFoundError):
+            pipeline.submit(1, str(tmp_path / "media" / "missing.png")).result(timeout=60)
+    finally:
+        pipeline.shutdown()
+
+
+def test_local_sources_are_confined_to_the_media_root(tmp_path, source_image):
+    media = tmp_path / "media"
+    (tmp_path / "secret.txt").write_text("not yours")
+    policy = ImageSourcePolicy(local_root=str(media))
+    assert read_source("uploads/original.png", policy) == read_source(f"file://{source_image}", policy)
+    for outside in (str(tmp_path / "secret.txt"), "../secret.txt", "uploads/../../secret.txt",
+                    f"file://{tmp_path / 'secret.txt'}", "/etc/passwd", "ftp://example.com/x.png"):
+        with pytest.raises(ValueError):
+            read_source(outside, policy)
+
+
+def test_remote_sources_need_an_allowed_host_and_no_redirects(tmp_path, image_server):
+    base, size = image_server
+    media = str(tmp_path / "media")
+    with pytest.raises(ValueError, match="not allowed"):
+        read_source(f"{base}/art.png", ImageSourcePolicy(local_root=media, allowed_schemes=frozenset({"http"})))
+    policy = ImageSourcePolicy(local_root=media, allowed_hosts=frozenset({"127.0.0.1"}),
+                               allowed_schemes=frozenset({"http"}))
+    assert len(read_source(f"{base}/art.png", policy)) == size
+    with pytest.raises(Exception, match="redirect"):
+        read_source(f"{base}/redirect", policy)
+    with pytest.raises(ValueError, match="not allowed"):
+        read_source(f"{base}/art.png", ImageSourcePolicy(local_root=media, allowed_hosts=frozenset({"127.0.0.1"})))
+
+
+def test_oversized_sources_are_refused_before_decoding(tmp_path, source_image):
+    media = str(tmp_path / "media")
+    with pytest.raises(ValueError, match="larger than"):
+        render_derivatives(source_image, media, "/media", policy=ImageSourcePolicy(local_root=media, max_bytes=1024))
+    with pytest.raises(ValueError, match="pixels"):
+        render_derivatives(source_image, media, "/media",
+                           policy=ImageSourcePolicy(local_root=media, max_pixels=1000 * 1000))
+    assert os.listdir(media) == ["uploads"]
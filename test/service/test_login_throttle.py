@@ -0,0 +1,106 @@
+import fakeredis
+import pytest
+from unittest.mock import MagicMock
+from repositories.rate_limit import InMemoryRateLimitBackend, RedisRateLimitBackend
+from repositories.user_repo import UserRepository
+from schemas.user_schema import LoginUserSchema
+from services.login_throttle import LoginThrottle, LoginThrottled
+from services.password_hasher import PasswordHasher
+from services.user_service import UserService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 6000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request, clock):
+    if request.param == "memory":
+        return InMemoryRateLimitBackend(clock=clock)
+    return RedisRateLimitBackend(fakeredis.FakeRedis(), clock=clock)
+
+
+def test_window_slides_instead_of_resetting(backend, clock):
+    assert all(backend.hit("k", 4, 60) is None for _ in range(4))
+    retry_after = backend.hit("k", 4, 60)
+    assert retry_after is not None and 0 < retry_after <= 120
+
+    clock.now += 60
+    # Four hits in the previous window still weigh fully at its boundary...
+    assert backend.hit("k", 4, 60) is not None
+    clock.now += 30
+    # ...and half as much halfway through the next one.
+    assert [backend.hit("k", 4, 60) is None for _ in range(3)] == [True, True, False]
+    clock.now += 120
+    assert backend.hit("k", 4, 60) is None
+
+
+def test_refused_hits_are_not_counted_and_clear_resets(backend, clock):
+    for _ in range(2):
+        backend.hit("k", 2, 60)
+    for _ in range(10):
+        assert backend.hit("k", 2, 60) is not None
+    clock.now += 60 * 1.5
+    assert backend.hit("k", 2, 60) is None
+    backend.clear("k", 60)
+    assert backend.hit("k", 2, 60) is None and backend.hit("k", 2, 60) is None
+
+
+def test_memory_backend_stays_bounded_under_a_key_flood(clock):
+    backend = InMemoryRateLimitBackend(max_keys=100, clock=clock)
+    for n in range(10_000):
+        backend.hit(f"client:{n}", 5, 60)
+    assert len(backend._windows) <= 100
+
+
+def test_throttle_limits_per_email_and_per_client(backend):
+    throttle = LoginThrottle(backend, email_limit=3, client_limit=5)
+    for _ in range(3):
+        throttle.admit("victim@example.com", "10.0.0.1")
+    with pytest.raises(LoginThrottled) as rejected:
+        throttle.admit("Victim@Example.com ", "10.0.0.2")
+    assert rejected.value.scope == "email" and rejected.value.retry_after > 0
+
+    throttle.admit("a@example.com", "10.0.0.1")
+    throttle.admit("b@example.com", "10.0.0.1")
+    with pytest.raises(LoginThrottled) as rejected:
+        throttle.admit("c@example.com", "10.0.0.1")
+    assert rejected.value.scope == "client"
+    # The refused attempt did not use up c@example.com's own allowance.
+    for _ in range(3):
+        throttle.admit("c@example.com", "10.0.0.3")
+    assert throttle.stats.as_dict() == {"admitted": 8, "rejected_email": 1, "rejected_client": 1}
+
+
+def test_successful_login_resets_the_email_window(backend):
+    throttle = LoginThrottle(backend, email_limit=2)
+    throttle.admit("user@example.com")
+    throttle.admit("user@example.com")
+    throttle.succeeded("user@example.com")
+    throttle.admit("user@example.com")
+
+
+def test_login_is_refused_before_any_lookup_or_hashing(clock):
+    repo = MagicMock(spec=UserRepository)
+    repo.find_by_email.return_value = None
+    hasher = MagicMock(spec=PasswordHasher)
+    service = UserService(hasher, LoginThrottle(InMemoryRateLimitBackend(clock=clock), email_limit=2))
+    service.repo = repo
+    attempt = LoginUserSchema(email="victim@example.com", password="Guess1234!")
+    for _ in range(2):
+        with pytest.raises(ValueError, match="not found"):
+            service.login_user(attempt, client_id="10.0.0.1")
+    for _ in range(5):
+        with pytest.raises(LoginThrottled):
+            service.login_user(attempt, client_id="10.0.0.1")
+    assert repo.find_by_email.call_count == 2
+    hasher.verify.assert_not_called()
@@ -0,0 +1,95 @@
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+from passlib.hash import bcrypt
+from config.config import db
+from models.user import User, Role
+from repositories.user_repo import UserRepository
+from schemas.user_schema import CreateUserSchema, LoginUserSchema
+from services.password_hasher import PasswordHasher
+from services.user_service import UserService
+
+PASSWORD = "LamineYamal10!"
+
+
+def rounds_of(hashed: str) -> int:
+    return bcrypt.from_string(hashed).rounds
+
+
+def test_pool_hashes_and_verifies_off_process():
+    hasher = PasswordHasher(rounds=4, max_workers=1)
+    try:
+        hashed = hasher.hash(PASSWORD)
+        assert rounds_of(hashed) == 4
+        assert hasher.verify(PASSWORD, hashed) == (True, None)
+        assert hasher.verify("WrongPassword1!", hashed) == (False, None)
+    finally:
+        hasher.shutdown()
+
+
+def test_verify_returns_a_replacement_for_an_outdated_cost():
+    old = PasswordHasher(rounds=4, max_workers=0).hash(PASSWORD)
+    matches, new_hash = PasswordHasher(rounds=5, max_workers=0).verify(PASSWORD, old)
+    assert matches and rounds_of(new_hash) == 5 and bcrypt.verify(PASSWORD, new_hash)
+
+
+def test_saturated_pool_refuses_instead_of_queueing():
+    hasher = PasswordHasher(rounds=4, max_workers=1, max_pending=1, queue_timeout=0.01)
+    hasher._slots.acquire()
+    with pytest.raises(RuntimeError):
+        hasher.hash(PASSWORD)
+    hasher._slots.release()
+    hasher.shutdown()
+
+
+def test_register_hashes_once_and_login_upgrades_the_cost(app):
+    registration = CreateUserSchema(first_name="John", last_name="Smith", email="john@example.com",
+                                    password=PASSWORD, confirm_password=PASSWORD)
+    UserService(PasswordHasher(rounds=4, max_workers=0)).register(registration)
+    user = db.session.query(User).filter_by(email="john@example.com").one()
+    assert rounds_of(user.password) == 4 and bcrypt.verify(PASSWORD, user.password)
+    user.is_verified = True
+    db.session.commit()
+
+    service = UserService(PasswordHasher(rounds=5, max_workers=0))
+    service.login_user(LoginUserSchema(email="john@example.com", password=PASSWORD))
+    upgraded = db.session.query(User).filter_by(email="john@example.com").one().password
+    assert rounds_of(upgraded) == 5
+    service.login_user(LoginUserSchema(email="john@example.com", password=PASSWORD))
+    assert db.session.query(User).filter_by(email="john@example.com").one().password == upgraded
+
+
+def test_update_user_hashes_a_new_password():
+    repo = MagicMock(spec=UserRepository)
+    repo.update_user.return_value = MagicMock(id=1, first_name="John", last_name="Smith", email="j@example.com",
+                                              role=Role.BUYER, is_verified=True, created_at=datetime.now())
+    service = UserService(PasswordHasher(rounds=4, max_workers=0))
+    service.repo = repo
+    service.update_user(1, {"password": "NewPassword1!"})
+    stored = repo.update_user.call_args.args[1]["password"]
+    assert bcrypt.verify("NewPassword1!", stored)
+    with pytest.raises(ValueError):
+        service.update_user(1, {"password": "weak"})
+
+
+def test_empty_passwords_are_validated_not_stored():
+    repo = MagicMock(spec=UserRepository)
+    service = UserService(PasswordHasher(rounds=4, max_workers=0))
+    service.repo = repo
+    for empty in ("", None):
+        with pytest.raises(ValueError):
+            service.update_user(1, {"password": empty})
+    repo.update_user.assert_not_called()
+
+
+def test_repository_refuses_anything_but_a_bcrypt_hash(app, make_user):
+    user = make_user(password=bcrypt.using(rounds=4).hash(PASSWORD))
+    stored = user.password
+    for plaintext in ("", "NewPassword1!"):
+        with pytest.raises(ValueError, match="bcrypt"):
+            UserRepository.update_user(user.id, {"password": plaintext, "first_name": "Renamed"})
+    db.session.rollback()
+    assert (user.password, user.first_name) == (stored, "Test")
+    with pytest.raises(ValueError, match="bcrypt"):
+        UserRepository.create_user("Jane", "Smith", "jane@example.com", Role.BUYER, PASSWORD, "code-jane")
+    assert UserRepository.find_by_email("jane@example.com") is None